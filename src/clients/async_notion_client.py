@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import date
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    TypeVar,
+)
+
+import httpx
+from notion_client import AsyncClient
+
+from clients.notion_client import (
+    bump_revision_generation,
+    create_md_converter,
+    create_page_cache,
+    log_page_write,
+    notion_mirror,
+    notion_rate_limiter,
+)
+from config.config import SETTINGS
+from utils.notion_markdown import (
+    fetch_block_tree_async,
+    list_children_async,
+    render_markdown,
+)
+from utils.notion_utils import (
+    create_due_today_filters,
+    create_page_properties,
+    create_revision_properties,
+    flatten_nested_lists,
+    project_note,
+    write_page_blocks_async,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class AsyncNotionClient:
+    """
+    Async counterpart of `NotionClient` backed by one pooled `httpx.AsyncClient`.
+
+    Every call, including page exports, goes through the same keep-alive pool
+    (HTTP/2 when `h2` is installed). An httpx pool belongs to one event loop,
+    and Streamlit callers start a new loop per `asyncio.run`, so the pool
+    lives on the client's own background loop and calls from other loops are
+    handed over to it. Page writes, due notes and revisions go through the
+    same mirror and page-writing helpers as the sync client.
+    """
+
+    def __init__(self, max_connections: int = 20):
+        self.md_converter = create_md_converter()
+        self.rate_limiter = notion_rate_limiter()
+        self.page_cache = create_page_cache()
+        self.mirror = notion_mirror()
+        self.max_connections = max_connections
+        self._client: AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def _new_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=_http2_available(),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=30,
+            ),
+        )
+
+    def _pool_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="notion-async", daemon=True
+                ).start()
+            return self._loop
+
+    async def _on_pool_loop(self, coro: Coroutine[Any, Any, T]) -> T:
+        loop = self._pool_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    @property
+    def client(self) -> AsyncClient:
+        """The pooled API client; only use it on the pool loop."""
+        if self._client is None:
+            self._client = AsyncClient(
+                client=self._new_http_client(), auth=SETTINGS.notion_token
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            client, self._client = self._client, None
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            )
+        loop.call_soon_threadsafe(loop.stop)
+
+    async def _list_children(self, block_id: str) -> List[Dict[str, Any]]:
+        return await list_children_async(
+            partial(self.rate_limiter.call_async, self.client.blocks.children.list),
+            block_id,
+        )
+
+    async def fetch_page_markdown(self, page_id: str) -> str:
+        return await self._on_pool_loop(self._fetch_page_markdown(page_id))
+
+    async def _fetch_page_markdown(self, page_id: str) -> str:
+        page: Any = await self.rate_limiter.call_async(
+            self.client.pages.retrieve, page_id=page_id
+        )
+        last_edited_time = page["last_edited_time"]
+        cached = self.page_cache.get(page_id, last_edited_time)
+        if cached is not None:
+            return cached
+        tree = await fetch_block_tree_async(
+            self._list_children,
+            page_id,
+            max_concurrency=SETTINGS.notion_fetch_concurrency,
+        )
+        markdown = render_markdown(page_id, tree)
+        self.page_cache.put(page_id, last_edited_time, markdown)
+        return markdown
+
+    async def create_notion_page(
+        self,
+        title: str,
+        markdown: str,
+        resource_tag: str,
+        page: Dict | None = None,
+        blocks_written: int = 0,
+        on_batch: Callable[[Dict, int], None] | None = None,
+    ) -> Dict:
+        """Create a page from `markdown`, or finish an interrupted one."""
+        return await self._on_pool_loop(
+            self._create_notion_page(
+                title, markdown, resource_tag, page, blocks_written, on_batch
+            )
+        )
+
+    async def _create_notion_page(
+        self,
+        title: str,
+        markdown: str,
+        resource_tag: str,
+        page: Dict | None,
+        blocks_written: int,
+        on_batch: Callable[[Dict, int], None] | None,
+    ) -> Dict:
+        updated_md = flatten_nested_lists(markdown)
+        blocks = await asyncio.to_thread(self.md_converter.run, updated_md)
+        properties = create_page_properties(title=title, resource_tag=resource_tag)
+
+        async def create_page(children: List[Dict]) -> Dict:
+            response: Any = await self.rate_limiter.call_async(
+                self.client.pages.create,
+                parent={"database_id": SETTINGS.notion_knowledge_db_id},
+                properties=properties,
+                children=children,
+            )
+            if not response:
+                raise Exception("Failed to create Notion page")
+            return response
+
+        async def append_blocks(page_id: str, children: List[Dict]) -> None:
+            await self.rate_limiter.call_async(
+                self.client.blocks.children.append, block_id=page_id, children=children
+            )
+
+        started = time.monotonic()
+        resumed_at = blocks_written if page is not None else 0
+        response = await write_page_blocks_async(
+            blocks,
+            create_page,
+            append_blocks,
+            page=page,
+            blocks_written=blocks_written,
+            on_batch=on_batch,
+        )
+
+        if self.mirror:
+            self.mirror.upsert_pages(SETTINGS.notion_knowledge_db_id, [response])
+        log_page_write(
+            response, len(blocks), resumed_at, page is None, started, self.rate_limiter
+        )
+        return response
+
+    async def _iter_database_pages(
+        self, database_id: str, filter: Dict[str, Any] | None, page_size: int = 100
+    ) -> AsyncIterator[Dict[str, Any]]:
+        cursor = None
+        while True:
+            kwargs: Dict[str, Any] = {
+                "database_id": database_id,
+                "page_size": page_size,
+            }
+            if filter:
+                kwargs["filter"] = filter
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            response: Any = await self.rate_limiter.call_async(
+                self.client.databases.query, **kwargs
+            )
+            for page in response["results"]:
+                yield page
+            if not response.get("has_more"):
+                return
+            cursor = response["next_cursor"]
+
+    def _query_from_thread(
+        self, database_id: str, filter: Dict[str, Any] | None
+    ) -> Iterator[Dict[str, Any]]:
+        """Drive `_iter_database_pages` on the pool loop from a worker thread."""
+        loop = self._pool_loop()
+        pages = self._iter_database_pages(database_id, filter)
+
+        async def next_page() -> Dict[str, Any]:
+            return await anext(pages)
+
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(next_page(), loop).result()
+            except StopAsyncIteration:
+                return
+
+    async def sync_database(self, database_id: str, force: bool = False) -> int:
+        if not self.mirror:
+            return 0
+        # The mirror syncs synchronously; it runs on a worker thread while the
+        # pool loop stays free to answer its queries.
+        return await asyncio.to_thread(
+            self.mirror.sync,
+            database_id,
+            partial(self._query_from_thread, database_id),
+            force,
+        )
+
+    async def iter_due_notes(self, database_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Due pages projected by `project_note`: from the local mirror after an
+        incremental sync when one is configured, otherwise queried live.
+        """
+        for note in await self._on_pool_loop(self._due_notes(database_id)):
+            yield note
+
+    async def _due_notes(self, database_id: str) -> List[Dict[str, Any]]:
+        if self.mirror:
+            await self.sync_database(database_id)
+            today = date.today().strftime("%Y-%m-%d")
+            return self.mirror.due_notes(database_id, today)
+        filter = create_due_today_filters()
+        return [
+            project_note(page)
+            async for page in self._iter_database_pages(database_id, filter)
+        ]
+
+    async def fetch_due_notes(self, database_id: str) -> Dict[str, Any]:
+        return await self._on_pool_loop(self._fetch_due_notes(database_id))
+
+    async def _fetch_due_notes(self, database_id: str) -> Dict[str, Any]:
+        filter = create_due_today_filters()
+        pages = [page async for page in self._iter_database_pages(database_id, filter)]
+        return {"results": pages}
+
+    async def _fetch_page_properties(self, page_id: str) -> Dict[str, Any]:
+        page_object: Any = await self.rate_limiter.call_async(
+            self.client.pages.retrieve, page_id=page_id
+        )
+        return page_object.get("properties", {})
+
+    async def _update_page_properties(
+        self, page_id: str, properties: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        updated_page: Any = await self.rate_limiter.call_async(
+            self.client.pages.update, page_id=page_id, properties=properties
+        )
+        return updated_page
+
+    async def log_revision(
+        self, page_id: str, effort: Literal["Low", "Medium", "High", None] = None
+    ) -> bool:
+        return await self._on_pool_loop(self._log_revision(page_id, effort))
+
+    async def _log_revision(
+        self, page_id: str, effort: Literal["Low", "Medium", "High", None]
+    ) -> bool:
+        props = await self._fetch_page_properties(page_id)
+        updated_props = create_revision_properties(props, effort)
+        if updated_props:
+            updated_page = await self._update_page_properties(
+                page_id, properties=updated_props
+            )
+            # Written through like the sync client, so both see one mirror.
+            if self.mirror:
+                self.mirror.refresh_page(updated_page)
+            bump_revision_generation()
+        return True
@@ -0,0 +1,27 @@
+import logging
+from langchain_openai import OpenAIEmbeddings
+from config.config import SETTINGS
+from utils.constants import EmbeddingProvider
+from utils.embedding_store import EmbeddingStore, HashEmbedder
+
+logger = logging.getLogger(__name__)
+
+
+def create_embedding_store() -> EmbeddingStore | None:
+    """Build the configured embedding store, or None if embeddings are disabled."""
+    if SETTINGS.embed_provider == EmbeddingProvider.HASH.value:
+        embedder = HashEmbedder()
+        model = embedder.model
+    elif SETTINGS.embed_model:
+        embedder = OpenAIEmbeddings(model=SETTINGS.embed_model)
+        model = SETTINGS.embed_model
+    else:
+        logger.warning("EMBED_MODEL is not set; chunk embeddings are disabled")
+        return None
+    return EmbeddingStore(
+        embedder,
+        model=model,
+        cache_path=SETTINGS.embed_cache_path,
+        max_batch_size=SETTINGS.embed_batch_size,
+        max_concurrency=SETTINGS.embed_concurrency,
+    )
@@ -9,12 +9,24 @@ class GPTClient:
         timeout: int = 600,
         max_retries: int = 5,
     ):
-        self.llm = ChatOpenAI(
-            model=model,
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.llm = self._build(max_retries)
+        self._by_retries = {max_retries: self.llm}
+
+    def _build(self, max_retries: int) -> ChatOpenAI:
+        return ChatOpenAI(
+            model=self.model,
             temperature=SETTINGS.model_temperature,
-            timeout=timeout,
+            timeout=self.timeout,
             max_retries=max_retries,
         )
 
-    def instance(self) -> ChatOpenAI:
-        return self.llm
+    def instance(self, max_retries: int | None = None) -> ChatOpenAI:
+        """Return the model, optionally with a different client retry count."""
+        if max_retries is None:
+            return self.llm
+        if max_retries not in self._by_retries:
+            self._by_retries[max_retries] = self._build(max_retries)
+        return self._by_retries[max_retries]
@@ -1,70 +1,276 @@
+import logging
+import math
+import threading
 import time
+from functools import lru_cache, partial
 from datetime import date
-from typing import Dict, Any, Literal
+from typing import Callable, Dict, Any, Iterator, List, Literal
 from config.config import SETTINGS
 from utils.notion_utils import (
+    BLOCKS_PER_REQUEST,
     create_due_today_filters,
     create_page_properties,
+    create_revision_properties,
     flatten_nested_lists,
+    project_note,
+    write_page_blocks,
 )
-from utils.martian import MartianRunner
-from notion2md.exporter.block import StringExporter
+from utils.block_cache import CachedMarkdownConverter
+from utils.disk_cache import DiskCache
+from utils.constants import MarkdownConverterBackend
+from utils.markdown_blocks import MarkdownBlockConverter
+from utils.martian import MartianWorkerPool
+from utils.notion_markdown import fetch_block_tree, list_children, render_markdown
+from utils.notion_mirror import NotionMirror
+from utils.page_cache import PageMarkdownCache
+from utils.rate_limiter import NotionRateLimiter
 from notion_client import client
 
+logger = logging.getLogger(__name__)
+
+
+def create_md_converter() -> CachedMarkdownConverter:
+    if SETTINGS.markdown_converter == MarkdownConverterBackend.MARTIAN.value:
+        converter = MartianWorkerPool()
+    else:
+        converter = MarkdownBlockConverter()
+    cache = DiskCache(
+        SETTINGS.block_cache_dir,
+        max_bytes=SETTINGS.block_cache_max_mb * 1024 * 1024,
+    )
+    return CachedMarkdownConverter(converter, cache)
+
+
+def create_page_cache() -> PageMarkdownCache:
+    disk = None
+    if SETTINGS.page_cache_dir:
+        disk = DiskCache(
+            SETTINGS.page_cache_dir,
+            max_bytes=SETTINGS.page_cache_max_mb * 1024 * 1024,
+        )
+    return PageMarkdownCache(
+        max_bytes=SETTINGS.page_cache_max_mb * 1024 * 1024, disk=disk
+    )
+
+
+@lru_cache(maxsize=1)
+def notion_mirror() -> NotionMirror | None:
+    """Process-wide mirror, or None when NOTION_MIRROR_PATH is empty."""
+    if not SETTINGS.notion_mirror_path:
+        return None
+    return NotionMirror(
+        SETTINGS.notion_mirror_path,
+        min_sync_interval_sec=SETTINGS.notion_mirror_sync_sec,
+    )
+
+
+@lru_cache(maxsize=1)
+def notion_rate_limiter() -> NotionRateLimiter:
+    """Process-wide limiter so every Notion client shares one request budget."""
+    return NotionRateLimiter(
+        rate_per_sec=SETTINGS.notion_requests_per_sec,
+        burst=SETTINGS.notion_request_burst,
+    )
+
+
+_revision_lock = threading.Lock()
+_revision_generation = 0
+
+
+def revision_generation() -> int:
+    """Number of revisions logged by any Notion client in this process."""
+    return _revision_generation
+
+
+def bump_revision_generation() -> None:
+    global _revision_generation
+    with _revision_lock:
+        _revision_generation += 1
+
+
+def log_page_write(
+    page: Dict,
+    n_blocks: int,
+    resumed_at: int,
+    created: bool,
+    started: float,
+    rate_limiter: NotionRateLimiter,
+) -> None:
+    # Creating the page takes a request even when there are no blocks.
+    n_requests = max(
+        math.ceil((n_blocks - resumed_at) / BLOCKS_PER_REQUEST), int(created)
+    )
+    elapsed = time.monotonic() - started
+    logger.info(
+        "Wrote %d of %d blocks to Notion page %s in %d requests over %.2fs "
+        "(%.2f req/s); limiter stats: %s",
+        n_blocks - resumed_at,
+        n_blocks,
+        page["id"],
+        n_requests,
+        elapsed,
+        n_requests / elapsed if elapsed else 0.0,
+        rate_limiter.stats(),
+    )
+
 
 class NotionClient:
     def __init__(self):
-        self.martian = MartianRunner()
+        self.md_converter = create_md_converter()
         self.client = client.Client(auth=SETTINGS.notion_token)
+        self.rate_limiter = notion_rate_limiter()
+        self.page_cache = create_page_cache()
+        self.mirror = notion_mirror()
+
+    def _list_children(self, block_id: str) -> List[Dict[str, Any]]:
+        return list_children(
+            partial(self.rate_limiter.call, self.client.blocks.children.list),
+            block_id,
+        )
 
     def fetch_page_markdown(self, page_id: str):
-        return StringExporter(block_id=page_id, token=SETTINGS.notion_token).export()
+        # A page lookup is one cheap request; re-exporting is one per parent block.
+        page: Any = self.rate_limiter.call(self.client.pages.retrieve, page_id=page_id)
+        last_edited_time = page["last_edited_time"]
+        cached = self.page_cache.get(page_id, last_edited_time)
+        if cached is not None:
+            return cached
+        tree = fetch_block_tree(
+            self._list_children,
+            page_id,
+            max_workers=SETTINGS.notion_fetch_concurrency,
+        )
+        markdown = render_markdown(page_id, tree)
+        self.page_cache.put(page_id, last_edited_time, markdown)
+        return markdown
 
-    def create_notion_page(self, title: str, markdown: str, resource_tag: str) -> Dict:
+    def create_notion_page(
+        self,
+        title: str,
+        markdown: str,
+        resource_tag: str,
+        page: Dict | None = None,
+        blocks_written: int = 0,
+        on_batch: Callable[[Dict, int], None] | None = None,
+    ) -> Dict:
+        """
+        Create a page from `markdown`, or finish an interrupted one.
+
+        `page` and `blocks_written` come from `on_batch` of an earlier call;
+        the markdown converts to the same blocks, so the write continues
+        with the first batch that did not land.
+        """
         updated_md = flatten_nested_lists(markdown)
-        blocks = self.martian.run(updated_md)
+        blocks = self.md_converter.run(updated_md)
         properties = create_page_properties(title=title, resource_tag=resource_tag)
 
-        # Notion API allows max 100 blocks per request
-        initial_blocks = blocks[:100]
-        remaining_blocks = blocks[100:]
+        def create_page(children: List[Dict]) -> Dict:
+            response: Any = self.rate_limiter.call(
+                self.client.pages.create,
+                parent={"database_id": SETTINGS.notion_knowledge_db_id},
+                properties=properties,
+                children=children,
+            )
+            if not response:
+                raise Exception("Failed to create Notion page")
+            return response
+
+        def append_blocks(page_id: str, children: List[Dict]) -> None:
+            self.rate_limiter.call(
+                self.client.blocks.children.append, block_id=page_id, children=children
+            )
+
+        started = time.monotonic()
+        resumed_at = blocks_written if page is not None else 0
+        response = write_page_blocks(
+            blocks,
+            create_page,
+            append_blocks,
+            page=page,
+            blocks_written=blocks_written,
+            on_batch=on_batch,
+        )
+
+        if self.mirror:
+            self.mirror.upsert_pages(SETTINGS.notion_knowledge_db_id, [response])
+        log_page_write(
+            response, len(blocks), resumed_at, page is None, started, self.rate_limiter
+        )
+        return response
+
+    def _iter_database_pages(
+        self, database_id: str, filter: Dict[str, Any] | None, page_size: int = 100
+    ) -> Iterator[Dict[str, Any]]:
+        cursor = None
+        while True:
+            kwargs: Dict[str, Any] = {
+                "database_id": database_id,
+                "page_size": page_size,
+            }
+            if filter:
+                kwargs["filter"] = filter
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            response: Any = self.rate_limiter.call(
+                self.client.databases.query, **kwargs
+            )
+            yield from response["results"]
+            if not response.get("has_more"):
+                return
+            cursor = response["next_cursor"]
 
-        # Create the page with initial blocks
-        response: Any = self.client.pages.create(
-            parent={"database_id": SETTINGS.notion_knowledge_db_id},
-            properties=properties,
-            children=initial_blocks,
+    def sync_database(self, database_id: str, force: bool = False) -> int:
+        if not self.mirror:
+            return 0
+        return self.mirror.sync(
+            database_id,
+            lambda filter: self._iter_database_pages(database_id, filter),
+            force=force,
         )
-        if not response:
-            raise Exception("Failed to create Notion page")
 
-        page_id = response["id"]
+    def iter_due_notes(self, database_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream due pages projected by `project_note`.
 
-        # Append remaining blocks in batches of 100
-        for i in range(0, len(remaining_blocks), 100):
-            batch = remaining_blocks[i : i + 100]
-            self.client.blocks.children.append(block_id=page_id, children=batch)
-            if i + 100 < len(remaining_blocks):
-                time.sleep(1)  # Avoid rate limits
+        Served from the local mirror after an incremental sync when one is
+        configured, otherwise queried live across all result pages.
+        """
+        if self.mirror:
+            self.sync_database(database_id)
+            today = date.today().strftime("%Y-%m-%d")
+            yield from self.mirror.due_notes(database_id, today)
+            return
+        for page in self._iter_database_pages(database_id, create_due_today_filters()):
+            yield project_note(page)
 
-        return response
+    def page_last_edited_time(self, database_id: str, page_id: str) -> str:
+        """
+        Current `last_edited_time` of a page: read from the mirror after an
+        incremental sync when one is configured, otherwise one page lookup.
+        """
+        if self.mirror:
+            self.sync_database(database_id)
+            edited = self.mirror.last_edited_time(page_id)
+            if edited:
+                return edited
+        page: Any = self.rate_limiter.call(self.client.pages.retrieve, page_id=page_id)
+        return page["last_edited_time"]
 
     def fetch_due_notes(self, database_id: str) -> Dict[str, Any]:
-        response: Any = self.client.databases.query(
-            database_id=database_id,
-            filter=create_due_today_filters(),
-        )
-        return response
+        pages = self._iter_database_pages(database_id, create_due_today_filters())
+        return {"results": list(pages)}
 
     def _fetch_page_properties(self, page_id: str) -> Dict[str, Any]:
-        page_object: Any = self.client.pages.retrieve(page_id=page_id)
+        page_object: Any = self.rate_limiter.call(
+            self.client.pages.retrieve, page_id=page_id
+        )
         return page_object.get("properties", {})
 
     def _update_page_properties(
         self, page_id: str, properties: Dict[str, Any]
     ) -> Dict[str, Any]:
-        updated_page: Any = self.client.pages.update(
-            page_id=page_id, properties=properties
+        updated_page: Any = self.rate_limiter.call(
+            self.client.pages.update, page_id=page_id, properties=properties
         )
         return updated_page
 
@@ -72,16 +278,14 @@ class NotionClient:
         self, page_id: str, effort: Literal["Low", "Medium", "High", None] = None
     ) -> bool:
         props = self._fetch_page_properties(page_id)
-        last_review_data = props.get("Last Review", {}).get("date", {}).get("start", "")
-        current_date = date.today().strftime("%Y-%m-%d")
-        if last_review_data == current_date:
-            return True
-        current_revision_count = int(props.get("Revisions", {}).get("number", 0) or 0)
-        updated_props = {
-            "Revisions": {"number": min(current_revision_count + 1, 5)},
-            "Last Review": {"date": {"start": current_date}},
-        }
-        if props.get("Effort") and effort:
-            updated_props["Effort"] = {"select": {"name": f"{effort}"}}
-        self._update_page_properties(page_id, properties=updated_props)
+        updated_props = create_revision_properties(props, effort)
+        if updated_props:
+            updated_page = self._update_page_properties(
+                page_id, properties=updated_props
+            )
+            # Notion recomputes Next Review on update, so the response is
+            # written through as-is.
+            if self.mirror:
+                self.mirror.refresh_page(updated_page)
+            bump_revision_generation()
         return True
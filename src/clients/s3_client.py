@@ -1,5 +1,4 @@
 import boto3
-import io
 import streamlit as st
 from typing import Tuple, List
 from botocore.client import Config
@@ -22,11 +21,11 @@ class S3Client:
         filename = safe_filename(uploaded_file)
         key = f"{prefix.rstrip('/')}/{filename}"
         content_type = uploaded_file.type or detect_content_type(filename)
-        uploaded_file.seek(0)
-        data = uploaded_file.getvalue()
         extra = {"ContentType": content_type}
+        # Stream straight from the upload's own buffer.
+        uploaded_file.seek(0)
         self.s3.upload_fileobj(
-            Fileobj=io.BytesIO(data), Bucket=self.bucket, Key=key, ExtraArgs=extra
+            Fileobj=uploaded_file, Bucket=self.bucket, Key=key, ExtraArgs=extra
         )
         https_url = f"https://{self.bucket}.s3.amazonaws.com/{key}"
         return key, https_url
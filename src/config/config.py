@@ -19,6 +19,45 @@ class Settings:
     notion_version: str
     chroma_persist_dir: str
     embed_model: str
+    markdown_converter: str
+    block_cache_dir: str
+    block_cache_max_mb: int
+    notion_requests_per_sec: float
+    notion_request_burst: float
+    notion_fetch_concurrency: int
+    page_cache_max_mb: int
+    page_cache_dir: str
+    notion_mirror_path: str
+    notion_mirror_sync_sec: int
+    vector_index_dir: str
+    embed_provider: str
+    embed_cache_path: str
+    embed_batch_size: int
+    embed_concurrency: int
+    quiz_context_mode: str
+    quiz_context_token_budget: int
+    quiz_evaluation_mode: str
+    quiz_grading_workers: int
+    quiz_prefetch_top_n: int
+    quiz_prefetch_workers: int
+    question_bank_path: str
+    question_bank_factor: int
+    chatbot_tool_workers: int
+    chat_history_token_budget: int
+    chat_tool_output_tokens: int
+    chat_checkpoint_path: str
+    chat_checkpoints_per_thread: int
+    image_preprocess: bool
+    image_grayscale: bool
+    image_jpeg_quality: int
+    image_prep_workers: int
+    markdown_ocr_mode: str
+    markdown_ocr_group_size: int
+    markdown_ocr_concurrency: int
+    markdown_ocr_page_attempts: int
+    ingestion_queue_path: str
+    ingestion_workers: int
+    ingestion_checkpoint_path: str
 
     def __init__(self):
         load_env_vars()
@@ -61,6 +100,203 @@ class Settings:
             self, "chroma_persist_dir", os.getenv("CHROMA_PERSIST_DIR", "").strip()
         )
         object.__setattr__(self, "embed_model", os.getenv("EMBED_MODEL", "").strip())
+        object.__setattr__(
+            self,
+            "markdown_converter",
+            os.getenv("MARKDOWN_CONVERTER", "python").strip().lower(),
+        )
+        object.__setattr__(
+            self,
+            "block_cache_dir",
+            os.getenv("BLOCK_CACHE_DIR", ".cache/notion_blocks").strip(),
+        )
+        object.__setattr__(
+            self,
+            "block_cache_max_mb",
+            int(os.getenv("BLOCK_CACHE_MAX_MB", "64").strip()),
+        )
+        object.__setattr__(
+            self,
+            "notion_requests_per_sec",
+            float(os.getenv("NOTION_REQUESTS_PER_SEC", "3").strip()),
+        )
+        object.__setattr__(
+            self,
+            "notion_request_burst",
+            float(os.getenv("NOTION_REQUEST_BURST", "10").strip()),
+        )
+        object.__setattr__(
+            self,
+            "notion_fetch_concurrency",
+            int(os.getenv("NOTION_FETCH_CONCURRENCY", "8").strip()),
+        )
+        object.__setattr__(
+            self,
+            "page_cache_max_mb",
+            int(os.getenv("PAGE_CACHE_MAX_MB", "32").strip()),
+        )
+        object.__setattr__(
+            self, "page_cache_dir", os.getenv("PAGE_CACHE_DIR", "").strip()
+        )
+        object.__setattr__(
+            self,
+            "notion_mirror_path",
+            os.getenv("NOTION_MIRROR_PATH", ".cache/notion_mirror.sqlite3").strip(),
+        )
+        object.__setattr__(
+            self,
+            "notion_mirror_sync_sec",
+            int(os.getenv("NOTION_MIRROR_SYNC_SEC", "60").strip()),
+        )
+        object.__setattr__(
+            self,
+            "vector_index_dir",
+            os.getenv("VECTOR_INDEX_DIR", ".cache/vector_index").strip(),
+        )
+        object.__setattr__(
+            self,
+            "embed_provider",
+            os.getenv("EMBED_PROVIDER", "openai").strip().lower(),
+        )
+        object.__setattr__(
+            self,
+            "embed_cache_path",
+            os.getenv("EMBED_CACHE_PATH", ".cache/embeddings.sqlite3").strip(),
+        )
+        object.__setattr__(
+            self,
+            "embed_batch_size",
+            int(os.getenv("EMBED_BATCH_SIZE", "256").strip()),
+        )
+        object.__setattr__(
+            self,
+            "embed_concurrency",
+            int(os.getenv("EMBED_CONCURRENCY", "4").strip()),
+        )
+        object.__setattr__(
+            self,
+            "quiz_context_mode",
+            os.getenv("QUIZ_CONTEXT_MODE", "retrieval").strip().lower(),
+        )
+        object.__setattr__(
+            self,
+            "quiz_context_token_budget",
+            int(os.getenv("QUIZ_CONTEXT_TOKEN_BUDGET", "6000").strip()),
+        )
+        object.__setattr__(
+            self,
+            "quiz_evaluation_mode",
+            os.getenv("QUIZ_EVALUATION_MODE", "per_question").strip().lower(),
+        )
+        object.__setattr__(
+            self,
+            "quiz_grading_workers",
+            int(os.getenv("QUIZ_GRADING_WORKERS", "4").strip()),
+        )
+        object.__setattr__(
+            self,
+            "quiz_prefetch_top_n",
+            int(os.getenv("QUIZ_PREFETCH_TOP_N", "3").strip()),
+        )
+        object.__setattr__(
+            self,
+            "quiz_prefetch_workers",
+            int(os.getenv("QUIZ_PREFETCH_WORKERS", "2").strip()),
+        )
+        object.__setattr__(
+            self,
+            "question_bank_path",
+            os.getenv("QUESTION_BANK_PATH", ".cache/question_bank.sqlite3").strip(),
+        )
+        object.__setattr__(
+            self,
+            "question_bank_factor",
+            int(os.getenv("QUESTION_BANK_FACTOR", "2").strip()),
+        )
+        object.__setattr__(
+            self,
+            "chatbot_tool_workers",
+            int(os.getenv("CHATBOT_TOOL_WORKERS", "4").strip()),
+        )
+        object.__setattr__(
+            self,
+            "chat_history_token_budget",
+            int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "6000").strip()),
+        )
+        object.__setattr__(
+            self,
+            "chat_tool_output_tokens",
+            int(os.getenv("CHAT_TOOL_OUTPUT_TOKENS", "400").strip()),
+        )
+        object.__setattr__(
+            self,
+            "chat_checkpoint_path",
+            os.getenv(
+                "CHAT_CHECKPOINT_PATH", ".cache/chat_checkpoints.sqlite3"
+            ).strip(),
+        )
+        object.__setattr__(
+            self,
+            "chat_checkpoints_per_thread",
+            int(os.getenv("CHAT_CHECKPOINTS_PER_THREAD", "20").strip()),
+        )
+        object.__setattr__(
+            self,
+            "image_preprocess",
+            os.getenv("IMAGE_PREPROCESS", "true").strip().lower() == "true",
+        )
+        object.__setattr__(
+            self,
+            "image_grayscale",
+            os.getenv("IMAGE_GRAYSCALE", "true").strip().lower() == "true",
+        )
+        object.__setattr__(
+            self,
+            "image_jpeg_quality",
+            int(os.getenv("IMAGE_JPEG_QUALITY", "80").strip()),
+        )
+        object.__setattr__(
+            self,
+            "image_prep_workers",
+            int(os.getenv("IMAGE_PREP_WORKERS", "4").strip()),
+        )
+        object.__setattr__(
+            self,
+            "markdown_ocr_mode",
+            os.getenv("MARKDOWN_OCR_MODE", "grouped").strip().lower(),
+        )
+        object.__setattr__(
+            self,
+            "markdown_ocr_group_size",
+            int(os.getenv("MARKDOWN_OCR_GROUP_SIZE", "2").strip()),
+        )
+        object.__setattr__(
+            self,
+            "markdown_ocr_concurrency",
+            int(os.getenv("MARKDOWN_OCR_CONCURRENCY", "4").strip()),
+        )
+        object.__setattr__(
+            self,
+            "markdown_ocr_page_attempts",
+            int(os.getenv("MARKDOWN_OCR_PAGE_ATTEMPTS", "2").strip()),
+        )
+        object.__setattr__(
+            self,
+            "ingestion_queue_path",
+            os.getenv("INGESTION_QUEUE_PATH", ".cache/ingestion_jobs.sqlite3").strip(),
+        )
+        object.__setattr__(
+            self,
+            "ingestion_workers",
+            int(os.getenv("INGESTION_WORKERS", "2").strip()),
+        )
+        object.__setattr__(
+            self,
+            "ingestion_checkpoint_path",
+            os.getenv(
+                "INGESTION_CHECKPOINT_PATH", ".cache/ingestion_checkpoints.sqlite3"
+            ).strip(),
+        )
 
 
 SETTINGS = Settings()
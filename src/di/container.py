@@ -1,4 +1,6 @@
 from dependency_injector import containers, providers
+from clients.async_notion_client import AsyncNotionClient
+from clients.embedding_client import create_embedding_store
 from clients.gpt_client import GPTClient
 from clients.notion_client import NotionClient
 from regex import P
@@ -7,9 +9,18 @@ from tools.quiz_toolset import QuizToolset
 from ui.chatbot_page import ChatbotPage
 from ui.revision_page import RevisionPage
 from ui.upload_notes_page import UploadNotesPage
+from utils.chat_checkpointer import SqliteCheckpointSaver
+from utils.constants import JobKind
+from utils.image_utils import ImagePreprocessor
+from utils.ingestion_checkpoints import IngestionCheckpointStore
+from utils.job_queue import JobQueue, JobWorkerPool
 from utils.prompt_utils import load_prompts
+from utils.question_bank import QuestionBank
+from utils.quiz_cache import QuizCache
+from utils.vector_index import VectorIndexStore
 from workflows.chatbot_workflow import ChatbotWorkflow
 from workflows.ingestion_workflow import IngestionWorkflow
+from workflows.llm_answer_evaluation_workflow import LLMAnswerEvaluationWorkflow
 from workflows.llm_markdown_workflow import LLMMarkdownWorkflow
 from workflows.llm_quiz_evaluation_workflow import LLMQuizEvaluationWorkflow
 from workflows.llm_quiz_generation_workflow import LLMQuizGenerationWorkflow
@@ -27,22 +38,42 @@ class Container(containers.DeclarativeContainer):
         GPTClient, model=SETTINGS.openai_model_premium
     )
     notion_client = providers.Singleton(NotionClient)
+    async_notion_client = providers.Singleton(AsyncNotionClient)
+    embedding_store = providers.Singleton(create_embedding_store)
+    question_bank = providers.Singleton(QuestionBank, SETTINGS.question_bank_path)
+    vector_index_store = providers.Singleton(
+        VectorIndexStore, root_dir=SETTINGS.vector_index_dir
+    )
 
     # LLM Workflows
     llm_markdown_workflow = providers.Singleton(
         LLMMarkdownWorkflow,
         gpt_client=gpt_client_premium,
         prompts=prompts["notes_ingestion"],
+        ocr_mode=SETTINGS.markdown_ocr_mode,
+        group_size=SETTINGS.markdown_ocr_group_size,
+        max_concurrency=SETTINGS.markdown_ocr_concurrency,
+        page_attempts=SETTINGS.markdown_ocr_page_attempts,
     )
     llm_quiz_generation_workflow = providers.Singleton(
         LLMQuizGenerationWorkflow,
         gpt_client=gpt_client_premium,
         prompts=prompts["quiz_generation"],
+        context_mode=SETTINGS.quiz_context_mode,
+        token_budget=SETTINGS.quiz_context_token_budget,
     )
     llm_quiz_evaluation_workflow = providers.Singleton(
         LLMQuizEvaluationWorkflow,
         gpt_client=gpt_client_premium,
         prompts=prompts["quiz_evaluation"],
+        context_mode=SETTINGS.quiz_context_mode,
+        token_budget=SETTINGS.quiz_context_token_budget,
+    )
+    llm_answer_evaluation_workflow = providers.Singleton(
+        LLMAnswerEvaluationWorkflow,
+        gpt_client=gpt_client_premium,
+        prompts=prompts["answer_evaluation"],
+        max_workers=SETTINGS.quiz_grading_workers,
     )
 
     # Toolsets
@@ -55,15 +86,56 @@ class Container(containers.DeclarativeContainer):
     )
 
     # Complex Workflows
+    image_preprocessor = (
+        providers.Singleton(
+            ImagePreprocessor,
+            grayscale=SETTINGS.image_grayscale,
+            quality=SETTINGS.image_jpeg_quality,
+            max_workers=SETTINGS.image_prep_workers,
+        )
+        if SETTINGS.image_preprocess
+        else providers.Object(None)
+    )
+    ingestion_checkpoint_store = (
+        providers.Singleton(
+            IngestionCheckpointStore, SETTINGS.ingestion_checkpoint_path
+        )
+        if SETTINGS.ingestion_checkpoint_path
+        else providers.Object(None)
+    )
     ingestion_workflow = providers.Singleton(
         IngestionWorkflow,
         notion_client=notion_client,
         llm_md_workflow=llm_markdown_workflow,
+        vector_index_store=vector_index_store,
+        embedding_store=embedding_store,
+        image_preprocessor=image_preprocessor,
+        checkpoint_store=ingestion_checkpoint_store,
+    )
+    ingestion_job_queue = providers.Singleton(JobQueue, SETTINGS.ingestion_queue_path)
+    ingestion_worker_pool = providers.Singleton(
+        JobWorkerPool,
+        queue=ingestion_job_queue,
+        kind=JobKind.INGESTION.value,
+        handler=ingestion_workflow.provided.run_job,
+        workers=SETTINGS.ingestion_workers,
     )
     quiz_generation_workflow = providers.Singleton(
         QuizGenerationWorkflow,
         notion_client=notion_client,
         llm_quiz_generation_workflow=llm_quiz_generation_workflow,
+        question_bank=question_bank,
+        bank_factor=SETTINGS.question_bank_factor,
+    )
+    quiz_cache = providers.Singleton(
+        QuizCache,
+        generate=quiz_generation_workflow.provided.run_for_note,
+        max_workers=SETTINGS.quiz_prefetch_workers,
+    )
+    chat_checkpointer = providers.Singleton(
+        SqliteCheckpointSaver,
+        SETTINGS.chat_checkpoint_path,
+        max_checkpoints_per_thread=SETTINGS.chat_checkpoints_per_thread,
     )
     chatbot_workflow = providers.Singleton(
         ChatbotWorkflow,
@@ -71,16 +143,26 @@ class Container(containers.DeclarativeContainer):
         prompts=prompts["chatbot"],
         notion_toolset=notion_toolset,
         quiz_toolset=quiz_toolset,
+        max_tool_workers=SETTINGS.chatbot_tool_workers,
+        summary_prompts=prompts["chat_summary"],
+        history_token_budget=SETTINGS.chat_history_token_budget,
+        tool_output_tokens=SETTINGS.chat_tool_output_tokens,
+        checkpointer=chat_checkpointer,
     )
 
     # UI Pages
     upload_notes_page = providers.Singleton(
-        UploadNotesPage, ingestion_workflow=ingestion_workflow
+        UploadNotesPage,
+        job_queue=ingestion_job_queue,
+        worker_pool=ingestion_worker_pool,
     )
     revision_page = providers.Singleton(
         RevisionPage,
         notion_client=notion_client,
         quiz_generation_workflow=quiz_generation_workflow,
         llm_quiz_evaluation_workflow=llm_quiz_evaluation_workflow,
+        llm_answer_evaluation_workflow=llm_answer_evaluation_workflow,
+        quiz_cache=quiz_cache,
+        question_bank=question_bank,
     )
     chatbot_page = providers.Singleton(ChatbotPage, chatbot_workflow=chatbot_workflow)
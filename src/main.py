@@ -1,7 +1,8 @@
 import streamlit as st
 from ui.state import ensure_state
 from node_setup import ensure_node_modules
-from utils.constants import Pages
+from config.config import SETTINGS
+from utils.constants import MarkdownConverterBackend, Pages
 from utils.logging import setup_logging
 from utils.styling import load_custom_css
 from di.container import Container
@@ -38,5 +39,6 @@ def main():
 
 
 if __name__ == "__main__":
-    ensure_node_modules()
+    if SETTINGS.markdown_converter == MarkdownConverterBackend.MARTIAN.value:
+        ensure_node_modules()
     main()
@@ -14,7 +14,11 @@ class InputPayload(BaseModel):
     additional_context: Optional[str] | None
 
 
-class B64Payload(InputPayload):
+class B64Payload(BaseModel):
+    # The uploads are not carried past this stage; only their encodings are.
+    chapter_name: str
+    resource_tag: str
+    additional_context: Optional[str] | None
     images_b64: List[str]
 
 
@@ -75,11 +79,20 @@ class LLMQuizEvaluationInput(BaseModel):
     notes_md: str
     qna: List[Dict]
     notion_url: str
+    context_mode: Optional[str] = None
+
+
+class LLMAnswerEvaluationInput(BaseModel):
+    notes_md: str
+    question: str
+    answer: str
+    refs: List[str] = Field(default_factory=list)
 
 
 class LLMQuizGenerationInput(BaseModel):
     notes_md: str
     n_questions: int
+    context_mode: Optional[str] = None
 
 
 class ChatState(TypedDict):
@@ -0,0 +1,32 @@
+"""
+Run ingestion workers outside the Streamlit server.
+
+Usage (from `src/`, with the app's secrets available):
+    python -m scripts.ingestion_worker [workers]
+
+Serves the same SQLite queue as the app, so set `INGESTION_WORKERS=0` for
+the app when jobs should only run here. Stop with Ctrl+C; a job cut short
+is picked up again once its heartbeat goes stale.
+"""
+
+import sys
+import time
+
+from config.config import SETTINGS
+from di.container import Container
+from utils.logging import setup_logging
+
+
+def main(workers: int) -> None:
+    setup_logging()
+    pool = Container().ingestion_worker_pool(workers=workers)
+    pool.start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pool.stop(timeout=5)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else SETTINGS.ingestion_workers)
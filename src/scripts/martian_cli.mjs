@@ -1,5 +1,6 @@
 #!/usr/bin/env node
 import { readFileSync } from "node:fs";
+import { createInterface } from "node:readline";
 import { stdin as input } from "node:process";
 import { markdownToBlocks } from "@tryfabric/martian";
 
@@ -13,17 +14,8 @@ async function readStdin() {
   });
 }
 
-async function main() {
-  const args = process.argv.slice(2);
-  let md;
-
-  if (args[0] && args[0] !== "--stdin") {
-    md = readFileSync(args[0], "utf8");
-  } else {
-    md = await readStdin();
-  }
-
-  const options = {
+function buildOptions() {
+  return {
     enableEmojiCallouts: process.env.MARTIAN_EMOJI_CALLOUTS === "1",
 
     // Set MARTIAN_STRICT_IMAGE_URLS=1 to force external image blocks even for invalid URLs.
@@ -38,12 +30,53 @@ async function main() {
       }
     }
   };
+}
+
+// Worker mode: one JSON request per line on stdin, one JSON response per line on stdout.
+//   request:  {"id": 1, "op": "convert", "markdown": "..."} | {"id": 2, "op": "ping"}
+//   response: {"id": 1, "blocks": [...]} | {"id": 2, "ok": true} | {"id": 1, "error": "..."}
+async function serve(options) {
+  const rl = createInterface({ input, crlfDelay: Infinity });
+  for await (const line of rl) {
+    if (!line.trim()) continue;
+    let id = null;
+    let response;
+    try {
+      const req = JSON.parse(line);
+      id = req.id ?? null;
+      if (req.op === "ping") {
+        response = { id, ok: true };
+      } else {
+        response = { id, blocks: markdownToBlocks(req.markdown ?? "", options) };
+      }
+    } catch (e) {
+      response = { id, error: e && e.stack ? e.stack : String(e) };
+    }
+    process.stdout.write(JSON.stringify(response) + "\n");
+  }
+}
+
+async function main() {
+  const args = process.argv.slice(2);
+  const options = buildOptions();
+
+  if (args[0] === "--worker") {
+    await serve(options);
+    return;
+  }
+
+  let md;
+  if (args[0] && args[0] !== "--stdin") {
+    md = readFileSync(args[0], "utf8");
+  } else {
+    md = await readStdin();
+  }
 
-  const blocks = markdownToBlocks(md, options); 
+  const blocks = markdownToBlocks(md, options);
   process.stdout.write(JSON.stringify(blocks));
 }
 
 main().catch((e) => {
   console.error(e && e.stack ? e.stack : String(e));
   process.exit(1);
-});
\ No newline at end of file
+});
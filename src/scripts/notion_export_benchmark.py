@@ -0,0 +1,96 @@
+"""
+Time page-to-markdown export with notion2md and with `fetch_block_tree`.
+
+Usage (from `src/`):
+    python -m scripts.notion_export_benchmark [latency_ms] [repeats]
+
+Serves the recorded `TEST_MARKDOWN` block tree from a local stub server
+(`tests/notion_stub.py`) that sleeps `latency_ms` (default 100) per request
+to stand in for a Notion round-trip, then exports the page `repeats` times
+(default 3) with notion2md's `StringExporter`, which converts each level's
+siblings on a fresh thread pool, and with `fetch_block_tree` at several
+`max_workers`. Every exporter must render the same markdown; the table
+reports the median wall time and the speedup over notion2md.
+"""
+
+import statistics
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, List
+
+from notion_client import Client
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "tests"))
+
+from notion_stub import load_fixture, serve_block_children  # noqa: E402
+from utils.notion_markdown import (  # noqa: E402
+    fetch_block_tree,
+    list_children,
+    render_markdown,
+)
+
+FIXTURE = load_fixture()
+PAGE_ID = FIXTURE["page_id"]
+STUB_PAGE_SIZE = 100
+WORKER_COUNTS = (1, 2, 4, 8, 16)
+
+
+def export_notion2md(url: str) -> str:
+    from notion2md.exporter.block import StringExporter
+    from notion2md.notion_api import NotionClient as Notion2mdClient
+
+    # notion2md keeps a process-wide client; point it at the stub server.
+    Notion2mdClient("token")._client = Client(auth="token", base_url=url)
+    return StringExporter(block_id=PAGE_ID, token="token").export()
+
+
+def export_parallel(url: str, max_workers: int) -> str:
+    client = Client(auth="token", base_url=url)
+    tree = fetch_block_tree(
+        partial(list_children, client.blocks.children.list),
+        PAGE_ID,
+        max_workers=max_workers,
+    )
+    return render_markdown(PAGE_ID, tree)
+
+
+def _median_sec(export: Callable[[], str], repeats: int, expected: str) -> float:
+    times: List[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        markdown = export()
+        times.append(time.perf_counter() - started)
+        if markdown != expected:
+            raise AssertionError("exports differ from notion2md")
+    return statistics.median(times)
+
+
+def main(latency_ms: float = 100, repeats: int = 3) -> None:
+    n_parents = len(FIXTURE["children"])
+    print(
+        f"{n_parents} parent blocks, {latency_ms:.0f} ms per request, "
+        f"median of {repeats}"
+    )
+    print("| exporter | max_workers | seconds | speedup |")
+    print("|---|---|---|---|")
+    with serve_block_children(FIXTURE, latency_ms / 1000, STUB_PAGE_SIZE) as url:
+        expected = export_notion2md(url)
+        baseline = _median_sec(lambda: export_notion2md(url), repeats, expected)
+        print(f"| notion2md | per level | {baseline:.2f} | 1.00x |")
+        for workers in WORKER_COUNTS:
+            seconds = _median_sec(
+                lambda: export_parallel(url, workers), repeats, expected
+            )
+            print(
+                f"| fetch_block_tree | {workers} | {seconds:.2f} "
+                f"| {baseline / seconds:.2f}x |"
+            )
+
+
+if __name__ == "__main__":
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    )
@@ -0,0 +1,67 @@
+"""
+Compare prompt size and latency of full-notes and retrieval quiz prompts.
+
+Usage (from `src/`, with the app's secrets available):
+    python -m scripts.quiz_context_report <notion_page_id> [n_questions]
+
+Every run makes four LLM calls: one quiz generation and one evaluation per
+mode. Answers are left blank, so the evaluation content itself is not useful.
+"""
+
+import sys
+from typing import List
+
+from di.container import Container
+from utils.constants import QuizContextMode
+from utils.notes_context import PromptReport
+
+
+def _row(stage: str, report: PromptReport) -> str:
+    return (
+        f"| {stage} | {report.mode} | {report.notes_tokens} | "
+        f"{report.full_notes_tokens} | {report.prompt_tokens} | "
+        f"{report.latency_sec:.2f} |"
+    )
+
+
+def main(page_id: str, n_questions: int = 10) -> None:
+    container = Container()
+    notes_md = container.notion_client().fetch_page_markdown(page_id)
+    generation = container.llm_quiz_generation_workflow()
+    evaluation = container.llm_quiz_evaluation_workflow()
+
+    rows: List[str] = []
+    questions = None
+    for mode in (QuizContextMode.FULL.value, QuizContextMode.RETRIEVAL.value):
+        quiz, report = generation.run_with_report(
+            {"notes_md": notes_md, "n_questions": n_questions, "context_mode": mode}
+        )
+        rows.append(_row("generation", report))
+        questions = questions or quiz["questions"]
+
+    qna = [
+        {"question": q["text"], "answer": "", "refs": q.get("refs", [])}
+        for q in questions or []
+    ]
+    for mode in (QuizContextMode.FULL.value, QuizContextMode.RETRIEVAL.value):
+        _, report = evaluation.run_with_report(
+            {
+                "notes_md": notes_md,
+                "qna": qna,
+                "notion_url": page_id,
+                "context_mode": mode,
+            }
+        )
+        rows.append(_row("evaluation", report))
+
+    print(
+        "| stage | mode | notes tokens | full notes tokens | prompt tokens | latency (s) |"
+    )
+    print("|---|---|---|---|---|---|")
+    print("\n".join(rows))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 10)
@@ -0,0 +1,107 @@
+"""
+Measure peak Python memory of turning note uploads into data URLs.
+
+Usage (from `src/`):
+    python -m scripts.upload_memory_benchmark [n_images]
+
+Builds `n_images` uploads (default 50) of a ~2.7 MB noise JPEG and traces
+each stage with tracemalloc. Upload bytes exist before tracing starts, so
+peaks show only what the stages allocate; "held" is what a stage hands to
+the next one. Worker processes are not traced. Noise barely compresses,
+so real notes shrink far more than shown here.
+
+- raw: `convert_file_to_base64` on every upload.
+- preprocessed, batch: the previous preprocessing, which queued every
+  upload at once, kept every re-encoded image and only then built the
+  data URLs.
+- preprocessed, windowed: `ImagePreprocessor.to_data_urls`.
+"""
+
+import gc
+import io
+import sys
+import tracemalloc
+from typing import Callable, List
+
+import numpy as np
+from PIL import Image
+from streamlit.proto.Common_pb2 import FileURLs
+from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
+
+from utils.image_utils import (
+    ImagePreprocessor,
+    _data_url,
+    convert_file_to_base64,
+    preprocess_image,
+)
+
+PREPROCESSOR = ImagePreprocessor()
+
+
+def _uploads(n_images: int) -> List[UploadedFile]:
+    pixels = np.random.default_rng(0).integers(0, 255, (1500, 2000, 3), np.uint8)
+    out = io.BytesIO()
+    Image.fromarray(pixels, "RGB").save(out, format="JPEG", quality=90)
+    return [
+        UploadedFile(
+            UploadedFileRec(f"f{i}", f"page {i}.jpg", "image/jpeg", out.getvalue()),
+            FileURLs(),
+        )
+        for i in range(n_images)
+    ]
+
+
+def encoding_raw(files: List[UploadedFile]) -> List[str]:
+    return [convert_file_to_base64(file) for file in files]
+
+
+def encoding_preprocessed_batch(files: List[UploadedFile]) -> List[str]:
+    images = [file.getvalue() for file in files]
+    prepared = list(
+        PREPROCESSOR._executor().map(
+            preprocess_image,
+            images,
+            [PREPROCESSOR.grayscale] * len(images),
+            [PREPROCESSOR.quality] * len(images),
+        )
+    )
+    return [_data_url(data, mime) for data, mime in prepared]
+
+
+def encoding_preprocessed_windowed(files: List[UploadedFile]) -> List[str]:
+    urls, _ = PREPROCESSOR.to_data_urls([file.getvalue() for file in files])
+    return urls
+
+
+def _measure(stage: Callable[[List[UploadedFile]], List[str]], files) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    held = stage(files)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6, sum(len(s) for s in held) / 1e6
+
+
+def main(n_images: int = 50) -> None:
+    files = _uploads(n_images)
+    upload_mb = sum(file.size for file in files) / 1e6
+    print(f"{n_images} uploads, {upload_mb:.0f} MB in total")
+    print("| stage | peak MB | held MB | peak / upload size |")
+    print("|---|---|---|---|")
+    try:
+        for stage in (
+            encoding_raw,
+            encoding_preprocessed_batch,
+            encoding_preprocessed_windowed,
+        ):
+            peak, held = _measure(stage, files)
+            print(
+                f"| {stage.__name__} | {peak:.1f} | {held:.1f} "
+                f"| {peak / upload_mb:.2f} |"
+            )
+    finally:
+        PREPROCESSOR.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
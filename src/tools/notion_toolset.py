@@ -1,13 +1,16 @@
 import logging
-from clients.notion_client import NotionClient
+from clients.notion_client import NotionClient, revision_generation
 from config.config import SETTINGS
 from langchain_core.tools import StructuredTool
 from typing import Any, List, Dict, Literal
 
 from utils.notion_utils import select_dsa_problem
+from utils.tool_node import ToolCachePolicy
 
 logger = logging.getLogger(__name__)
 
+_DUE_NOTES_TTL_SEC = 5 * 60
+
 
 class NotionToolset:
     """Collection of tools to interact with Notion."""
@@ -19,26 +22,15 @@ class NotionToolset:
         """
         Retrieve notes that are due for revision from the Notion database.
 
-        This method interacts with the Notion client to fetch all notes that are marked as due for revision.
-        It processes the raw data returned by the Notion API and formats it into a list of dictionaries,
-        where each dictionary contains the note's ID, title, properties, and URL.
+        This method streams every due note from the Notion client, following pagination, and keeps
+        only the fields needed to pick and revise a note.
 
         Returns:
-            List[Dict[str, Any]]: A list of dictionaries, each representing a due note with its details,
-            including the note's ID, title, properties, and URL.
+            List[Dict[str, Any]]: A list of dictionaries, each representing a due note with its
+            page ID, title, URL, effort level and next review date.
         """
         logger.info("TOOL_USAGE: Fetching due notes from Notion")
-        due_notes = self.notion_client.fetch_due_notes(SETTINGS.notion_knowledge_db_id)
-        due_notes_formatted = [
-            {
-                "page_id": note["id"],
-                "title": note["properties"]["Name"]["title"][0]["text"]["content"],
-                "properties": note["properties"],
-                "url": note["url"],
-            }
-            for note in due_notes["results"]
-        ]
-        return due_notes_formatted
+        return list(self.notion_client.iter_due_notes(SETTINGS.notion_knowledge_db_id))
 
     def fetch_page_content(self, page_id: str) -> str:
         """
@@ -62,27 +54,16 @@ class NotionToolset:
         """
         Retrieve a DSA problem that is due for revision from the Notion database.
 
-        This method interacts with the Notion client to fetch a DSA problem that is marked as due for revision.
-        It processes the raw data returned by the Notion API and formats it into a dictionary,
-        where the dictionary contains the problem's ID, title, properties, and URL.
+        This method interacts with the Notion client to fetch the DSA problems that are due for revision
+        and picks one of them, weighted towards harder problems. The returned dictionary contains the
+        problem's ID, title, URL, effort level and next review date.
 
         Returns:
             Dict[str, Any] | None: A dictionary representing a due DSA problem with its details, or None if not found.
         """
         logger.info("TOOL_USAGE: Fetching due DSA problem from Notion")
-        response = self.notion_client.fetch_due_notes(SETTINGS.notion_dsa_db_id)
-        selected_problem = select_dsa_problem(response.get("results", []))
-        if not selected_problem:
-            return None
-        problem_formatted = {
-            "page_id": selected_problem["id"],
-            "title": selected_problem["properties"]["Problem"]["title"][0]["text"][
-                "content"
-            ],
-            "properties": selected_problem["properties"],
-            "url": selected_problem["url"],
-        }
-        return problem_formatted
+        problems = list(self.notion_client.iter_due_notes(SETTINGS.notion_dsa_db_id))
+        return select_dsa_problem(problems)
 
     def log_revision(
         self, page_id: str, effort: Literal["Low", "Medium", "High", None] = None
@@ -126,3 +107,16 @@ class NotionToolset:
                 func=self.log_revision,
             ),
         ]
+
+    def cache_policies(self) -> Dict[str, ToolCachePolicy]:
+        # fetch_dsa_problem picks a random problem, so it is never memoized.
+        # fetch_page_content is left to the page cache, which revalidates
+        # each page's last_edited_time, so edits show up on the next call.
+        # Due notes are also dropped whenever any client logs a revision,
+        # e.g. from the revision page, not only through this toolset.
+        return {
+            "fetch_due_notes": ToolCachePolicy(
+                ttl_sec=_DUE_NOTES_TTL_SEC, version=revision_generation
+            ),
+            "log_revision": ToolCachePolicy(invalidates=("fetch_due_notes",)),
+        }
@@ -3,6 +3,7 @@ from clients.notion_client import NotionClient
 from langchain_core.tools import StructuredTool
 from typing import List, Dict, Any
 
+from utils.tool_node import ToolCachePolicy
 from workflows.llm_quiz_evaluation_workflow import LLMQuizEvaluationWorkflow
 from workflows.llm_quiz_generation_workflow import LLMQuizGenerationWorkflow
 
@@ -103,3 +104,7 @@ class QuizToolset:
                 func=self.evaluate_quiz,
             ),
         ]
+
+    def cache_policies(self) -> Dict[str, ToolCachePolicy]:
+        # Quizzes and evaluations are expected to differ between calls.
+        return {}
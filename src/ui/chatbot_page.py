@@ -1,13 +1,19 @@
+import uuid
+from typing import List
+
 import streamlit as st
 from langchain_core.messages import (
     AIMessage,
+    BaseMessage,
     HumanMessage,
-    ToolMessage,
 )
 from ui.Page import Page
 from ui.state import save_state_to_cache
+from utils.constants import ChatStreamEventType
 from workflows.chatbot_workflow import ChatbotWorkflow
 
+GREETING = "Hello! How can I assist you today?"
+
 
 class ChatbotPage(Page):
     """UI for the chatbot page."""
@@ -15,13 +21,44 @@ class ChatbotPage(Page):
     def __init__(self, chatbot_workflow: ChatbotWorkflow):
         self.chatbot_workflow = chatbot_workflow
 
+    @staticmethod
+    def _thread_id() -> str:
+        """The conversation lives in the URL, so it survives reloads and restarts."""
+        thread_id = st.query_params.get("thread")
+        if not thread_id:
+            thread_id = uuid.uuid4().hex
+            st.query_params["thread"] = thread_id
+        return thread_id
+
+    def _messages(self, thread_id: str) -> List[BaseMessage]:
+        """
+        Messages shown for the thread.
+
+        They are read from the checkpointer once per session and then only
+        appended to, and are kept out of the pickled session state.
+        """
+        if st.session_state.get("chatbot_thread_id") != thread_id:
+            st.session_state.chatbot_thread_id = thread_id
+            st.session_state.chatbot_messages = [AIMessage(content=GREETING)] + [
+                m
+                for m in self.chatbot_workflow.history(thread_id)
+                if isinstance(m, HumanMessage)
+                or (isinstance(m, AIMessage) and m.text and not m.tool_calls)
+            ]
+        return st.session_state.chatbot_messages
+
     def render(self):
         st.title("Ask me anything!")
-        for message in st.session_state.chatbot_messages:
+        if st.button("New chat", disabled=st.session_state.chatbot_turn != "human"):
+            st.query_params["thread"] = uuid.uuid4().hex
+            st.rerun()
+        thread_id = self._thread_id()
+        messages = self._messages(thread_id)
+        for message in messages:
             if isinstance(message, HumanMessage):
                 with st.chat_message("user"):
                     st.markdown(message.content)
-            elif isinstance(message, (AIMessage, ToolMessage)):
+            elif isinstance(message, AIMessage):
                 with st.chat_message("assistant"):
                     st.markdown(message.content)
 
@@ -30,25 +67,64 @@ class ChatbotPage(Page):
         ):
             with st.chat_message("user"):
                 st.markdown(prompt)
-            st.session_state.chatbot_messages.append(HumanMessage(content=prompt))
+            messages.append(HumanMessage(content=prompt))
             st.session_state.chatbot_turn = "ai"
             save_state_to_cache()
             st.rerun()
 
+        if st.session_state.chatbot_turn == "ai" and not isinstance(
+            messages[-1], HumanMessage
+        ):
+            # The pending message was lost with the session; nothing to answer.
+            st.session_state.chatbot_turn = "human"
         if st.session_state.chatbot_turn == "ai":
             with st.chat_message("assistant"):
-                with st.spinner("Thinking...", show_time=True):
-                    bot_message = None
-                    try:
-                        response = self.chatbot_workflow.run(
-                            {"messages": st.session_state.chatbot_messages},
-                        )
-                        bot_message = response["messages"][-1]
-                    except Exception as e:
-                        st.error(f"An error occurred: {e}")
-                        bot_message = AIMessage(content="An error occurred.")
-                    finally:
-                        st.session_state.chatbot_messages.append(bot_message)
-                        st.session_state.chatbot_turn = "human"
-                        save_state_to_cache()
-                        st.rerun()
+                bot_message = None
+                try:
+                    bot_message = self._stream_reply(thread_id, messages[-1])
+                except Exception as e:
+                    st.error(f"An error occurred: {e}")
+                finally:
+                    messages.append(
+                        bot_message or AIMessage(content="An error occurred.")
+                    )
+                    st.session_state.chatbot_turn = "human"
+                    save_state_to_cache()
+                    st.rerun()
+
+    def _stream_reply(self, thread_id: str, message: BaseMessage) -> BaseMessage | None:
+        """Send the new message, render the reply as it streams in and return it."""
+        tool_area = st.container()
+        tool_status = None
+        text_placeholder = st.empty()
+        text_placeholder.markdown("_Thinking..._")
+        text = ""
+        for event in self.chatbot_workflow.stream(
+            {"messages": [message]}, thread_id=thread_id
+        ):
+            if event.type == ChatStreamEventType.TOKEN:
+                text += event.text
+                text_placeholder.markdown(text + "▌")
+            elif event.type == ChatStreamEventType.TOOL_START:
+                if tool_status is None:
+                    tool_status = tool_area.status("Using tools...")
+                tool_status.write(f"Running `{event.tool_name}`...")
+                # Text before a tool call is the model's preamble; the reply
+                # proper starts once the tool results are in.
+                text = ""
+                text_placeholder.markdown("_Thinking..._")
+            elif event.type == ChatStreamEventType.TOOL_END and tool_status:
+                if event.cached:
+                    tool_status.write(f"`{event.tool_name}` answered from cache.")
+                else:
+                    tool_status.write(
+                        f"`{event.tool_name}` finished in {event.latency_sec or 0:.1f}s."
+                    )
+            elif event.type == ChatStreamEventType.DONE:
+                if tool_status is not None:
+                    tool_status.update(
+                        label=f"Used tools ({event.tool_sec:.1f}s)", state="complete"
+                    )
+                text_placeholder.markdown(text)
+                return event.message
+        return None
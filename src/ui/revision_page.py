@@ -1,14 +1,21 @@
+import logging
 from clients.notion_client import NotionClient
 from config.config import SETTINGS
 import streamlit as st
-from utils.constants import Label
+from utils.constants import Label, QuizEvaluationMode
+from utils.question_bank import QuestionBank, hash_notes
+from utils.quiz_cache import QuizCache
+from utils.quiz_grading import GradingSession, aggregate_evaluations
 from ui.net_action import net_action
 from ui.state import save_state_to_cache
 from ui.evaluation import render_evaluation
 from ui.Page import Page
+from workflows.llm_answer_evaluation_workflow import LLMAnswerEvaluationWorkflow
 from workflows.llm_quiz_evaluation_workflow import LLMQuizEvaluationWorkflow
 from workflows.quiz_generation_workflow import QuizGenerationWorkflow
 
+logger = logging.getLogger(__name__)
+
 
 class RevisionPage(Page):
     """UI for revision and quiz flow."""
@@ -18,33 +25,36 @@ class RevisionPage(Page):
         notion_client: NotionClient,
         quiz_generation_workflow: QuizGenerationWorkflow,
         llm_quiz_evaluation_workflow: LLMQuizEvaluationWorkflow,
+        llm_answer_evaluation_workflow: LLMAnswerEvaluationWorkflow,
+        quiz_cache: QuizCache,
+        question_bank: QuestionBank,
     ):
         self.notion_client = notion_client
         self.quiz_generation_workflow = quiz_generation_workflow
         self.llm_quiz_evaluation_workflow = llm_quiz_evaluation_workflow
+        self.llm_answer_evaluation_workflow = llm_answer_evaluation_workflow
+        self.quiz_cache = quiz_cache
+        self.question_bank = question_bank
 
     def _list_due_notes(self):
         """Return a list of (name, id, url) tuples for due notes."""
         if not st.session_state["due_notes"]:
             with net_action("Fetching due notes..."):
-                res = self.notion_client.fetch_due_notes(
-                    SETTINGS.notion_knowledge_db_id
-                )
-                st.session_state["due_notes"] = res.get("results", [])
-
-        options = []
-        for note in st.session_state["due_notes"]:
-            props = note.get("properties", {})
-            name = (
-                props.get("Name", {})
-                .get("title", [{}])[0]
-                .get("text", {})
-                .get("content", "")
+                st.session_state["due_notes"] = [
+                    note
+                    for note in self.notion_client.iter_due_notes(
+                        SETTINGS.notion_knowledge_db_id
+                    )
+                    if note["title"] and note["page_id"] and note["url"]
+                ]
+            self.quiz_cache.prefetch(
+                st.session_state["due_notes"], SETTINGS.quiz_prefetch_top_n
             )
-            nid, url = note.get("id"), note.get("url")
-            if name and nid and url:
-                options.append((name, nid, url))
-        return options
+
+        return [
+            (note["title"], note["page_id"], note["url"])
+            for note in st.session_state["due_notes"]
+        ]
 
     def _set_revision_in_progress_true(self):
         st.session_state.revision_in_progress = True
@@ -63,18 +73,66 @@ class RevisionPage(Page):
                 "current_question_idx": -1,
                 "qna": [],
                 "quiz_evaluated": False,
+                "grading_session": GradingSession(),
             }
         )
 
         with net_action("Generating quiz..."):
-            output = self.quiz_generation_workflow.run(
-                {"notion_page_id": selected[1], "notion_url": selected[2]}
+            note = next(
+                (n for n in st.session_state.due_notes if n["page_id"] == selected[1]),
+                {"page_id": selected[1], "url": selected[2]},
             )
+            # The page may have been edited since the due notes were listed;
+            # a quiz prefetched from older notes must not count as a hit.
+            note = {
+                **note,
+                "last_edited_time": self.notion_client.page_last_edited_time(
+                    SETTINGS.notion_knowledge_db_id, note["page_id"]
+                ),
+            }
+            output = self.quiz_cache.get_or_generate(note)
             st.session_state.notes_md = output["notes_md"]
             st.session_state.questions = output["questions"]
             st.session_state.quiz_generated = True
             save_state_to_cache()
 
+    def _notion_url(self) -> str:
+        selected = st.session_state.selected_notion_page
+        return selected[2] if selected else ""
+
+    def _grade_in_background(self, index: int):
+        """Start grading one answer while the user moves on to the next question."""
+        if SETTINGS.quiz_evaluation_mode != QuizEvaluationMode.PER_QUESTION.value:
+            return
+        session = st.session_state.setdefault("grading_session", GradingSession())
+        future = self.llm_answer_evaluation_workflow.submit(
+            {"notes_md": st.session_state.notes_md, **st.session_state.qna[index]}
+        )
+        session.add(index, future)
+
+    def _evaluate_answers(self) -> str:
+        qna = st.session_state.qna
+        if SETTINGS.quiz_evaluation_mode == QuizEvaluationMode.PER_QUESTION.value:
+            # Grades are lost if the session was restored from the state cache.
+            session = st.session_state.setdefault("grading_session", GradingSession())
+            for index in session.missing(len(qna)):
+                self._grade_in_background(index)
+            try:
+                graded = session.results()
+                self.question_bank.record_results(
+                    hash_notes(st.session_state.notes_md), graded
+                )
+                return aggregate_evaluations(graded, self._notion_url())
+            except Exception:
+                logger.exception("Per-question grading failed; evaluating in one call")
+        return self.llm_quiz_evaluation_workflow.run(
+            {
+                "notes_md": st.session_state.notes_md,
+                "qna": qna,
+                "notion_url": self._notion_url(),
+            }
+        )
+
     def _advance_chat_flow(self):
         """Manage chat-driven quiz flow and evaluation."""
         questions = st.session_state.questions
@@ -96,14 +154,15 @@ class RevisionPage(Page):
             if response:
                 answer = {"text": response}
                 st.session_state.messages.append({"role": "user", "content": answer})
+                asked = questions[st.session_state.current_question_idx]
                 st.session_state.qna.append(
                     {
-                        "question": questions[st.session_state.current_question_idx][
-                            "text"
-                        ],
+                        "question": asked["text"],
                         "answer": answer["text"],
+                        "refs": asked.get("refs", []),
                     }
                 )
+                self._grade_in_background(st.session_state.current_question_idx)
                 st.session_state.current_question_idx += 1
                 if st.session_state.current_question_idx < len(questions):
                     cur = questions[st.session_state.current_question_idx]
@@ -117,17 +176,7 @@ class RevisionPage(Page):
         # Evaluate
         if not st.session_state.quiz_evaluated:
             with net_action("Evaluating your answers..."):
-                output = self.llm_quiz_evaluation_workflow.run(
-                    {
-                        "notes_md": st.session_state.notes_md,
-                        "qna": st.session_state.qna,
-                        "notion_url": (
-                            st.session_state.selected_notion_page[2]
-                            if st.session_state.selected_notion_page
-                            else ""
-                        ),
-                    }
-                )
+                output = self._evaluate_answers()
                 st.session_state.evaluation_output = output
                 st.session_state.quiz_evaluated = True
                 save_state_to_cache()
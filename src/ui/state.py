@@ -1,5 +1,4 @@
 import streamlit as st
-from langchain_core.messages import AIMessage
 from utils.constants import STATE_KEYS
 
 
@@ -40,10 +39,8 @@ def ensure_state():
         "quiz_generated": False,
         "quiz_evaluated": False,
         "evaluation_output": "",
-        "ingestion_in_progress": False,
         "revision_in_progress": False,
         "revision_logged": False,
-        "chatbot_messages": [AIMessage(content="Hello! How can I assist you today?")],
         "chatbot_turn": "human",
     }
     for key, value in defaults.items():
@@ -1,23 +1,83 @@
 import streamlit as st
-from utils.constants import Label, Keys
-from ui.net_action import net_action
-from ui.state import save_state_to_cache
+from utils.constants import JobKind, JobStatus, Label, Keys
+from utils.job_queue import Job, JobFile, JobQueue, JobWorkerPool
 from ui.Page import Page
-from workflows.ingestion_workflow import IngestionWorkflow
+from workflows.ingestion_workflow import format_ingestion_report
+
+JOB_POLL_SEC = 2
+RECENT_JOBS = 5
+
+
+@st.cache_resource(show_spinner=False)
+def _start_workers(_pool: JobWorkerPool) -> JobWorkerPool:
+    """Start the in-app ingestion workers once per server process."""
+    if _pool.workers:
+        _pool.start()
+    return _pool
 
 
 class UploadNotesPage(Page):
-    """UI for uploading and ingesting notes."""
+    """UI for uploading notes and following their background ingestion."""
+
+    def __init__(self, job_queue: JobQueue, worker_pool: JobWorkerPool):
+        self.job_queue = job_queue
+        self.worker_pool = worker_pool
+
+    def _enqueue(self, chapter_name, resource_tag, context, files) -> str:
+        return self.job_queue.enqueue(
+            JobKind.INGESTION.value,
+            {
+                "chapter_name": chapter_name,
+                "resource_tag": resource_tag,
+                "additional_context": context,
+            },
+            [
+                JobFile(file.name, file.type or "image/jpeg", file.getvalue())
+                for file in files
+            ],
+        )
+
+    def _recent_jobs(self):
+        return self.job_queue.recent(JobKind.INGESTION.value, RECENT_JOBS)
 
-    def __init__(self, ingestion_workflow: IngestionWorkflow):
-        self.ingestion_workflow = ingestion_workflow
+    def _render_job(self, job: Job):
+        title = f"{job.payload['chapter_name']} ({job.payload['resource_tag']})"
+        if job.status == JobStatus.SUCCEEDED.value:
+            st.success(f"{title}: notes ingested.")
+            if job.result:
+                if job.result.get("failed_pages"):
+                    pages = ", ".join(str(p) for p in job.result["failed_pages"])
+                    st.warning(
+                        f"{title}: pages {pages} could not be transcribed and are "
+                        "marked with ?? in the notes. Upload them again to add "
+                        "their content."
+                    )
+                st.caption(format_ingestion_report(job.result))
+        elif job.status == JobStatus.FAILED.value:
+            st.error(f"{title}: {job.error}")
+            st.button(
+                "Retry",
+                key=f"retry-{job.id}",
+                on_click=self.job_queue.retry,
+                args=(job.id,),
+            )
+        else:
+            st.progress(job.progress, text=f"{title}: {job.stage or job.status}...")
 
-    def _set_ingestion_in_progress_true(self):
-        st.session_state.ingestion_in_progress = True
-        save_state_to_cache()
+    def _render_jobs(self, polling: bool):
+        jobs = self._recent_jobs()
+        if not jobs:
+            return
+        st.subheader("Recent uploads")
+        for job in jobs:
+            self._render_job(job)
+        if polling and all(job.finished for job in jobs):
+            # Rerun the whole page so the finished list stops polling.
+            st.rerun(scope="app")
 
     def render(self):
         st.title("Upload Notes!")
+        _start_workers(self.worker_pool)
         with st.form("notes_form", clear_on_submit=True):
             chapter_name = st.text_input(
                 Label.CHAPTER_NAME.value + Label.MANDATORY_FIELD_MARKER.value,
@@ -34,33 +94,17 @@ class UploadNotesPage(Page):
                 accept_multiple_files=True,
                 key=Keys.FILE_UPLOAD.value,
             )
-            submitted = st.form_submit_button(
-                Label.SUBMIT_BUTTON.value,
-                disabled=st.session_state.ingestion_in_progress,
-                on_click=self._set_ingestion_in_progress_true,
-            )
+            submitted = st.form_submit_button(Label.SUBMIT_BUTTON.value)
 
-        if not submitted:
-            return
-
-        if not chapter_name or not resource_tag or not files:
-            st.error("Chapter, Resource Tag and at least one file are required.")
-            return
+        if submitted:
+            if not chapter_name or not resource_tag or not files:
+                st.error("Chapter, Resource Tag and at least one file are required.")
+            else:
+                self._enqueue(chapter_name, resource_tag, context, files)
+                st.toast(f"Queued {chapter_name} for ingestion.")
 
-        try:
-            tracker = st.progress(0)
-            with net_action("Ingesting notes..."):
-                self.ingestion_workflow.run(
-                    {
-                        "chapter_name": chapter_name,
-                        "resource_tag": resource_tag,
-                        "files": files,
-                        "additional_context": context,
-                        "progress_tracker": tracker,
-                    },
-                )
-            tracker.progress(1.0, "completed")
-            st.success("Notes ingested.")
-            save_state_to_cache()
-        except Exception as e:
-            st.error(str(e))
+        # Jobs live in the queue, so progress survives reruns and reloads.
+        polling = not all(job.finished for job in self._recent_jobs())
+        st.fragment(self._render_jobs, run_every=JOB_POLL_SEC if polling else None)(
+            polling
+        )
@@ -0,0 +1,56 @@
+import hashlib
+import logging
+from typing import Any, Dict, List, Protocol
+
+from utils.disk_cache import DiskCache
+from utils.notion_utils import split_top_level_sections
+
+logger = logging.getLogger(__name__)
+
+
+class BlockConverter(Protocol):
+    def run(self, markdown: str) -> List[Dict[str, Any]]: ...
+
+
+class CachedMarkdownConverter:
+    """
+    Wraps a markdown converter with a content-addressed `DiskCache`.
+
+    The whole document is looked up first; on a miss each top-level section is
+    looked up on its own, so only sections whose markdown changed are converted.
+    """
+
+    def __init__(self, converter: BlockConverter, cache: DiskCache):
+        self.converter = converter
+        self.cache = cache
+        # Different backends produce different blocks for the same markdown.
+        self._namespace = type(converter).__name__
+
+    def _key(self, markdown: str) -> str:
+        payload = f"{self._namespace}\0{markdown}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _convert(self, markdown: str) -> List[Dict[str, Any]]:
+        key = self._key(markdown)
+        blocks = self.cache.get(key)
+        if blocks is None:
+            blocks = self.converter.run(markdown)
+            self.cache.put(key, blocks)
+        return blocks
+
+    def run(self, markdown: str) -> List[Dict[str, Any]]:
+        doc_key = self._key(markdown)
+        blocks = self.cache.get(doc_key)
+        if blocks is not None:
+            return blocks
+        sections = split_top_level_sections(markdown)
+        if len(sections) == 1:
+            blocks = self.converter.run(markdown)
+        else:
+            blocks = []
+            for section in sections:
+                if section.strip():
+                    blocks += self._convert(section)
+        self.cache.put(doc_key, blocks)
+        logger.info("Block cache stats: %s", self.cache.stats())
+        return blocks
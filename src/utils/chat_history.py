@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Sequence, Tuple
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from utils.embedding_utils import count_tokens_many, get_encoder
+
+logger = logging.getLogger(__name__)
+
+# Called with the previous summary ("" for none) and a transcript of the
+# messages to fold into it; returns the new summary.
+Summarize = Callable[[str, str], str]
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+# Per-message overhead of the chat format (role and separators).
+_MESSAGE_OVERHEAD_TOKENS = 4
+_SUMMARY_CACHE_SIZE = 256
+
+
+def _text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else message.text
+
+
+def _truncate(text: str, max_tokens: int) -> Tuple[str, int]:
+    """Return `text` cut to `max_tokens` and how many tokens were dropped."""
+    encoder = get_encoder()
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text, 0
+    return encoder.decode(tokens[:max_tokens]), len(tokens) - max_tokens
+
+
+def messages_tokens(messages: Sequence[BaseMessage]) -> List[int]:
+    """Token count of each message, encoding uncached texts in one batch."""
+    texts = [_text(m) for m in messages]
+    calls = [
+        (i, json.dumps(m.tool_calls, default=str))
+        for i, m in enumerate(messages)
+        if isinstance(m, AIMessage) and m.tool_calls
+    ]
+    counts = count_tokens_many(texts + [call for _, call in calls])
+    tokens = [n + _MESSAGE_OVERHEAD_TOKENS for n in counts[: len(messages)]]
+    for (i, _), n in zip(calls, counts[len(messages) :]):
+        tokens[i] += n
+    return tokens
+
+
+def message_tokens(message: BaseMessage) -> int:
+    return messages_tokens([message])[0]
+
+
+def transcript(messages: Sequence[BaseMessage]) -> str:
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"User: {_text(message)}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"Tool result ({message.name}): {_text(message)}")
+        elif isinstance(message, AIMessage):
+            calls = ", ".join(call["name"] for call in message.tool_calls)
+            text = _text(message)
+            if calls:
+                text = f"{text} [called tools: {calls}]".strip()
+            lines.append(f"Assistant: {text}")
+    return "\n".join(lines)
+
+
+class ChatHistoryManager:
+    """
+    Keeps the chat history sent to the model within a token budget.
+
+    Tool results from earlier turns are cut to `tool_output_tokens`. When
+    the history is still over budget, the oldest whole turns are folded into
+    a running summary sent as a system message. Summaries are cached by a
+    digest of the messages they cover, so a later turn only summarizes the
+    turns folded since the last summary. Folding leaves the recent turns at
+    half the remaining budget, so summaries are recomputed every few turns
+    rather than every turn.
+
+    The current turn is never folded or cut, so one huge turn can still
+    exceed the budget.
+    """
+
+    def __init__(
+        self,
+        summarize: Summarize,
+        token_budget: int = 6000,
+        tool_output_tokens: int = 400,
+    ):
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.tool_output_tokens = tool_output_tokens
+        self.summary_tokens = token_budget // 4
+        self._lock = threading.Lock()
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+
+    def _elide_tool_outputs(self, messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+        current_turn = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+            default=0,
+        )
+        elided = []
+        for i, message in enumerate(messages):
+            if isinstance(message, ToolMessage) and i < current_turn:
+                text, dropped = _truncate(_text(message), self.tool_output_tokens)
+                if dropped:
+                    message = message.model_copy(
+                        update={
+                            "content": f"{text}\n[... {dropped} more tokens elided]"
+                        }
+                    )
+            elided.append(message)
+        return elided
+
+    def _cached_summary(self, digest: str) -> str | None:
+        with self._lock:
+            summary = self._summaries.get(digest)
+            if summary is not None:
+                self._summaries.move_to_end(digest)
+            return summary
+
+    def _store_summary(self, digest: str, summary: str) -> None:
+        with self._lock:
+            self._summaries[digest] = summary
+            while len(self._summaries) > _SUMMARY_CACHE_SIZE:
+                self._summaries.popitem(last=False)
+
+    def prepare(self, history: Sequence[BaseMessage]) -> List[BaseMessage]:
+        """Return the messages to send, without the system prompt."""
+        messages = self._elide_tool_outputs(
+            [m for m in history if not isinstance(m, SystemMessage)]
+        )
+        tokens = messages_tokens(messages)
+        if sum(tokens) <= self.token_budget:
+            return messages
+
+        # Turns start at human messages, so a tool call is never split from
+        # its results. digests[i] identifies the prefix messages[:i].
+        boundaries, digests = [], {0: ""}
+        rolling = hashlib.sha256()
+        for i, message in enumerate(messages):
+            if i and isinstance(message, HumanMessage):
+                boundaries.append(i)
+                digests[i] = rolling.hexdigest()
+            rolling.update(f"{message.type}\x00{_text(message)}\x00".encode("utf-8"))
+        if not boundaries:
+            return messages
+
+        def suffix_tokens(cut: int) -> int:
+            return sum(tokens[cut:])
+
+        recent_budget = self.token_budget - self.summary_tokens
+        cached = [b for b in boundaries if self._cached_summary(digests[b])]
+        # The current turn cannot be folded, so the last boundary always "fits".
+        fitting = [
+            b
+            for b in cached
+            if suffix_tokens(b) <= recent_budget or b == boundaries[-1]
+        ]
+        if fitting:
+            cut = fitting[0]
+            summary = self._cached_summary(digests[cut])
+        else:
+            cut = next(
+                (b for b in boundaries if suffix_tokens(b) <= recent_budget // 2),
+                boundaries[-1],
+            )
+            start = max((b for b in cached if b < cut), default=0)
+            previous = self._cached_summary(digests[start]) if start else ""
+            summary = self.summarize(previous, transcript(messages[start:cut]))
+            summary, _ = _truncate(summary, self.summary_tokens)
+            self._store_summary(digests[cut], summary)
+            logger.info("Folded %d chat messages into the running summary", cut - start)
+
+        return [SystemMessage(content=SUMMARY_PREFIX + summary)] + messages[cut:]
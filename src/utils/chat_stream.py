@@ -0,0 +1,120 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Tuple
+
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    ToolMessage,
+)
+
+from utils.constants import ChatStreamEventType
+
+logger = logging.getLogger(__name__)
+
+# `(mode, payload)` pairs from `graph.stream(..., stream_mode=["messages", "values"])`.
+StreamPart = Tuple[str, Any]
+
+
+@dataclass
+class ChatStreamEvent:
+    type: ChatStreamEventType
+    text: str = ""
+    tool_name: str | None = None
+    tool_call_id: str | None = None
+    message: BaseMessage | None = None
+    latency_sec: float | None = None
+    cached: bool = False
+    first_token_sec: float | None = None
+    total_sec: float | None = None
+    tool_sec: float = 0.0
+
+
+def chat_stream_events(
+    parts: Iterable[StreamPart], clock: Callable[[], float] = time.perf_counter
+) -> Iterator[ChatStreamEvent]:
+    """
+    Translate LangGraph "messages" and "values" stream parts into chat events.
+
+    Token chunks become TOKEN events and tool calls become TOOL_START/TOOL_END
+    pairs. Messages a node returns without streaming (e.g. ToolNode output)
+    are reported whole. The final DONE event carries the last message of the
+    final graph state along with time-to-first-token and total latency.
+    """
+    started = clock()
+    first_token_sec = None
+    streamed_ids: set[str] = set()
+    started_calls: set[str] = set()
+    final_state: dict = {}
+    tool_sec = 0.0
+
+    def _token(text: str) -> ChatStreamEvent:
+        nonlocal first_token_sec
+        if first_token_sec is None:
+            first_token_sec = clock() - started
+        return ChatStreamEvent(ChatStreamEventType.TOKEN, text=text)
+
+    for mode, payload in parts:
+        if mode == "values":
+            final_state = payload
+            continue
+        message, _metadata = payload
+
+        if isinstance(message, AIMessageChunk):
+            if message.id:
+                streamed_ids.add(message.id)
+            # Only the first chunk of a streamed tool call carries its name.
+            for chunk in message.tool_call_chunks:
+                if chunk.get("name") and chunk.get("id") not in started_calls:
+                    started_calls.add(chunk.get("id"))
+                    yield ChatStreamEvent(
+                        ChatStreamEventType.TOOL_START,
+                        tool_name=chunk["name"],
+                        tool_call_id=chunk.get("id"),
+                    )
+            if isinstance(message.content, str) and message.content:
+                yield _token(message.content)
+
+        elif isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                if call.get("id") not in started_calls:
+                    started_calls.add(call.get("id"))
+                    yield ChatStreamEvent(
+                        ChatStreamEventType.TOOL_START,
+                        tool_name=call["name"],
+                        tool_call_id=call.get("id"),
+                    )
+            if message.id not in streamed_ids and message.content:
+                yield _token(message.text)
+
+        elif isinstance(message, ToolMessage):
+            latency_sec = message.response_metadata.get("latency_sec")
+            tool_sec += latency_sec or 0.0
+            yield ChatStreamEvent(
+                ChatStreamEventType.TOOL_END,
+                text=message.text,
+                tool_name=message.name,
+                tool_call_id=message.tool_call_id,
+                message=message,
+                latency_sec=latency_sec,
+                cached=bool(message.response_metadata.get("cached")),
+            )
+
+    messages = final_state.get("messages") or []
+    total_sec = clock() - started
+    logger.info(
+        "Chat turn streamed: first token after %s, finished after %.2fs"
+        " (%.2fs in tools)",
+        f"{first_token_sec:.2f}s" if first_token_sec is not None else "n/a",
+        total_sec,
+        tool_sec,
+    )
+    yield ChatStreamEvent(
+        ChatStreamEventType.DONE,
+        message=messages[-1] if messages else None,
+        first_token_sec=first_token_sec,
+        total_sec=total_sec,
+        tool_sec=tool_sec,
+    )
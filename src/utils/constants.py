@@ -12,10 +12,8 @@ STATE_KEYS = [
     "quiz_generated",
     "quiz_evaluated",
     "evaluation_output",
-    "ingestion_in_progress",
     "revision_in_progress",
     "revision_logged",
-    "chatbot_messages",
     "chatbot_turn",
 ]
 
@@ -40,6 +38,31 @@ class EnvConstants(Enum):
     S3_BUCKET_NAME = "S3_BUCKET_NAME"
 
 
+class MarkdownConverterBackend(Enum):
+    PYTHON = "python"
+    MARTIAN = "martian"
+
+
+class MarkdownOcrMode(Enum):
+    SINGLE = "single"
+    GROUPED = "grouped"
+
+
+class EmbeddingProvider(Enum):
+    OPENAI = "openai"
+    HASH = "hash"
+
+
+class QuizContextMode(Enum):
+    FULL = "full"
+    RETRIEVAL = "retrieval"
+
+
+class QuizEvaluationMode(Enum):
+    PER_QUESTION = "per_question"
+    BATCH = "batch"
+
+
 class ChunkConstants(Enum):
     SIZE_LIMIT_TOKENS = 1200
     CHUNK_SIZE_TOKENS = 900
@@ -73,3 +96,29 @@ class Pages(Enum):
         "key": "revision",
         "title": ":material/replay: Revision Mode",
     }
+
+
+class ChatStreamEventType(Enum):
+    TOKEN = "token"
+    TOOL_START = "tool_start"
+    TOOL_END = "tool_end"
+    DONE = "done"
+
+
+class JobKind(Enum):
+    INGESTION = "ingestion"
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class IngestionStage(Enum):
+    # In chain order; a checkpoint at one stage implies all earlier ones.
+    IMAGES_ENCODED = "images_encoded"
+    MARKDOWN_BUILT = "markdown_built"
+    NOTION_PAGE_STARTED = "notion_page_started"
+    NOTION_PAGE_WRITTEN = "notion_page_written"
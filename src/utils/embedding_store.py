@@ -0,0 +1,184 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Protocol, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class Embedder(Protocol):
+    """The subset of LangChain's `Embeddings` interface used for indexing."""
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]: ...
+
+    def embed_query(self, text: str) -> List[float]: ...
+
+
+class HashEmbedder:
+    """
+    Deterministic local embedder based on feature hashing of word tokens.
+
+    Texts sharing words get similar vectors, which is enough for tests and
+    offline runs without an embeddings API.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.model = f"hash-{dim}"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = int.from_bytes(
+                hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big"
+            )
+            vector[digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+@dataclass
+class EmbeddingStats:
+    hits: int = 0
+    misses: int = 0
+    batches: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class EmbeddingStore:
+    """
+    Embeds chunks through an `Embedder`, caching vectors in SQLite by
+    `(model, content_hash)` so unchanged chunks are never embedded twice.
+
+    Uncached texts are sent in batches of at most `max_batch_size`, with up to
+    `max_concurrency` batches in flight.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        model: str,
+        cache_path: str | Path,
+        max_batch_size: int = 256,
+        max_concurrency: int = 4,
+    ):
+        self.embedder = embedder
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        if str(cache_path) != ":memory:":
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(cache_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " content_hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, content_hash))"
+            )
+
+    def _lookup(self, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for i in range(0, len(unique), 500):
+                part = unique[i : i + 500]
+                rows = self._conn.execute(
+                    "SELECT content_hash, vector FROM embeddings WHERE model = ?"
+                    f" AND content_hash IN ({', '.join('?' for _ in part)})",
+                    (self.model, *part),
+                )
+                for content_hash, blob in rows:
+                    found[content_hash] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def _store(self, vectors: Dict[str, np.ndarray]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, content_hash, vector)"
+                " VALUES (?, ?, ?)",
+                [
+                    (self.model, content_hash, vector.astype(np.float32).tobytes())
+                    for content_hash, vector in vectors.items()
+                ],
+            )
+
+    def embed(
+        self, texts: Sequence[str], content_hashes: Sequence[str]
+    ) -> Tuple[np.ndarray, EmbeddingStats]:
+        """Return one vector per text, in order, and the cache stats of this call."""
+        if len(texts) != len(content_hashes):
+            raise ValueError("Expected one content hash per text")
+        stats = EmbeddingStats()
+        vectors = self._lookup(content_hashes)
+        pending: Dict[str, str] = {}
+        for text, content_hash in zip(texts, content_hashes):
+            if content_hash in vectors:
+                stats.hits += 1
+            elif content_hash not in pending:
+                pending[content_hash] = text
+                stats.misses += 1
+            else:
+                stats.hits += 1
+
+        if pending:
+            hashes = list(pending)
+            batches = [
+                hashes[i : i + self.max_batch_size]
+                for i in range(0, len(hashes), self.max_batch_size)
+            ]
+            stats.batches = len(batches)
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_concurrency, len(batches))
+            ) as pool:
+                results = pool.map(
+                    lambda batch: self.embedder.embed_documents(
+                        [pending[h] for h in batch]
+                    ),
+                    batches,
+                )
+                fresh: Dict[str, np.ndarray] = {}
+                for batch, embedded in zip(batches, results):
+                    for content_hash, vector in zip(batch, embedded):
+                        fresh[content_hash] = np.asarray(vector, dtype=np.float32)
+            self._store(fresh)
+            vectors.update(fresh)
+
+        logger.info(
+            "Embedded %d chunks with %s: %d cached, %d new in %d batches "
+            "(hit rate %.0f%%)",
+            len(texts),
+            self.model,
+            stats.hits,
+            stats.misses,
+            stats.batches,
+            stats.hit_rate * 100,
+        )
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32), stats
+        return np.stack([vectors[h] for h in content_hashes]), stats
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return np.asarray(self.embedder.embed_query(text), dtype=np.float32)
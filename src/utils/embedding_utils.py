@@ -1,6 +1,79 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
 import tiktoken
 
+DEFAULT_ENCODING = "cl100k_base"
+_COUNT_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=None)
+def get_encoder(model: str = DEFAULT_ENCODING) -> tiktoken.Encoding:
+    """Return the process-wide encoder for a model or encoding name."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(model)
+
+
+class _CountCache:
+    """Thread-safe LRU of token counts keyed by (model, text)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._counts: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str]) -> int | None:
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+            return count
+
+    def put(self, key: Tuple[str, str], count: int) -> None:
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+_counts = _CountCache(_COUNT_CACHE_SIZE)
+
+
+def count_tokens(text: str, model: str = DEFAULT_ENCODING) -> int:
+    key = (model, text)
+    count = _counts.get(key)
+    if count is None:
+        count = len(get_encoder(model).encode(text, disallowed_special=()))
+        _counts.put(key, count)
+    return count
+
 
-def count_tokens(text: str) -> int:
-    _ENC = tiktoken.get_encoding("cl100k_base")
-    return len(_ENC.encode(text))
+def count_tokens_many(
+    texts: Sequence[str],
+    model: str = DEFAULT_ENCODING,
+    num_threads: int | None = None,
+) -> List[int]:
+    """Count tokens for many texts, encoding uncached ones in one threaded batch."""
+    counts: List[int | None] = [_counts.get((model, text)) for text in texts]
+    missing = list(dict.fromkeys(t for t, c in zip(texts, counts) if c is None))
+    if missing:
+        encoded = get_encoder(model).encode_batch(
+            missing,
+            num_threads=num_threads or min(8, os.cpu_count() or 1),
+            disallowed_special=(),
+        )
+        fresh = {text: len(tokens) for text, tokens in zip(missing, encoded)}
+        for text, count in fresh.items():
+            _counts.put((model, text), count)
+        counts = [fresh[t] if c is None else c for t, c in zip(texts, counts)]
+    return counts  # type: ignore[return-value]
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+from utils.constants import IngestionStage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingestion_checkpoints (
+    input_hash TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    image_refs TEXT NOT NULL,
+    markdown TEXT,
+    notion_page TEXT,
+    blocks_written INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def ingestion_input_hash(
+    chapter_name: str,
+    resource_tag: str,
+    additional_context: str | None,
+    images: Sequence[bytes],
+) -> str:
+    """Digest of everything an ingestion run's outputs depend on."""
+    digest = hashlib.sha256()
+    for text in (chapter_name, resource_tag, additional_context or ""):
+        digest.update(text.encode("utf-8") + b"\0")
+    for image in images:
+        digest.update(hashlib.sha256(image).digest())
+    return digest.hexdigest()
+
+
+def image_ref(data_url: str) -> str:
+    return hashlib.sha256(data_url.encode("ascii")).hexdigest()[:16]
+
+
+@dataclass
+class IngestionCheckpoint:
+    """Outputs of the completed stages of one ingestion run."""
+
+    input_hash: str
+    job_id: str = ""
+    stage: str = ""
+    image_refs: List[str] = field(default_factory=list)
+    markdown: str | None = None
+    notion_page: Dict[str, Any] | None = None
+    blocks_written: int = 0
+
+    def reached(self, stage: IngestionStage) -> bool:
+        order = list(IngestionStage)
+        return bool(self.stage) and order.index(
+            IngestionStage(self.stage)
+        ) >= order.index(stage)
+
+
+class IngestionCheckpointStore:
+    """
+    Per-stage outputs of ingestion runs, keyed by input hash.
+
+    Any run of the same input resumes a failed one, whether it retries the
+    same job or the notes were uploaded again as a new job; the job id only
+    records which run owns it. `claim` hands a checkpoint to one run at a
+    time, so a second upload of notes that are still being ingested fails
+    instead of writing the same page twice. Images are recorded by
+    reference: encoding them again is cheap and only needed until the
+    markdown exists. A checkpoint is cleared once its run finishes, so
+    uploading notes that were ingested before ingests them again.
+    """
+
+    def __init__(self, db_path: str | Path):
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def load(self, input_hash: str, job_id: str = "") -> IngestionCheckpoint:
+        """Return the checkpoint left for `input_hash`, or an empty one."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage, image_refs, markdown, notion_page, blocks_written"
+                " FROM ingestion_checkpoints WHERE input_hash = ?",
+                (input_hash,),
+            ).fetchone()
+        if row is None:
+            return IngestionCheckpoint(input_hash, job_id)
+        return IngestionCheckpoint(
+            input_hash=input_hash,
+            job_id=job_id,
+            stage=row[0],
+            image_refs=json.loads(row[1]),
+            markdown=row[2],
+            notion_page=json.loads(row[3]) if row[3] else None,
+            blocks_written=row[4],
+        )
+
+    def claim(
+        self,
+        input_hash: str,
+        job_id: str,
+        is_running: Callable[[str], bool] | None = None,
+    ) -> IngestionCheckpoint:
+        """
+        Take over the checkpoint for `input_hash` on behalf of `job_id`.
+
+        The check and the takeover are one transaction. While `is_running`
+        reports the owning job alive, another job's claim raises
+        RuntimeError. Without `is_running`, as for runs outside the job
+        queue, owners are never considered alive.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT job_id FROM ingestion_checkpoints WHERE input_hash = ?",
+                (input_hash,),
+            ).fetchone()
+            owner = row[0] if row else ""
+            if owner and owner != job_id and is_running and is_running(owner):
+                raise RuntimeError(
+                    f"These notes are already being ingested by job {owner}; "
+                    "retry once it has finished."
+                )
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO ingestion_checkpoints"
+                    " (input_hash, job_id, stage, image_refs, updated_at)"
+                    " VALUES (?, ?, '', '[]', ?)",
+                    (input_hash, job_id, time.time()),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE ingestion_checkpoints SET job_id = ?, updated_at = ?"
+                    " WHERE input_hash = ?",
+                    (job_id, time.time(), input_hash),
+                )
+        return self.load(input_hash, job_id)
+
+    def save(self, checkpoint: IngestionCheckpoint, stage: IngestionStage) -> None:
+        checkpoint.stage = stage.value
+        with self._lock, self._conn:
+            # A run whose checkpoint was taken over no longer records progress.
+            self._conn.execute(
+                "INSERT INTO ingestion_checkpoints"
+                " (input_hash, job_id, stage, image_refs, markdown, notion_page,"
+                " blocks_written, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(input_hash) DO UPDATE SET stage = excluded.stage,"
+                " image_refs = excluded.image_refs, markdown = excluded.markdown,"
+                " notion_page = excluded.notion_page,"
+                " blocks_written = excluded.blocks_written,"
+                " updated_at = excluded.updated_at"
+                " WHERE job_id = excluded.job_id",
+                (
+                    checkpoint.input_hash,
+                    checkpoint.job_id,
+                    checkpoint.stage,
+                    json.dumps(checkpoint.image_refs),
+                    checkpoint.markdown,
+                    (
+                        json.dumps(checkpoint.notion_page)
+                        if checkpoint.notion_page is not None
+                        else None
+                    ),
+                    checkpoint.blocks_written,
+                    time.time(),
+                ),
+            )
+
+    def clear(self, checkpoint: IngestionCheckpoint) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM ingestion_checkpoints WHERE input_hash = ? AND job_id = ?",
+                (checkpoint.input_hash, checkpoint.job_id),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
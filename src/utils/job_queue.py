@@ -0,0 +1,377 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from utils.constants import JobStatus
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    stage TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (kind, status, created_at);
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+_COLUMNS = (
+    "id, kind, status, payload, progress, stage, result, error, attempts,"
+    " created_at, updated_at"
+)
+
+
+@dataclass(frozen=True)
+class JobFile:
+    name: str
+    type: str
+    data: bytes
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str
+    payload: Dict[str, Any]
+    progress: float
+    stage: str
+    result: Dict[str, Any] | None
+    error: str | None
+    attempts: int
+    created_at: float
+    updated_at: float
+    files: List[JobFile] = field(default_factory=list)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value)
+
+
+def _job(row: tuple) -> Job:
+    return Job(
+        id=row[0],
+        kind=row[1],
+        status=row[2],
+        payload=json.loads(row[3]),
+        progress=row[4],
+        stage=row[5],
+        result=json.loads(row[6]) if row[6] else None,
+        error=row[7],
+        attempts=row[8],
+        created_at=row[9],
+        updated_at=row[10],
+    )
+
+
+class JobQueue:
+    """
+    Persistent queue of background jobs in a local SQLite file.
+
+    Several processes can share one file: a job is claimed by a single
+    atomic update, and its worker keeps a heartbeat so a job whose worker
+    died is handed to another one, up to `max_attempts` claims in total.
+    Uploaded files travel with the job and are dropped once it succeeds.
+    """
+
+    def __init__(self, db_path: str | Path):
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def enqueue(
+        self, kind: str, payload: Dict[str, Any], files: Sequence[JobFile] = ()
+    ) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, JobStatus.QUEUED.value, json.dumps(payload), now, now),
+            )
+            self._conn.executemany(
+                "INSERT INTO job_files (job_id, idx, name, type, data)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(job_id, idx, f.name, f.type, f.data) for idx, f in enumerate(files)],
+            )
+        return job_id
+
+    def claim(
+        self,
+        kind: str,
+        worker: str,
+        stale_after_sec: float = 60.0,
+        max_attempts: int = 2,
+    ) -> Job | None:
+        """Take the oldest queued (or abandoned) job of `kind`, with its files."""
+        now = time.time()
+        stale = now - stale_after_sec
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ?"
+                " WHERE kind = ? AND status = ? AND heartbeat_at < ?"
+                " AND attempts >= ?",
+                (
+                    JobStatus.FAILED.value,
+                    "The worker running this job stopped responding.",
+                    now,
+                    kind,
+                    JobStatus.RUNNING.value,
+                    stale,
+                    max_attempts,
+                ),
+            )
+            rows = self._conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1,"
+                " heartbeat_at = ?, updated_at = ?, error = NULL"
+                " WHERE id = (SELECT id FROM jobs WHERE kind = ?"
+                " AND (status = ? OR (status = ? AND heartbeat_at < ?))"
+                " ORDER BY created_at LIMIT 1)"
+                f" RETURNING {_COLUMNS}",
+                (
+                    JobStatus.RUNNING.value,
+                    worker,
+                    now,
+                    now,
+                    kind,
+                    JobStatus.QUEUED.value,
+                    JobStatus.RUNNING.value,
+                    stale,
+                ),
+            ).fetchall()
+            if not rows:
+                return None
+            job = _job(rows[0])
+            job.files = [
+                JobFile(name, type_, data)
+                for name, type_, data in self._conn.execute(
+                    "SELECT name, type, data FROM job_files WHERE job_id = ?"
+                    " ORDER BY idx",
+                    (job.id,),
+                )
+            ]
+        return job
+
+    def heartbeat(self, job_ids: Sequence[str]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?",
+                [(now, job_id, JobStatus.RUNNING.value) for job_id in job_ids],
+            )
+
+    def update_progress(self, job_id: str, progress: float, stage: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET progress = ?, stage = ?, heartbeat_at = ?,"
+                " updated_at = ? WHERE id = ?",
+                (progress, stage, now, now, job_id),
+            )
+
+    def complete(self, job_id: str, result: Dict[str, Any] | None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, progress = 1, result = ?,"
+                " updated_at = ? WHERE id = ?",
+                (
+                    JobStatus.SUCCEEDED.value,
+                    json.dumps(result) if result is not None else None,
+                    time.time(),
+                    job_id,
+                ),
+            )
+            self._conn.execute("DELETE FROM job_files WHERE job_id = ?", (job_id,))
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (JobStatus.FAILED.value, error, time.time(), job_id),
+            )
+
+    def retry(self, job_id: str) -> bool:
+        """Queue a failed job again; return whether it was failed."""
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, error = NULL,"
+                " updated_at = ? WHERE id = ? AND status = ?",
+                (
+                    JobStatus.QUEUED.value,
+                    time.time(),
+                    job_id,
+                    JobStatus.FAILED.value,
+                ),
+            ).rowcount
+        return bool(updated)
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _job(row) if row else None
+
+    def is_running(self, job_id: str, stale_after_sec: float = 60.0) -> bool:
+        """Return True while `job_id` is running and its heartbeat is fresh."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE id = ? AND status = ? AND heartbeat_at >= ?",
+                (job_id, JobStatus.RUNNING.value, time.time() - stale_after_sec),
+            ).fetchone()
+        return row is not None
+
+    def recent(self, kind: str, limit: int = 10) -> List[Job]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE kind = ?"
+                " ORDER BY created_at DESC LIMIT ?",
+                (kind, limit),
+            ).fetchall()
+        return [_job(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobProgress:
+    """Progress sink with the `st.progress` call shape, backed by the queue."""
+
+    def __init__(self, queue: JobQueue, job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+
+    def progress(self, value: float, text: str = "") -> None:
+        self.queue.update_progress(self.job_id, value, text)
+
+
+JobHandler = Callable[[Job, JobProgress], Dict[str, Any] | None]
+
+
+class JobWorkerPool:
+    """
+    Threads that claim jobs of one kind from a `JobQueue` and run `handler`.
+
+    The pool can live in the app process or in a standalone worker process;
+    both may serve the same queue. A separate thread keeps the heartbeat of
+    the pool's running jobs while their handlers block.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        kind: str,
+        handler: JobHandler,
+        workers: int = 2,
+        poll_sec: float = 1.0,
+        heartbeat_sec: float = 10.0,
+        stale_after_sec: float = 60.0,
+        max_attempts: int = 2,
+    ):
+        self.queue = queue
+        self.kind = kind
+        self.handler = handler
+        self.workers = workers
+        self.poll_sec = poll_sec
+        self.heartbeat_sec = heartbeat_sec
+        self.stale_after_sec = stale_after_sec
+        self.max_attempts = max_attempts
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._running: Dict[str, str] = {}
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            targets: List[Tuple[Callable[[], None], str]] = [
+                (self._work, f"{self.kind}-worker-{i}") for i in range(self.workers)
+            ]
+            targets.append((self._beat, f"{self.kind}-heartbeat"))
+            for target, name in targets:
+                thread = threading.Thread(target=target, name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info("Started %d %s workers", self.workers, self.kind)
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def running(self) -> List[str]:
+        with self._lock:
+            return list(self._running)
+
+    def _work(self) -> None:
+        worker = (
+            f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+        )
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(
+                    self.kind, worker, self.stale_after_sec, self.max_attempts
+                )
+            except sqlite3.OperationalError:
+                logger.exception("Could not claim a %s job", self.kind)
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_sec)
+                continue
+            self._run(job, worker)
+
+    def _run(self, job: Job, worker: str) -> None:
+        with self._lock:
+            self._running[job.id] = worker
+        logger.info("Running %s job %s (attempt %d)", job.kind, job.id, job.attempts)
+        try:
+            result = self.handler(job, JobProgress(self.queue, job.id))
+        except Exception as e:
+            logger.exception("%s job %s failed", job.kind, job.id)
+            self.queue.fail(job.id, str(e) or type(e).__name__)
+        else:
+            self.queue.complete(job.id, result)
+        finally:
+            with self._lock:
+                self._running.pop(job.id, None)
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.heartbeat_sec):
+            job_ids = self.running()
+            if job_ids:
+                self.queue.heartbeat(job_ids)
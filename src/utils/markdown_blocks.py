@@ -0,0 +1,456 @@
+import re
+from typing import Any, Dict, List, Tuple
+
+# Notion rejects rich text objects longer than this.
+MAX_RICH_TEXT_LENGTH = 2000
+
+_DEFAULT_ANNOTATIONS = {
+    "bold": False,
+    "italic": False,
+    "strikethrough": False,
+    "underline": False,
+    "code": False,
+    "color": "default",
+}
+
+_NOTION_CODE_LANGUAGES = {
+    "abap", "arduino", "bash", "basic", "c", "clojure", "coffeescript", "c++",
+    "c#", "css", "dart", "diff", "docker", "elixir", "elm", "erlang", "flow",
+    "fortran", "f#", "gherkin", "glsl", "go", "graphql", "groovy", "haskell",
+    "html", "java", "javascript", "json", "julia", "kotlin", "latex", "less",
+    "lisp", "livescript", "lua", "makefile", "markdown", "markup", "matlab",
+    "mermaid", "nix", "objective-c", "ocaml", "pascal", "perl", "php",
+    "plain text", "powershell", "prolog", "protobuf", "python", "r", "reason",
+    "ruby", "rust", "sass", "scala", "scheme", "scss", "shell", "sql", "swift",
+    "typescript", "vb.net", "verilog", "vhdl", "visual basic", "webassembly",
+    "xml", "yaml", "java/c/c++/c#",
+}  # fmt: skip
+
+_CODE_LANGUAGE_ALIASES = {
+    "": "plain text",
+    "text": "plain text",
+    "txt": "plain text",
+    "plaintext": "plain text",
+    "js": "javascript",
+    "jsx": "javascript",
+    "ts": "typescript",
+    "tsx": "typescript",
+    "py": "python",
+    "sh": "shell",
+    "zsh": "shell",
+    "console": "shell",
+    "yml": "yaml",
+    "md": "markdown",
+    "cpp": "c++",
+    "cc": "c++",
+    "cs": "c#",
+    "csharp": "c#",
+    "fsharp": "f#",
+    "golang": "go",
+    "rb": "ruby",
+    "rs": "rust",
+    "kt": "kotlin",
+    "tex": "latex",
+    "dockerfile": "docker",
+    "proto": "protobuf",
+}
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_FENCE_RE = re.compile(r"^(`{3,}|~{3,})\s*([^`\s]*)")
+_LIST_ITEM_RE = re.compile(r"^(\s*)([*\-+]|\d{1,9}[.)])(?:\s+(.*))?$")
+_TODO_RE = re.compile(r"^\[([ xX])\]\s+(.*)$")
+_HR_RE = re.compile(r"^ {0,3}([-*_])(?:\s*\1){2,}\s*$")
+_SETEXT_RE = re.compile(r"^ {0,3}(=+|-+)\s*$")
+_TABLE_SEP_RE = re.compile(r"^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+_IMAGE_RE = re.compile(r"^!\[([^\]]*)\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)$")
+_URL_RE = re.compile(r"^https?://\S+$")
+
+_INLINE_RE = re.compile(
+    r"(?P<escape>\\(?P<escaped>[\\`*_{}\[\]()#+\-.!|~<>]))"
+    r"|(?P<code>(?P<ticks>`+)(?P<code_text>.+?)(?P=ticks))"
+    r"|(?P<image>!\[(?P<image_alt>[^\]]*)\]\((?P<image_url>[^)\s]+)(?:\s+\"[^\"]*\")?\))"
+    r"|(?P<link>\[(?P<link_text>[^\]]+)\]\(\s*<?(?P<link_url>[^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\))"
+    r"|(?P<autolink><(?P<autolink_url>https?://[^>\s]+)>)"
+    r"|(?P<bold_italic>\*\*\*(?=\S)(?P<bold_italic_text>.+?)(?<=\S)\*\*\*)"
+    r"|(?P<bold>\*\*(?=\S)(?P<bold_text>.+?)(?<=\S)\*\*|(?<![\w\\])__(?=\S)(?P<bold_text_u>.+?)(?<=\S)__(?!\w))"
+    r"|(?P<strike>~~(?=\S)(?P<strike_text>.+?)(?<=\S)~~)"
+    r"|(?P<italic>\*(?=[^\s*])(?P<italic_text>.+?)(?<=[^\s*])\*|(?<![\w\\])_(?=[^\s_])(?P<italic_text_u>.+?)(?<=[^\s_])_(?!\w))",
+    re.DOTALL,
+)
+
+
+def _rich_text(
+    content: str, annotations: Dict[str, Any], url: str | None = None
+) -> Dict[str, Any]:
+    text: Dict[str, Any] = {"content": content}
+    if url:
+        text["link"] = {"type": "url", "url": url}
+    return {
+        "type": "text",
+        "annotations": {**_DEFAULT_ANNOTATIONS, **annotations},
+        "text": text,
+    }
+
+
+def _valid_url(url: str) -> str | None:
+    return url if _URL_RE.match(url) else None
+
+
+def _parse_inline_runs(
+    text: str, annotations: Dict[str, Any], url: str | None
+) -> List[Dict[str, Any]]:
+    runs: List[Dict[str, Any]] = []
+    pos = 0
+    while pos < len(text):
+        match = _INLINE_RE.search(text, pos)
+        if not match:
+            runs.append(_rich_text(text[pos:], annotations, url))
+            break
+        if match.start() > pos:
+            runs.append(_rich_text(text[pos : match.start()], annotations, url))
+        groups = match.groupdict()
+        if groups["escape"]:
+            runs.append(_rich_text(groups["escaped"], annotations, url))
+        elif groups["code"]:
+            code = groups["code_text"]
+            if code.startswith(" ") and code.endswith(" ") and code.strip():
+                code = code[1:-1]
+            runs.append(_rich_text(code, {**annotations, "code": True}, url))
+        elif groups["image"]:
+            alt = groups["image_alt"] or groups["image_url"]
+            link = _valid_url(groups["image_url"]) or url
+            runs.append(_rich_text(alt, annotations, link))
+        elif groups["link"]:
+            link = _valid_url(groups["link_url"]) or url
+            runs += _parse_inline_runs(groups["link_text"], annotations, link)
+        elif groups["autolink"]:
+            link = groups["autolink_url"]
+            runs.append(_rich_text(link, annotations, link))
+        elif groups["bold_italic"]:
+            inner = groups["bold_italic_text"]
+            runs += _parse_inline_runs(
+                inner, {**annotations, "bold": True, "italic": True}, url
+            )
+        elif groups["bold"]:
+            inner = groups["bold_text"] or groups["bold_text_u"]
+            end = match.end()
+            if inner.count("*") % 2 and text[end : end + 1] == "*":
+                # `**a *b***` closes the inner emphasis before the bold.
+                inner, end = inner + "*", end + 1
+            runs += _parse_inline_runs(inner, {**annotations, "bold": True}, url)
+            pos = end
+            continue
+        elif groups["strike"]:
+            inner = groups["strike_text"]
+            runs += _parse_inline_runs(
+                inner, {**annotations, "strikethrough": True}, url
+            )
+        elif groups["italic"]:
+            inner = groups["italic_text"] or groups["italic_text_u"]
+            runs += _parse_inline_runs(inner, {**annotations, "italic": True}, url)
+        pos = match.end()
+    return runs
+
+
+def _merge_runs(runs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    merged: List[Dict[str, Any]] = []
+    for run in runs:
+        if not run["text"]["content"]:
+            continue
+        prev = merged[-1] if merged else None
+        if (
+            prev
+            and prev["annotations"] == run["annotations"]
+            and prev["text"].get("link") == run["text"].get("link")
+        ):
+            prev["text"]["content"] += run["text"]["content"]
+        else:
+            merged.append(run)
+    return merged
+
+
+def _split_long_runs(runs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    split: List[Dict[str, Any]] = []
+    for run in runs:
+        content = run["text"]["content"]
+        if len(content) <= MAX_RICH_TEXT_LENGTH:
+            split.append(run)
+            continue
+        for i in range(0, len(content), MAX_RICH_TEXT_LENGTH):
+            piece = content[i : i + MAX_RICH_TEXT_LENGTH]
+            url = (run["text"].get("link") or {}).get("url")
+            split.append(_rich_text(piece, run["annotations"], url))
+    return split
+
+
+def parse_inline(text: str) -> List[Dict[str, Any]]:
+    """Convert inline markdown into a list of Notion rich text objects."""
+    return _split_long_runs(_merge_runs(_parse_inline_runs(text, {}, None)))
+
+
+def _block(block_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {"object": "block", "type": block_type, block_type: payload}
+
+
+def _text_block(
+    block_type: str, text: str, children: List[Dict[str, Any]] | None = None
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"rich_text": parse_inline(text)}
+    if children:
+        payload["children"] = children
+    return _block(block_type, payload)
+
+
+def _code_language(info: str) -> str:
+    lang = info.strip().lower()
+    lang = _CODE_LANGUAGE_ALIASES.get(lang, lang)
+    return lang if lang in _NOTION_CODE_LANGUAGES else "plain text"
+
+
+def _code_block(code: str, info: str) -> Dict[str, Any]:
+    rich_text = _split_long_runs([_rich_text(code, {})]) if code else []
+    return _block("code", {"rich_text": rich_text, "language": _code_language(info)})
+
+
+def _indent_width(line: str) -> int:
+    expanded = line.expandtabs(4)
+    return len(expanded) - len(expanded.lstrip(" "))
+
+
+def _dedent(lines: List[str]) -> List[str]:
+    widths = [_indent_width(line) for line in lines if line.strip()]
+    cut = min(widths) if widths else 0
+    return [line.expandtabs(4)[cut:] for line in lines]
+
+
+def _is_table_start(lines: List[str], i: int) -> bool:
+    return (
+        "|" in lines[i]
+        and i + 1 < len(lines)
+        and bool(_TABLE_SEP_RE.match(lines[i + 1]))
+        and "-" in lines[i + 1]
+    )
+
+
+def _starts_block(lines: List[str], i: int) -> bool:
+    stripped = lines[i].strip()
+    return bool(
+        _HEADING_RE.match(stripped)
+        or _FENCE_RE.match(stripped)
+        or _HR_RE.match(stripped)
+        or _LIST_ITEM_RE.match(stripped)
+        or stripped.startswith(">")
+        or _is_table_start(lines, i)
+    )
+
+
+def _split_table_row(line: str) -> List[str]:
+    row = line.strip()
+    if row.startswith("|"):
+        row = row[1:]
+    if row.endswith("|") and not row.endswith("\\|"):
+        row = row[:-1]
+    cells = re.split(r"(?<!\\)\|", row)
+    return [cell.strip().replace("\\|", "|") for cell in cells]
+
+
+def _consume_fence(lines: List[str], i: int) -> Tuple[Dict[str, Any], int]:
+    opening = lines[i].strip()
+    fence_match = _FENCE_RE.match(opening)
+    assert fence_match
+    fence, info = fence_match.group(1), fence_match.group(2)
+    indent = _indent_width(lines[i])
+    body: List[str] = []
+    j = i + 1
+    while j < len(lines):
+        stripped = lines[j].strip()
+        if stripped.startswith(fence[0] * len(fence)) and not stripped.strip(fence[0]):
+            j += 1
+            break
+        line = lines[j].expandtabs(4)
+        body.append(line[min(indent, _indent_width(line)) :])
+        j += 1
+    return _code_block("\n".join(body), info), j
+
+
+def _consume_table(lines: List[str], i: int) -> Tuple[Dict[str, Any], int]:
+    header = _split_table_row(lines[i])
+    rows = [header]
+    j = i + 2
+    while j < len(lines) and lines[j].strip() and "|" in lines[j]:
+        rows.append(_split_table_row(lines[j]))
+        j += 1
+    width = len(header)
+    children = []
+    for row in rows:
+        cells = (row + [""] * width)[:width]
+        children.append(
+            _block("table_row", {"cells": [parse_inline(cell) for cell in cells]})
+        )
+    table = {
+        "table_width": width,
+        "has_column_header": True,
+        "has_row_header": False,
+        "children": children,
+    }
+    return _block("table", table), j
+
+
+def _consume_quote(lines: List[str], i: int) -> Tuple[Dict[str, Any], int]:
+    body: List[str] = []
+    j = i
+    while j < len(lines) and lines[j].strip():
+        stripped = lines[j].strip()
+        if stripped.startswith(">"):
+            body.append(re.sub(r"^>\s?", "", stripped))
+        elif _starts_block(lines, j):
+            break
+        else:
+            body.append(stripped)
+        j += 1
+    children = parse_blocks(body)
+    rich_text: List[Dict[str, Any]] = []
+    if children and children[0]["type"] == "paragraph":
+        rich_text = children.pop(0)["paragraph"]["rich_text"]
+    payload: Dict[str, Any] = {"rich_text": rich_text}
+    if children:
+        payload["children"] = children
+    return _block("quote", payload), j
+
+
+def _consume_list_item(lines: List[str], i: int) -> Tuple[Dict[str, Any], int]:
+    match = _LIST_ITEM_RE.match(lines[i])
+    assert match
+    item_indent = _indent_width(match.group(1))
+    marker, content = match.group(2), (match.group(3) or "")
+    body = [content.strip()]
+    child_lines: List[str] = []
+    j = i + 1
+    in_fence = ""
+    while j < len(lines):
+        line = lines[j]
+        stripped = line.strip()
+        if in_fence:
+            child_lines.append(line)
+            if stripped.startswith(in_fence) and not stripped.strip(in_fence[0]):
+                in_fence = ""
+            j += 1
+            continue
+        if not stripped:
+            k = j
+            while k < len(lines) and not lines[k].strip():
+                k += 1
+            if k < len(lines) and _indent_width(lines[k]) > item_indent:
+                child_lines.append("")
+                j += 1
+                continue
+            break
+        if _indent_width(line) > item_indent:
+            fence_match = _FENCE_RE.match(stripped)
+            if fence_match:
+                in_fence = fence_match.group(1)
+            elif not child_lines and not _starts_block(lines, j):
+                # Indented paragraph continuation of the item text.
+                body.append(stripped)
+                j += 1
+                continue
+            child_lines.append(line)
+            j += 1
+            continue
+        if not child_lines and not _starts_block(lines, j):
+            # Lazy continuation line.
+            body.append(stripped)
+            j += 1
+            continue
+        break
+
+    children = parse_blocks(_dedent(child_lines))
+    text = "\n".join(body)
+    todo = _TODO_RE.match(text)
+    if todo:
+        payload: Dict[str, Any] = {
+            "rich_text": parse_inline(todo.group(2)),
+            "checked": todo.group(1).lower() == "x",
+        }
+        if children:
+            payload["children"] = children
+        return _block("to_do", payload), j
+    block_type = "bulleted_list_item" if marker in "*-+" else "numbered_list_item"
+    return _text_block(block_type, text, children), j
+
+
+def _paragraph_block(text: str) -> Dict[str, Any]:
+    image = _IMAGE_RE.match(text)
+    if image and _valid_url(image.group(2)):
+        return _block(
+            "image", {"type": "external", "external": {"url": image.group(2)}}
+        )
+    return _text_block("paragraph", text)
+
+
+def parse_blocks(lines: List[str]) -> List[Dict[str, Any]]:
+    """Convert markdown lines into a list of Notion block objects."""
+    blocks: List[Dict[str, Any]] = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped:
+            i += 1
+            continue
+        if _FENCE_RE.match(stripped):
+            block, i = _consume_fence(lines, i)
+            blocks.append(block)
+            continue
+        heading = _HEADING_RE.match(stripped)
+        if heading:
+            level = min(len(heading.group(1)), 3)
+            blocks.append(_text_block(f"heading_{level}", heading.group(2)))
+            i += 1
+            continue
+        if _HR_RE.match(line):
+            blocks.append(_block("divider", {}))
+            i += 1
+            continue
+        if _is_table_start(lines, i):
+            block, i = _consume_table(lines, i)
+            blocks.append(block)
+            continue
+        if stripped.startswith(">"):
+            block, i = _consume_quote(lines, i)
+            blocks.append(block)
+            continue
+        if _LIST_ITEM_RE.match(line):
+            block, i = _consume_list_item(lines, i)
+            blocks.append(block)
+            continue
+
+        body = [stripped]
+        i += 1
+        while (
+            i < len(lines)
+            and lines[i].strip()
+            and not _SETEXT_RE.match(lines[i])
+            and not _starts_block(lines, i)
+        ):
+            body.append(lines[i].strip())
+            i += 1
+        setext = _SETEXT_RE.match(lines[i]) if i < len(lines) else None
+        if setext:
+            level = 1 if setext.group(1).startswith("=") else 2
+            blocks.append(_text_block(f"heading_{level}", "\n".join(body)))
+            i += 1
+            continue
+        blocks.append(_paragraph_block("\n".join(line.rstrip("\\") for line in body)))
+    return blocks
+
+
+def markdown_to_blocks(markdown: str) -> List[Dict[str, Any]]:
+    return parse_blocks(markdown.replace("\r\n", "\n").split("\n"))
+
+
+class MarkdownBlockConverter:
+    """In-process markdown to Notion block converter, a drop-in for Martian."""
+
+    def run(self, markdown: str) -> List[Dict[str, Any]]:
+        return markdown_to_blocks(markdown)
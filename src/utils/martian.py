@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+import atexit
+import itertools
 import json
+import logging
 import os
+import queue
 import subprocess
-from dataclasses import dataclass
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
 from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List
 
+logger = logging.getLogger(__name__)
+
 
 @lru_cache(maxsize=1)
 def _repo_root() -> Path:
@@ -31,8 +40,8 @@ def _node_bin() -> str:
 
 @dataclass(frozen=True)
 class MartianRunner:
-    node_path: str = _node_bin()
-    cli_path: Path = _martian_cli_path()
+    node_path: str = field(default_factory=_node_bin)
+    cli_path: Path = field(default_factory=_martian_cli_path)
     timeout_sec: int = 120
 
     def run(self, markdown: str) -> List[Dict[str, Any]]:
@@ -58,3 +67,234 @@ class MartianRunner:
         if not isinstance(blocks, list):
             raise RuntimeError("Martian output is not a list")
         return blocks
+
+
+class MartianWorker:
+    """A long-lived `martian_cli.mjs --worker` process speaking line-delimited JSON."""
+
+    def __init__(self, node_path: str, cli_path: Path, timeout_sec: float):
+        self.node_path = node_path
+        self.cli_path = cli_path
+        self.timeout_sec = timeout_sec
+        self._ids = itertools.count(1)
+        self._responses: "queue.Queue[str | None]" = queue.Queue()
+        self._stdout_closed = False
+        self.proc = self._spawn()
+        self.last_used = time.monotonic()
+
+    def _spawn(self) -> subprocess.Popen:
+        if not self.cli_path.exists():
+            raise FileNotFoundError(f"Martian CLI not found at {self.cli_path}")
+        proc = subprocess.Popen(
+            [self.node_path, str(self.cli_path), "--worker"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=os.environ.copy(),
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        threading.Thread(target=self._read_stdout, args=(proc,), daemon=True).start()
+        threading.Thread(target=self._drain_stderr, args=(proc,), daemon=True).start()
+        return proc
+
+    def _read_stdout(self, proc: subprocess.Popen) -> None:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            self._responses.put(line)
+        self._stdout_closed = True
+        self._responses.put(None)
+
+    def _drain_stderr(self, proc: subprocess.Popen) -> None:
+        assert proc.stderr is not None
+        for line in proc.stderr:
+            logger.warning("martian: %s", line.rstrip())
+
+    def is_alive(self) -> bool:
+        return not self._stdout_closed and self.proc.poll() is None
+
+    def _request(self, payload: Dict[str, Any], timeout_sec: float) -> Dict[str, Any]:
+        if not self.is_alive():
+            raise RuntimeError("Martian worker is not running")
+        req_id = next(self._ids)
+        assert self.proc.stdin is not None
+        self.proc.stdin.write(json.dumps({"id": req_id, **payload}) + "\n")
+        self.proc.stdin.flush()
+        deadline = time.monotonic() + timeout_sec
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Martian worker timed out after {timeout_sec}s")
+            try:
+                line = self._responses.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                raise RuntimeError("Martian worker exited mid-request")
+            try:
+                resp = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise RuntimeError(
+                    f"Invalid Martian worker output: {line[:5000]}"
+                ) from e
+            # Responses to requests abandoned after a timeout are skipped.
+            if resp.get("id") == req_id:
+                return resp
+
+    def ping(self, timeout_sec: float = 5) -> bool:
+        try:
+            return bool(self._request({"op": "ping"}, timeout_sec).get("ok"))
+        except (RuntimeError, TimeoutError, OSError):
+            return False
+
+    def run(self, markdown: str) -> List[Dict[str, Any]]:
+        resp = self._request({"op": "convert", "markdown": markdown}, self.timeout_sec)
+        if "error" in resp:
+            raise RuntimeError(resp["error"])
+        blocks = resp.get("blocks")
+        if not isinstance(blocks, list):
+            raise RuntimeError("Martian output is not a list")
+        return blocks
+
+    def close(self) -> None:
+        if self.proc.stdin and not self.proc.stdin.closed:
+            self.proc.stdin.close()
+        try:
+            self.proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+class MartianWorkerPool:
+    """
+    Pool of persistent Martian workers.
+
+    Workers are spawned lazily and replaced when they crash, hang or time out,
+    so Node startup and module load are paid once per worker instead of once
+    per conversion. A worker is pinged on checkout only after sitting idle for
+    `idle_ping_sec`; recently used ones are handed out directly and replaced
+    if the conversion fails. `health_check` also tops the pool back up to
+    `size` workers.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        timeout_sec: float = 120,
+        node_path: str | None = None,
+        cli_path: Path | None = None,
+        idle_ping_sec: float = 30,
+    ):
+        self.size = size
+        self.timeout_sec = timeout_sec
+        self.idle_ping_sec = idle_ping_sec
+        self.node_path = node_path or _node_bin()
+        self.cli_path = cli_path or _martian_cli_path()
+        self._idle: "queue.LifoQueue[MartianWorker]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._workers: List[MartianWorker] = []
+        self._lock = threading.Lock()
+        _pools.add(self)
+
+    def _new_worker(self) -> MartianWorker:
+        worker = MartianWorker(self.node_path, self.cli_path, self.timeout_sec)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _discard(self, worker: MartianWorker) -> None:
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.proc.kill()
+
+    def _checkout(self) -> MartianWorker:
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    worker = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._new_worker()
+                idle_sec = time.monotonic() - worker.last_used
+                if worker.is_alive() and (
+                    idle_sec < self.idle_ping_sec or worker.ping()
+                ):
+                    return worker
+                logger.warning("Martian worker is not responding; restarting")
+                self._discard(worker)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, worker: MartianWorker) -> None:
+        worker.last_used = time.monotonic()
+        self._idle.put(worker)
+        self._slots.release()
+
+    def run(self, markdown: str) -> List[Dict[str, Any]]:
+        worker = self._checkout()
+        try:
+            blocks = worker.run(markdown)
+        except (TimeoutError, OSError):
+            # A hung or broken worker is never reused.
+            self._discard(worker)
+            self._slots.release()
+            raise
+        except RuntimeError:
+            if worker.is_alive():
+                self._checkin(worker)
+            else:
+                self._discard(worker)
+                self._slots.release()
+            raise
+        self._checkin(worker)
+        return blocks
+
+    def health_check(self) -> int:
+        """
+        Ping idle workers, replace unhealthy ones and spawn workers until the
+        pool holds `size` of them. Returns the number of healthy idle workers.
+        """
+        healthy: List[MartianWorker] = []
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker.ping():
+                healthy.append(worker)
+            else:
+                logger.warning("Martian worker failed health check; restarting")
+                self._discard(worker)
+        while True:
+            with self._lock:
+                if len(self._workers) >= self.size:
+                    break
+            try:
+                healthy.append(self._new_worker())
+            except OSError:
+                logger.warning("Could not start a Martian worker", exc_info=True)
+                break
+        for worker in healthy:
+            self._idle.put(worker)
+        return len(healthy)
+
+    def close(self) -> None:
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
+
+
+# Pools are only weakly referenced, so one exit hook closes whichever are
+# still alive without keeping every pool ever created in memory.
+_pools: "weakref.WeakSet[MartianWorkerPool]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_pools() -> None:
+    for pool in list(_pools):
+        pool.close()
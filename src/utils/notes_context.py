@@ -0,0 +1,262 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+from utils.embedding_utils import count_tokens, get_encoder
+
+_HEADER_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_REF_PREFIX_RE = re.compile(r"^\s*h[1-6]\s*:\s*", re.IGNORECASE)
+# Sections are only cut down to fit when at least this many tokens are left.
+_MIN_TRUNCATED_TOKENS = 64
+
+
+@dataclass
+class NoteSection:
+    index: int
+    level: int
+    path: List[str]
+    text: str
+
+    @property
+    def title(self) -> str:
+        return self.path[-1] if self.path else ""
+
+
+@dataclass
+class NotesContext:
+    markdown: str
+    tokens: int
+    full_tokens: int
+    sections_used: int
+    sections_total: int
+
+    @property
+    def is_full(self) -> bool:
+        return self.sections_used == self.sections_total
+
+
+@dataclass
+class PromptReport:
+    mode: str
+    notes_tokens: int
+    full_notes_tokens: int
+    prompt_tokens: int
+    latency_sec: float
+
+    def log_line(self) -> str:
+        saved = (
+            1 - self.notes_tokens / self.full_notes_tokens
+            if self.full_notes_tokens
+            else 0
+        )
+        return (
+            f"mode={self.mode} notes_tokens={self.notes_tokens}/{self.full_notes_tokens} "
+            f"({saved:.0%} saved) prompt_tokens={self.prompt_tokens} "
+            f"latency={self.latency_sec:.2f}s"
+        )
+
+
+def split_header_sections(markdown: str) -> List[NoteSection]:
+    """
+    Split markdown into one section per header, ignoring headers in fences.
+
+    Each section's path holds its ancestor headers and its own as
+    "H<level>: <title>", the format quiz question refs use.
+    """
+    sections: List[NoteSection] = []
+    stack: List[tuple[int, str]] = []
+    lines: List[str] = []
+    level = 0
+    in_fence = False
+
+    def flush():
+        if any(line.strip() for line in lines):
+            sections.append(
+                NoteSection(
+                    index=len(sections),
+                    level=level,
+                    path=[f"H{lvl}: {title}" for lvl, title in stack],
+                    text="\n".join(lines).strip("\n"),
+                )
+            )
+
+    for line in markdown.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith("```") or stripped.startswith("~~~"):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADER_RE.match(line)
+        if match:
+            flush()
+            lines = []
+            level = len(match.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, match.group(2)))
+        lines.append(line)
+    flush()
+    return sections
+
+
+def _normalize_title(title: str) -> str:
+    return " ".join(_WORD_RE.findall(_REF_PREFIX_RE.sub("", title).lower()))
+
+
+def match_refs(sections: Sequence[NoteSection], refs: Sequence[str]) -> List[int]:
+    """
+    Return the sections a question's header path points at, deepest ref first.
+
+    The matched section is returned together with its subsections. Refs that
+    name no header in the notes are skipped.
+    """
+    titles = [_normalize_title(s.title) for s in sections]
+    for ref in reversed([r for r in refs if _normalize_title(r)]):
+        wanted = _normalize_title(ref)
+        for i, title in enumerate(titles):
+            if title != wanted:
+                continue
+            matched = [i]
+            for section in sections[i + 1 :]:
+                if section.level <= sections[i].level:
+                    break
+                matched.append(section.index)
+            return matched
+    return []
+
+
+def _terms(text: str) -> List[str]:
+    return [t for t in _WORD_RE.findall(text.lower()) if len(t) > 2]
+
+
+def rank_sections(sections: Sequence[NoteSection], query: str, k: int = 3) -> List[int]:
+    """Rank sections by tf-idf overlap with `query`; header words count double."""
+    if not sections:
+        return []
+    section_terms = [Counter(_terms(s.text)) for s in sections]
+    title_terms = [set(_terms(" ".join(s.path))) for s in sections]
+    doc_freq = Counter(term for terms in section_terms for term in terms)
+    scores = []
+    for i, terms in enumerate(section_terms):
+        score = 0.0
+        for term in set(_terms(query)):
+            if term in terms:
+                idf = math.log(1 + len(sections) / doc_freq[term])
+                weight = 2.0 if term in title_terms[i] else 1.0
+                score += weight * idf * (1 + math.log(terms[term]))
+        scores.append(score)
+    ranked = sorted(range(len(sections)), key=lambda i: -scores[i])
+    return [i for i in ranked[:k] if scores[i] > 0]
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    encoder = get_encoder()
+    tokens = encoder.encode(text, disallowed_special=())
+    return encoder.decode(tokens[:max_tokens])
+
+
+class _Budget:
+    def __init__(self, sections: Sequence[NoteSection], budget_tokens: int):
+        self.sections = sections
+        self.budget_tokens = budget_tokens
+        self.used = 0
+        self.chosen: Dict[int, str] = {}
+
+    def _headers(self, section: NoteSection) -> List[str]:
+        """Ancestor header lines not already in the context."""
+        headers = []
+        chosen_paths = {tuple(self.sections[i].path) for i in self.chosen}
+        for depth in range(1, len(section.path)):
+            if tuple(section.path[:depth]) not in chosen_paths:
+                level, title = section.path[depth - 1].split(": ", 1)
+                headers.append(f"{'#' * int(level[1:])} {title}")
+        return headers
+
+    def take(self, index: int, allow_truncate: bool = False) -> bool:
+        if index in self.chosen:
+            return True
+        section = self.sections[index]
+        text = "\n".join(self._headers(section) + [section.text])
+        cost = count_tokens(text)
+        remaining = self.budget_tokens - self.used
+        if cost > remaining:
+            if not allow_truncate or remaining < _MIN_TRUNCATED_TOKENS:
+                return False
+            text = _truncate(text, remaining)
+            cost = count_tokens(text)
+        self.chosen[index] = text
+        self.used += cost
+        return True
+
+    def context(self, full_tokens: int) -> NotesContext:
+        markdown = "\n\n".join(self.chosen[i] for i in sorted(self.chosen))
+        return NotesContext(
+            markdown=markdown,
+            tokens=count_tokens(markdown),
+            full_tokens=full_tokens,
+            sections_used=len(self.chosen),
+            sections_total=len(self.sections),
+        )
+
+
+def _full_context(notes_md: str, full_tokens: int, n_sections: int) -> NotesContext:
+    return NotesContext(
+        markdown=notes_md,
+        tokens=full_tokens,
+        full_tokens=full_tokens,
+        sections_used=n_sections,
+        sections_total=n_sections,
+    )
+
+
+def select_question_context(
+    notes_md: str,
+    questions: Sequence[Dict],
+    budget_tokens: int,
+    per_question: int = 3,
+) -> NotesContext:
+    """
+    Keep only the note sections relevant to each question within a token budget.
+
+    Each question contributes the sections named by its `refs`, then the
+    sections that best match its text. Questions take turns so every one of
+    them gets its best section before any gets a second.
+    """
+    sections = split_header_sections(notes_md)
+    full_tokens = count_tokens(notes_md)
+    if full_tokens <= budget_tokens:
+        return _full_context(notes_md, full_tokens, len(sections))
+
+    candidates: List[List[int]] = []
+    for question in questions:
+        ranked = match_refs(sections, question.get("refs") or [])
+        for i in rank_sections(sections, question.get("text", ""), k=per_question):
+            if i not in ranked:
+                ranked.append(i)
+        candidates.append(ranked)
+
+    budget = _Budget(sections, budget_tokens)
+    for depth in range(max((len(c) for c in candidates), default=0)):
+        for ranked in candidates:
+            if depth < len(ranked):
+                budget.take(ranked[depth], allow_truncate=depth == 0)
+    return budget.context(full_tokens)
+
+
+def select_overview_context(notes_md: str, budget_tokens: int) -> NotesContext:
+    """
+    Fit notes into a token budget for quiz generation, favouring breadth.
+
+    Shallower sections are kept before deeper ones so every topic of the notes
+    stays represented; the kept sections are returned in document order.
+    """
+    sections = split_header_sections(notes_md)
+    full_tokens = count_tokens(notes_md)
+    if full_tokens <= budget_tokens:
+        return _full_context(notes_md, full_tokens, len(sections))
+
+    budget = _Budget(sections, budget_tokens)
+    for section in sorted(sections, key=lambda s: (s.level, s.index)):
+        budget.take(section.index)
+    return budget.context(full_tokens)
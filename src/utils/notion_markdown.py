@@ -0,0 +1,121 @@
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, List
+
+from notion2md.config import Config
+from notion2md.convertor.block import BlockConvertor
+
+BlockTree = Dict[str, List[Dict[str, Any]]]
+
+
+class _PrefetchedChildren:
+    """Stands in for notion2md's API client, serving children fetched up front."""
+
+    def __init__(self, children_by_id: BlockTree):
+        self.children_by_id = children_by_id
+
+    def get_children(self, parent_id: str) -> List[Dict[str, Any]]:
+        return self.children_by_id.get(parent_id, [])
+
+
+def list_children(
+    list_page: Callable[..., Dict[str, Any]], block_id: str
+) -> List[Dict[str, Any]]:
+    """Return all children of `block_id`, following `list_page` cursors."""
+    results: List[Dict[str, Any]] = []
+    cursor = None
+    while True:
+        kwargs: Dict[str, Any] = {"block_id": block_id, "page_size": 100}
+        if cursor:
+            kwargs["start_cursor"] = cursor
+        resp = list_page(**kwargs)
+        results.extend(resp["results"])
+        if not resp.get("has_more"):
+            return results
+        cursor = resp["next_cursor"]
+
+
+async def list_children_async(
+    list_page: Callable[..., Awaitable[Dict[str, Any]]], block_id: str
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    cursor = None
+    while True:
+        kwargs: Dict[str, Any] = {"block_id": block_id, "page_size": 100}
+        if cursor:
+            kwargs["start_cursor"] = cursor
+        resp = await list_page(**kwargs)
+        results.extend(resp["results"])
+        if not resp.get("has_more"):
+            return results
+        cursor = resp["next_cursor"]
+
+
+def should_fetch_children(block: Dict[str, Any]) -> bool:
+    # notion2md never descends into child pages.
+    return bool(block.get("has_children")) and block.get("type") != "child_page"
+
+
+def render_markdown(page_id: str, children_by_id: BlockTree) -> str:
+    """
+    Render a prefetched block tree with notion2md's converters.
+
+    `children_by_id` maps each parent block id (starting with the page id) to
+    its children, so the output matches `StringExporter` without it making
+    any API calls of its own.
+    """
+    convertor = BlockConvertor(
+        Config(block_id=page_id), _PrefetchedChildren(children_by_id)  # type: ignore
+    )
+    return convertor.to_string(children_by_id.get(page_id, []))  # type: ignore
+
+
+def fetch_block_tree(
+    list_children: Callable[[str], List[Dict[str, Any]]],
+    page_id: str,
+    max_workers: int = 8,
+) -> BlockTree:
+    """
+    Fetch a page's block tree, listing sibling subtrees concurrently.
+
+    Every block with children is queued as soon as its parent's listing
+    arrives, so a deep page costs roughly one round-trip per level instead of
+    one per parent. At most `max_workers` listings are in flight.
+    """
+    tree: BlockTree = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(list_children, page_id): page_id}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                block_id = pending.pop(future)
+                tree[block_id] = future.result()
+                for block in tree[block_id]:
+                    if should_fetch_children(block):
+                        child = executor.submit(list_children, block["id"])
+                        pending[child] = block["id"]
+    return tree
+
+
+async def fetch_block_tree_async(
+    list_children: Callable[[str], Awaitable[List[Dict[str, Any]]]],
+    page_id: str,
+    max_concurrency: int = 8,
+) -> BlockTree:
+    """Async variant of `fetch_block_tree`, bounded by a semaphore."""
+    tree: BlockTree = {}
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def walk(block_id: str) -> None:
+        async with semaphore:
+            tree[block_id] = await list_children(block_id)
+        await asyncio.gather(
+            *(
+                walk(block["id"])
+                for block in tree[block_id]
+                if should_fetch_children(block)
+            )
+        )
+
+    await walk(page_id)
+    return tree
@@ -0,0 +1,224 @@
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List
+
+from utils.notion_utils import project_note
+
+logger = logging.getLogger(__name__)
+
+# Called with a Notion database filter (or None for every page) and yields raw
+# page objects across all result pages.
+QueryPages = Callable[[Dict[str, Any] | None], Iterable[Dict[str, Any]]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page_id TEXT PRIMARY KEY,
+    database_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT,
+    effort TEXT,
+    next_review TEXT,
+    resource_tag TEXT,
+    revisions INTEGER,
+    last_review TEXT,
+    last_edited_time TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_next_review ON pages (database_id, next_review);
+CREATE INDEX IF NOT EXISTS idx_pages_effort ON pages (database_id, effort);
+CREATE INDEX IF NOT EXISTS idx_pages_resource_tag ON pages (database_id, resource_tag);
+CREATE INDEX IF NOT EXISTS idx_pages_revisions ON pages (database_id, revisions);
+CREATE TABLE IF NOT EXISTS sync_state (
+    database_id TEXT PRIMARY KEY,
+    cursor TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    full_synced_at REAL NOT NULL
+);
+"""
+
+_COLUMNS = (
+    "page_id",
+    "database_id",
+    "title",
+    "url",
+    "effort",
+    "next_review",
+    "resource_tag",
+    "revisions",
+    "last_review",
+    "last_edited_time",
+)
+
+
+def _page_row(database_id: str, page: Dict[str, Any]) -> tuple:
+    props = page.get("properties", {})
+    note = project_note(page)
+    resource_tag = (props.get("Resource Tag", {}).get("select") or {}).get("name")
+    last_review = (props.get("Last Review", {}).get("date") or {}).get("start")
+    # Next Review may be a datetime; the date alone is what due queries compare.
+    next_review = note["next_review"][:10] if note["next_review"] else None
+    return (
+        note["page_id"],
+        database_id,
+        note["title"],
+        note["url"],
+        note["effort"],
+        next_review,
+        resource_tag,
+        props.get("Revisions", {}).get("number"),
+        last_review,
+        page["last_edited_time"],
+    )
+
+
+class NotionMirror:
+    """
+    Local SQLite copy of Notion database pages for fast due-note queries.
+
+    `sync` pulls only pages edited since the newest `last_edited_time` already
+    mirrored. Notion reports that timestamp at minute resolution, so the
+    boundary minute is re-read on every sync; upserts make that harmless.
+    Incremental queries cannot see archived or deleted pages, so a full
+    resync replaces the mirrored rows every `full_sync_interval_sec`.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        min_sync_interval_sec: float = 60,
+        full_sync_interval_sec: float = 6 * 60 * 60,
+    ):
+        self.db_path = Path(db_path)
+        if str(db_path) != ":memory:":
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.min_sync_interval_sec = min_sync_interval_sec
+        self.full_sync_interval_sec = full_sync_interval_sec
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def _sync_state(self, database_id: str) -> sqlite3.Row | None:
+        return self._conn.execute(
+            "SELECT cursor, synced_at, full_synced_at FROM sync_state"
+            " WHERE database_id = ?",
+            (database_id,),
+        ).fetchone()
+
+    def upsert_pages(self, database_id: str, pages: Iterable[Dict[str, Any]]) -> int:
+        rows = [_page_row(database_id, page) for page in pages]
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS[1:])
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO pages ({', '.join(_COLUMNS)}) VALUES ({placeholders})"
+                f" ON CONFLICT(page_id) DO UPDATE SET {updates}",
+                rows,
+            )
+        return len(rows)
+
+    def refresh_page(self, page: Dict[str, Any]) -> bool:
+        """Write an updated page through to its mirrored row, if it is mirrored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT database_id FROM pages WHERE page_id = ?", (page.get("id"),)
+            ).fetchone()
+            if row is None:
+                return False
+            self.upsert_pages(row["database_id"], [page])
+            return True
+
+    def sync(self, database_id: str, query: QueryPages, force: bool = False) -> int:
+        """Bring `database_id` up to date and return how many pages were read."""
+        with self._lock:
+            now = time.time()
+            state = self._sync_state(database_id)
+            if (
+                state is not None
+                and not force
+                and now - state["synced_at"] < self.min_sync_interval_sec
+            ):
+                return 0
+            full = (
+                state is None
+                or now - state["full_synced_at"] >= self.full_sync_interval_sec
+            )
+            filter = None
+            if not full:
+                filter = {
+                    "timestamp": "last_edited_time",
+                    "last_edited_time": {"on_or_after": state["cursor"]},
+                }
+
+            cursor = "" if full else state["cursor"]
+            seen: set[str] = set()
+            batch: List[Dict[str, Any]] = []
+            for page in query(filter):
+                batch.append(page)
+                seen.add(page["id"])
+                cursor = max(cursor, page["last_edited_time"])
+                if len(batch) == 100:
+                    self.upsert_pages(database_id, batch)
+                    batch = []
+            self.upsert_pages(database_id, batch)
+
+            with self._conn:
+                if full:
+                    mirrored = {
+                        row["page_id"]
+                        for row in self._conn.execute(
+                            "SELECT page_id FROM pages WHERE database_id = ?",
+                            (database_id,),
+                        )
+                    }
+                    self._conn.executemany(
+                        "DELETE FROM pages WHERE page_id = ?",
+                        [(page_id,) for page_id in mirrored - seen],
+                    )
+                self._conn.execute(
+                    "INSERT INTO sync_state (database_id, cursor, synced_at,"
+                    " full_synced_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT(database_id) DO UPDATE SET cursor = excluded.cursor,"
+                    " synced_at = excluded.synced_at,"
+                    " full_synced_at = excluded.full_synced_at",
+                    (
+                        database_id,
+                        cursor,
+                        now,
+                        now if full else state["full_synced_at"],
+                    ),
+                )
+            logger.info(
+                "Synced %d pages of %s into the Notion mirror (%s)",
+                len(seen),
+                database_id,
+                "full" if full else "incremental",
+            )
+            return len(seen)
+
+    def due_notes(self, database_id: str, on_or_before: str) -> List[Dict[str, Any]]:
+        """Return notes with Next Review on or before the ISO date `on_or_before`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_id, title, url, effort, next_review, last_edited_time"
+                " FROM pages"
+                " WHERE database_id = ? AND next_review <= ?"
+                " ORDER BY next_review, page_id",
+                (database_id, on_or_before),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def last_edited_time(self, page_id: str) -> str | None:
+        """Return the mirrored `last_edited_time` of `page_id`, if it is mirrored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_edited_time FROM pages WHERE page_id = ?", (page_id,)
+            ).fetchone()
+        return row["last_edited_time"] if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,6 +1,7 @@
 import re, random
 from datetime import datetime, date
-from typing import Dict
+from typing import Awaitable, Callable, Dict, List, Optional
+from utils.constants import ChunkConstants
 
 
 def create_page_properties(
@@ -29,6 +30,48 @@ def create_due_today_filters() -> Dict:
     }
 
 
+def _page_title(properties: Dict) -> str:
+    for prop in properties.values():
+        if prop.get("type") == "title":
+            return "".join(t.get("plain_text", "") for t in prop.get("title", []))
+    return ""
+
+
+def project_note(page: Dict) -> Dict:
+    """Keep only the fields the app reads from a database page."""
+    props = page.get("properties", {})
+    effort = (props.get("Effort", {}).get("select") or {}).get("name")
+    next_review = (
+        (props.get("Next Review", {}).get("formula") or {}).get("date") or {}
+    ).get("start")
+    return {
+        "page_id": page.get("id"),
+        "title": _page_title(props),
+        "url": page.get("url"),
+        "effort": effort,
+        "next_review": next_review,
+        "last_edited_time": page.get("last_edited_time"),
+    }
+
+
+def create_revision_properties(
+    props: Dict, effort: Optional[str] = None
+) -> Optional[Dict]:
+    """Return the revision property update, or None if already logged today."""
+    last_review_data = props.get("Last Review", {}).get("date", {}).get("start", "")
+    current_date = date.today().strftime("%Y-%m-%d")
+    if last_review_data == current_date:
+        return None
+    current_revision_count = int(props.get("Revisions", {}).get("number", 0) or 0)
+    updated_props = {
+        "Revisions": {"number": min(current_revision_count + 1, 5)},
+        "Last Review": {"date": {"start": current_date}},
+    }
+    if props.get("Effort") and effort:
+        updated_props["Effort"] = {"select": {"name": f"{effort}"}}
+    return updated_props
+
+
 def flatten_nested_lists(markdown: str, indent_size: int = 2) -> str:
     processed_lines = []
     lines = markdown.split("\n")
@@ -59,18 +102,94 @@ def flatten_nested_lists(markdown: str, indent_size: int = 2) -> str:
     return "\n".join(processed_lines)
 
 
-def select_dsa_problem(problems):
+def select_dsa_problem(problems: List[Dict]) -> Optional[Dict]:
+    """Pick one of the notes projected by `project_note`, favouring harder ones."""
     if not problems:
         return None
 
     effort_weights = {"Hard": 3, "Medium": 2}
     weights = [
-        effort_weights.get(
-            (problem.get("properties", {}).get("Effort", {}).get("select") or {}).get(
-                "name", ""
-            ),
-            1,
-        )
-        for problem in problems
+        effort_weights.get(problem.get("effort") or "", 1) for problem in problems
     ]
     return random.choices(problems, weights=weights, k=1)[0]
+
+
+def split_top_level_sections(markdown: str) -> List[str]:
+    """
+    Split markdown on the top-level `##` section headers used for chunking.
+
+    Headers inside fenced code blocks are ignored. Joining the returned
+    sections with newlines reproduces the input.
+    """
+    headers = {
+        f"{marker} {name}" for marker, name in ChunkConstants.HEADERS_TO_SPLIT_ON.value
+    }
+    sections: List[List[str]] = [[]]
+    in_fence = False
+    for line in markdown.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith("```") or stripped.startswith("~~~"):
+            in_fence = not in_fence
+        if not in_fence and stripped in headers and any(sections[-1]):
+            sections.append([])
+        sections[-1].append(line)
+    return ["\n".join(lines) for lines in sections]
+
+
+# Notion accepts at most 100 child blocks per create or append request.
+BLOCKS_PER_REQUEST = 100
+
+
+def write_page_blocks(
+    blocks: List[Dict],
+    create_page: Callable[[List[Dict]], Dict],
+    append_blocks: Callable[[str, List[Dict]], None],
+    page: Dict | None = None,
+    blocks_written: int = 0,
+    on_batch: Callable[[Dict, int], None] | None = None,
+) -> Dict:
+    """
+    Create a page with the first batch of `blocks` and append the rest.
+
+    Passing the `page` and `blocks_written` of an interrupted write continues
+    it from the next batch instead of creating another page. `on_batch` gets
+    the page and the number of blocks written after every request.
+    """
+    if page is None:
+        first = blocks[:BLOCKS_PER_REQUEST]
+        page = create_page(first)
+        blocks_written = len(first)
+        if on_batch:
+            on_batch(page, blocks_written)
+    # Appends always land at the end of the page, so batches go in order.
+    while blocks_written < len(blocks):
+        batch = blocks[blocks_written : blocks_written + BLOCKS_PER_REQUEST]
+        append_blocks(page["id"], batch)
+        blocks_written += len(batch)
+        if on_batch:
+            on_batch(page, blocks_written)
+    return page
+
+
+async def write_page_blocks_async(
+    blocks: List[Dict],
+    create_page: Callable[[List[Dict]], Awaitable[Dict]],
+    append_blocks: Callable[[str, List[Dict]], Awaitable[None]],
+    page: Dict | None = None,
+    blocks_written: int = 0,
+    on_batch: Callable[[Dict, int], None] | None = None,
+) -> Dict:
+    """Async counterpart of `write_page_blocks`."""
+    if page is None:
+        first = blocks[:BLOCKS_PER_REQUEST]
+        page = await create_page(first)
+        blocks_written = len(first)
+        if on_batch:
+            on_batch(page, blocks_written)
+    while blocks_written < len(blocks):
+        batch = blocks[blocks_written : blocks_written + BLOCKS_PER_REQUEST]
+        await append_blocks(page["id"], batch)
+        blocks_written += len(batch)
+        if on_batch:
+            on_batch(page, blocks_written)
+    return page
@@ -0,0 +1,101 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Tuple
+
+from utils.disk_cache import DiskCache
+
+# Notion reports last_edited_time rounded down to the minute, so a page edited
+# within the last minute may change again without its timestamp moving.
+_EDIT_TIME_RESOLUTION = timedelta(minutes=1)
+
+
+def is_settled(last_edited_time: str, now: datetime | None = None) -> bool:
+    """Return True once `last_edited_time` can no longer hide a newer edit."""
+    try:
+        edited = datetime.fromisoformat(last_edited_time.replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    now = now or datetime.now(timezone.utc)
+    return now - edited > _EDIT_TIME_RESOLUTION
+
+
+class PageMarkdownCache:
+    """
+    Two-tier cache of exported page markdown keyed by page id.
+
+    Entries are only served for the `last_edited_time` they were exported at.
+    The memory tier is an LRU bounded by `max_bytes` of markdown; the optional
+    disk tier keeps exports across restarts.
+    """
+
+    def __init__(
+        self, max_bytes: int = 32 * 1024 * 1024, disk: DiskCache | None = None
+    ):
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._total_bytes = 0
+
+    @staticmethod
+    def _disk_key(page_id: str, last_edited_time: str) -> str:
+        return hashlib.sha256(f"{page_id}\0{last_edited_time}".encode()).hexdigest()
+
+    def _remember(self, page_id: str, last_edited_time: str, markdown: str) -> None:
+        size = len(markdown.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self._forget(page_id)
+        self._entries[page_id] = (last_edited_time, markdown)
+        self._total_bytes += size
+        while self._total_bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._total_bytes -= len(evicted.encode("utf-8"))
+
+    def _forget(self, page_id: str) -> None:
+        entry = self._entries.pop(page_id, None)
+        if entry:
+            self._total_bytes -= len(entry[1].encode("utf-8"))
+
+    def get(self, page_id: str, last_edited_time: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(page_id)
+            if entry and entry[0] == last_edited_time:
+                self._entries.move_to_end(page_id)
+                self.hits += 1
+                return entry[1]
+        markdown = None
+        if self.disk:
+            markdown = self.disk.get(self._disk_key(page_id, last_edited_time))
+        with self._lock:
+            if markdown is None:
+                self.misses += 1
+                return None
+            self._remember(page_id, last_edited_time, markdown)
+            self.hits += 1
+            return markdown
+
+    def put(self, page_id: str, last_edited_time: str, markdown: str) -> None:
+        if not is_settled(last_edited_time):
+            return
+        with self._lock:
+            self._remember(page_id, last_edited_time, markdown)
+        if self.disk:
+            self.disk.put(self._disk_key(page_id, last_edited_time), markdown)
+
+    def invalidate(self, page_id: str) -> None:
+        with self._lock:
+            self._forget(page_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
@@ -0,0 +1,142 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Sequence
+
+from utils.constants import ChunkConstants
+
+logger = logging.getLogger(__name__)
+
+# Called with the images of a group and their zero-based page numbers;
+# returns the group's Markdown.
+Transcribe = Callable[[List[str], range], str]
+
+SECTIONS = [name for _, name in ChunkConstants.HEADERS_TO_SPLIT_ON.value]
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_HEADER = re.compile(r"^(#{1,2})\s+(.*?)\s*#*\s*$")
+FAILED_PAGE_MARKER = "?? Page {page} could not be transcribed."
+_FAILED_PAGE = re.compile(r"^\?\? Page (\d+) could not be transcribed\.$", re.M)
+
+
+def page_groups(n_pages: int, group_size: int) -> List[range]:
+    group_size = max(1, group_size)
+    return [
+        range(start, min(start + group_size, n_pages))
+        for start in range(0, n_pages, group_size)
+    ]
+
+
+def _transcribe_page(
+    images: Sequence[str], page: int, transcribe: Transcribe, attempts: int
+) -> str:
+    for attempt in range(1, attempts + 1):
+        try:
+            return transcribe([images[page]], range(page, page + 1))
+        except Exception:
+            logger.warning(
+                "Transcribing page %d failed (attempt %d/%d)",
+                page + 1,
+                attempt,
+                attempts,
+                exc_info=True,
+            )
+    logger.error("Giving up on page %d", page + 1)
+    return FAILED_PAGE_MARKER.format(page=page + 1)
+
+
+def _transcribe_group(
+    images: Sequence[str], pages: range, transcribe: Transcribe, page_attempts: int
+) -> List[str]:
+    if len(pages) > 1:
+        try:
+            return [transcribe([images[p] for p in pages], pages)]
+        except Exception:
+            logger.warning(
+                "Transcribing pages %d-%d failed; retrying them one by one",
+                pages[0] + 1,
+                pages[-1] + 1,
+                exc_info=True,
+            )
+    return [_transcribe_page(images, p, transcribe, page_attempts) for p in pages]
+
+
+def transcribe_pages(
+    images: Sequence[str],
+    transcribe: Transcribe,
+    group_size: int = 2,
+    max_workers: int = 4,
+    page_attempts: int = 2,
+) -> List[str]:
+    """
+    Transcribe images in groups of `group_size` pages, at most `max_workers`
+    groups at a time, and return the Markdown parts in page order.
+
+    A failed group is retried page by page, each page up to `page_attempts`
+    times, so one bad page does not cost a retry of the whole chapter. A
+    page that still fails is marked with `FAILED_PAGE_MARKER` in the notes
+    instead; `failed_pages` finds those marks again.
+    """
+    groups = page_groups(len(images), group_size)
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="ocr"
+    ) as executor:
+        futures = [
+            executor.submit(_transcribe_group, images, pages, transcribe, page_attempts)
+            for pages in groups
+        ]
+        return [part for future in futures for part in future.result()]
+
+
+def failed_pages(markdown: str) -> List[int]:
+    """Return the one-based numbers of pages marked as not transcribed."""
+    return sorted({int(page) for page in _FAILED_PAGE.findall(markdown)})
+
+
+def _section_name(title: str) -> str | None:
+    normalized = re.sub(r"\s+", " ", title.lower().replace(" and ", " & ")).strip()
+    for name in SECTIONS:
+        if normalized == name.lower():
+            return name
+    return None
+
+
+def merge_page_markdown(parts: Sequence[str]) -> str:
+    """
+    Merge per-group Markdown into one Summary / Cues & Key Terms / Notes note.
+
+    Section contents are concatenated in page order. The first H1 is kept
+    as the title and repeated ones are dropped. Other H2 sections are
+    demoted to H3 under Notes, and text outside any section belongs to
+    Notes. Headers inside fenced code blocks are left alone.
+    """
+    title = None
+    sections: Dict[str, List[str]] = {name: [] for name in SECTIONS}
+    for part in parts:
+        current = SECTIONS[-1]
+        lines: Dict[str, List[str]] = {name: [] for name in SECTIONS}
+        in_fence = False
+        for line in part.splitlines():
+            if _FENCE.match(line):
+                in_fence = not in_fence
+            header = None if in_fence else _HEADER.match(line)
+            if header and len(header.group(1)) == 1:
+                title = title or line.strip()
+                continue
+            if header:
+                section = _section_name(header.group(2))
+                if section:
+                    current = section
+                    continue
+                current = SECTIONS[-1]
+                line = f"### {header.group(2)}"
+            lines[current].append(line)
+        for name, section_lines in lines.items():
+            text = "\n".join(section_lines).strip("\n")
+            if text.strip():
+                sections[name].append(text)
+
+    blocks = [title] if title else []
+    for name in SECTIONS:
+        if sections[name]:
+            blocks.append(f"## {name}\n\n" + "\n\n".join(sections[name]))
+    return "\n\n".join(blocks) + "\n"
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from utils.quiz_grading import CORRECT, PARTIALLY_CORRECT
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    notes_hash TEXT NOT NULL,
+    question_key TEXT NOT NULL,
+    text TEXT NOT NULL,
+    refs TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    times_asked INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (notes_hash, question_key)
+);
+"""
+_VERDICT_SCORES = {CORRECT: 1.0, PARTIALLY_CORRECT: 0.5}
+# Unasked questions rank between well and poorly answered ones.
+_UNASKED_WEIGHT = 2.0
+
+
+def hash_notes(notes_md: str) -> str:
+    return hashlib.sha256(notes_md.encode("utf-8")).hexdigest()
+
+
+def _question_key(text: str) -> str:
+    normalized = " ".join(re.findall(r"\w+", text.lower()))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _weight(times_asked: int, score_sum: float) -> float:
+    if not times_asked:
+        return _UNASKED_WEIGHT
+    return 1.0 + 2.0 * (1.0 - score_sum / times_asked)
+
+
+class QuestionBank:
+    """
+    Persistent store of generated quiz questions keyed by notes content hash.
+
+    Questions are sampled without replacement, weighted towards ones answered
+    poorly before, and spread across the notes' sections by their refs.
+    """
+
+    def __init__(self, db_path: str | Path):
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def count(self, notes_hash: str) -> int:
+        with self._lock:
+            (n,) = self._conn.execute(
+                "SELECT COUNT(*) FROM questions WHERE notes_hash = ?", (notes_hash,)
+            ).fetchone()
+        return n
+
+    def add(self, notes_hash: str, questions: Sequence[Dict]) -> int:
+        """Store new questions, skipping ones already banked; return how many."""
+        now = time.time()
+        rows = [
+            (
+                notes_hash,
+                _question_key(q["text"]),
+                q["text"],
+                json.dumps(q.get("refs") or []),
+                now,
+            )
+            for q in questions
+            if q.get("text")
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO questions"
+                " (notes_hash, question_key, text, refs, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self._conn.total_changes - before
+
+    def sample(
+        self, notes_hash: str, n: int, rng: random.Random | None = None
+    ) -> List[Dict]:
+        rng = rng or random.Random()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT text, refs, times_asked, score_sum FROM questions"
+                " WHERE notes_hash = ?",
+                (notes_hash,),
+            ).fetchall()
+
+        # Weighted sampling without replacement (Efraimidis-Spirakis keys).
+        ranked = sorted(
+            rows,
+            key=lambda row: rng.random() ** (1.0 / _weight(row[2], row[3])),
+            reverse=True,
+        )
+        # First pass takes one question per section, the second fills up.
+        picked, seen_refs = [], set()
+        for row in ranked:
+            section = tuple(json.loads(row[1])[-1:])
+            if section not in seen_refs:
+                picked.append(row)
+                seen_refs.add(section)
+            if len(picked) == n:
+                break
+        for row in ranked:
+            if len(picked) == n:
+                break
+            if row not in picked:
+                picked.append(row)
+
+        return [
+            {"id": f"q{i:02d}", "text": row[0], "refs": json.loads(row[1])}
+            for i, row in enumerate(picked, start=1)
+        ]
+
+    def record_results(self, notes_hash: str, graded: Sequence[Dict]) -> None:
+        """Fold per-question verdicts into each question's answer history."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE questions SET times_asked = times_asked + 1,"
+                " score_sum = score_sum + ?"
+                " WHERE notes_hash = ? AND question_key = ?",
+                [
+                    (
+                        _VERDICT_SCORES.get(grade["verdict"], 0.0),
+                        notes_hash,
+                        _question_key(grade["question"]),
+                    )
+                    for grade in graded
+                ],
+            )
@@ -0,0 +1,84 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+QuizKey = Tuple[str, str]
+
+
+class QuizCache:
+    """
+    Generated quizzes keyed by `(page_id, last_edited_time)`.
+
+    `prefetch` generates quizzes for the first due notes on a bounded worker
+    pool; `get_or_generate` hands out a finished quiz, waits for one in
+    flight, or generates it on the caller's thread. Each prefetched quiz is
+    handed out once so the next revision of a page samples fresh questions.
+    An edited page gets a new key, so quizzes never outlive their notes.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[Dict[str, Any]], Dict[str, Any]],
+        max_workers: int = 2,
+        max_entries: int = 32,
+    ):
+        self.generate = generate
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="quiz-prefetch"
+        )
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[QuizKey, Future]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(note: Dict[str, Any]) -> QuizKey:
+        return note["page_id"], note.get("last_edited_time") or ""
+
+    def _store(self, key: QuizKey, future: Future) -> None:
+        self._entries[key] = future
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def prefetch(self, notes: List[Dict[str, Any]], top_n: int) -> int:
+        """Start generating quizzes for the first `top_n` notes; return how many."""
+        started = 0
+        with self._lock:
+            for note in notes[:top_n]:
+                key = self._key(note)
+                if key in self._entries:
+                    continue
+                self._store(key, self._executor.submit(self.generate, note))
+                started += 1
+        if started:
+            logger.info("Prefetching quizzes for %d due notes", started)
+        return started
+
+    def get_or_generate(self, note: Dict[str, Any]) -> Dict[str, Any]:
+        key = self._key(note)
+        with self._lock:
+            future = self._entries.pop(key, None)
+        if future is not None:
+            try:
+                quiz = future.result()
+                with self._lock:
+                    self.hits += 1
+                return quiz
+            except Exception:
+                logger.exception("Prefetched quiz for %s failed; regenerating", key[0])
+        with self._lock:
+            self.misses += 1
+        return self.generate(note)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
@@ -0,0 +1,76 @@
+from collections import Counter
+from concurrent.futures import Future, wait
+from typing import Dict, List
+
+CORRECT = "Correct"
+PARTIALLY_CORRECT = "Partially Correct"
+INCORRECT = "Incorrect"
+_MAX_REVIEW_AREAS = 3
+
+
+def normalize_verdict(verdict: str) -> str:
+    text = verdict.strip().lower()
+    if text.startswith("partial"):
+        return PARTIALLY_CORRECT
+    if text == "correct":
+        return CORRECT
+    return INCORRECT
+
+
+class GradingSession:
+    """Background grading futures of one quiz, keyed by question index."""
+
+    def __init__(self):
+        self._futures: Dict[int, Future] = {}
+
+    def add(self, index: int, future: Future) -> None:
+        self._futures[index] = future
+
+    def missing(self, n_questions: int) -> List[int]:
+        return [i for i in range(n_questions) if i not in self._futures]
+
+    def results(self, timeout: float | None = None) -> List[Dict]:
+        """Wait for every grade and return them in question order."""
+        futures = [self._futures[i] for i in sorted(self._futures)]
+        wait(futures, timeout=timeout)
+        return [future.result(timeout=0) for future in futures]
+
+
+def aggregate_evaluations(graded: List[Dict], notion_url: str) -> str:
+    """Merge per-question grades into the Markdown evaluation report."""
+    sections = []
+    for i, grade in enumerate(graded, start=1):
+        sections.append(
+            f"#### Question {i}\n"
+            f"_{grade['question']}_\n\n"
+            f"**{grade['verdict']}**\n\n"
+            f"{grade['feedback']}".rstrip()
+        )
+
+    verdicts = Counter(grade["verdict"] for grade in graded)
+    gaps = [
+        f"- Question {i}: {grade['question']}"
+        for i, grade in enumerate(graded, start=1)
+        if grade["verdict"] != CORRECT
+    ]
+    review_areas = list(
+        dict.fromkeys(
+            grade["review_area"]
+            for grade in graded
+            if grade["verdict"] != CORRECT and grade.get("review_area")
+        )
+    )[:_MAX_REVIEW_AREAS]
+
+    summary = [
+        "### Summary",
+        f"**Score:** {verdicts[CORRECT]}/{len(graded)} correct, "
+        f"{verdicts[PARTIALLY_CORRECT]} partially correct, "
+        f"{verdicts[INCORRECT]} incorrect.",
+    ]
+    if gaps:
+        summary += ["", "**Knowledge gaps**", *gaps]
+    if review_areas:
+        summary += ["", "**Review areas**", *[f"- {area}" for area in review_areas]]
+    if notion_url:
+        summary += ["", f"**Notion page:** {notion_url}"]
+    return "\n\n".join(sections + ["\n".join(summary)])
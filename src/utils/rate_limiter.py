@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Notion documents an average of three requests per second per integration.
+NOTION_REQUESTS_PER_SEC = 3.0
+_RETRYABLE_STATUSES = {429, 502, 503, 504}
+# API errors with a JSON body, gateway errors with an HTML one (reported as
+# `UnknownHTTPResponseError`) and client-side timeouts.
+NotionError = HTTPResponseError | RequestTimeoutError
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with an adaptive refill rate.
+
+    The rate is halved whenever the server pushes back and creeps back up to
+    `max_rate` on every success, so callers settle just below the real limit.
+    """
+
+    def __init__(self, rate_per_sec: float, capacity: float | None = None):
+        self.max_rate = rate_per_sec
+        self.min_rate = rate_per_sec / 8
+        self.rate = rate_per_sec
+        self.capacity = capacity if capacity is not None else rate_per_sec
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def _reserve(self) -> float:
+        """Take a token if one is available, else return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Block until a token is available and return the time spent waiting."""
+        waited = 0.0
+        while delay := self._reserve():
+            time.sleep(delay)
+            waited += delay
+        return waited
+
+    async def acquire_async(self) -> float:
+        waited = 0.0
+        while delay := self._reserve():
+            await asyncio.sleep(delay)
+            waited += delay
+        return waited
+
+    def penalize(self, retry_after: float) -> None:
+        with self._lock:
+            self._blocked_until = max(
+                self._blocked_until, time.monotonic() + retry_after
+            )
+            self._tokens = 0
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def reward(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class NotionRateLimiter:
+    """
+    Runs Notion API calls within a shared request budget and retries 429s,
+    gateway errors and timeouts with backoff.
+    """
+
+    def __init__(
+        self,
+        rate_per_sec: float = NOTION_REQUESTS_PER_SEC,
+        burst: float | None = None,
+        max_retries: int = 5,
+        base_backoff_sec: float = 1.0,
+    ):
+        self.bucket = TokenBucket(rate_per_sec, capacity=burst)
+        self.max_retries = max_retries
+        self.base_backoff_sec = base_backoff_sec
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+        self._waited_sec = 0.0
+        self._first_request_at: float | None = None
+        self._last_request_at: float | None = None
+
+    def _record(self, waited: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._requests += 1
+            self._waited_sec += waited
+            if self._first_request_at is None:
+                self._first_request_at = now
+            self._last_request_at = now
+
+    def _retry_delay(self, error: NotionError, attempt: int) -> float:
+        headers = getattr(error, "headers", None)
+        retry_after = headers.get("Retry-After") if headers else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        backoff = self.base_backoff_sec * (2**attempt)
+        return backoff + random.uniform(0, backoff / 2)
+
+    def _should_retry(self, error: NotionError, attempt: int) -> float | None:
+        status = getattr(error, "status", None)
+        timed_out = isinstance(error, RequestTimeoutError)
+        if (not timed_out and status not in _RETRYABLE_STATUSES) or (
+            attempt >= self.max_retries
+        ):
+            return None
+        delay = self._retry_delay(error, attempt)
+        logger.warning(
+            "Notion %s; retrying in %.1fs (attempt %d)",
+            "timed out" if timed_out else f"returned {status}",
+            delay,
+            attempt + 1,
+        )
+        self.bucket.penalize(delay)
+        with self._lock:
+            self._retries += 1
+        return delay
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        attempt = 0
+        while True:
+            self._record(self.bucket.acquire())
+            try:
+                result = fn(*args, **kwargs)
+            except (HTTPResponseError, RequestTimeoutError) as e:
+                if self._should_retry(e, attempt) is None:
+                    raise
+                attempt += 1
+                continue
+            self.bucket.reward()
+            return result
+
+    async def call_async(
+        self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        attempt = 0
+        while True:
+            self._record(await self.bucket.acquire_async())
+            try:
+                result = await fn(*args, **kwargs)
+            except (HTTPResponseError, RequestTimeoutError) as e:
+                if self._should_retry(e, attempt) is None:
+                    raise
+                attempt += 1
+                continue
+            self.bucket.reward()
+            return result
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            span = 0.0
+            if self._first_request_at is not None and self._last_request_at:
+                span = self._last_request_at - self._first_request_at
+            return {
+                "requests": self._requests,
+                "retries": self._retries,
+                "waited_sec": round(self._waited_sec, 3),
+                "current_rate": round(self.bucket.rate, 3),
+                "achieved_rps": (
+                    round((self._requests - 1) / span, 3) if span else 0.0
+                ),
+            }
@@ -0,0 +1,217 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+# (conversation, tool name, canonical JSON arguments)
+CacheKey = Tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class ToolCachePolicy:
+    """
+    How results of one tool may be reused within a conversation.
+
+    `ttl_sec` of None means results are never reused. A successful call
+    drops cached results of every tool named in `invalidates`, in every
+    conversation. When `version` is set, a cached result is only reused
+    while it returns the same value as when the result was stored.
+    """
+
+    ttl_sec: float | None = None
+    invalidates: Tuple[str, ...] = ()
+    version: Callable[[], Any] | None = None
+
+
+@dataclass
+class ToolCallMetric:
+    name: str
+    latency_sec: float
+    cached: bool
+    error: bool = False
+
+
+def _content(output: Any) -> str:
+    if isinstance(output, str):
+        return output
+    try:
+        return json.dumps(output, ensure_ascii=False)
+    except TypeError:
+        return str(output)
+
+
+class CachingToolNode:
+    """
+    LangGraph node that runs the last AI message's tool calls concurrently.
+
+    Results of tools with a TTL policy are memoized per conversation (the
+    `thread_id` in the run config) and by arguments, so a repeated call is
+    answered without running the tool again. Identical calls in one step
+    share a single execution. Tool errors are returned to the model as error
+    ToolMessages, like the prebuilt ToolNode does, and are never cached.
+    Every ToolMessage carries its latency and cache hit in
+    `response_metadata`.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        policies: Dict[str, ToolCachePolicy] | None = None,
+        max_workers: int = 4,
+        max_entries: int = 256,
+    ):
+        self.tools = {tool.name: tool for tool in tools}
+        self.policies = policies or {}
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="chat-tools"
+        )
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[CacheKey, Tuple[float, Any, str]]" = OrderedDict()
+
+    @staticmethod
+    def _conversation(config: RunnableConfig | None) -> str:
+        configurable = (config or {}).get("configurable") or {}
+        return str(configurable.get("thread_id") or "")
+
+    def _policy(self, name: str) -> ToolCachePolicy:
+        return self.policies.get(name, ToolCachePolicy())
+
+    def _version(self, name: str) -> Any:
+        version = self._policy(name).version
+        return version() if version is not None else None
+
+    def _cached(self, key: CacheKey) -> str | None:
+        ttl = self._policy(key[1]).ttl_sec
+        if ttl is None:
+            return None
+        version = self._version(key[1])
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, stored_version, content = entry
+            if time.monotonic() - stored_at > ttl or stored_version != version:
+                del self._cache[key]
+                return None
+            return content
+
+    def _store(self, key: CacheKey, content: str, version: Any) -> None:
+        if self._policy(key[1]).ttl_sec is None:
+            return
+        with self._lock:
+            self._cache[key] = (time.monotonic(), version, content)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, tool_names: Sequence[str]) -> None:
+        """Drop cached results of `tool_names` in every conversation."""
+        with self._lock:
+            for key in [k for k in self._cache if k[1] in tool_names]:
+                del self._cache[key]
+
+    def _run(self, key: CacheKey, args: Dict[str, Any]) -> Tuple[str, bool]:
+        """Run one tool call; return its message content and whether it failed."""
+        tool = self.tools.get(key[1])
+        if tool is None:
+            return (
+                f"Error: {key[1]} is not a valid tool, "
+                f"try one of [{', '.join(self.tools)}].",
+                True,
+            )
+        # Read before running, so a change during the call marks it stale.
+        version = self._version(key[1])
+        try:
+            content = _content(tool.invoke(args))
+        except Exception as e:
+            logger.exception("Tool %s failed", key[1])
+            return f"Error: {e!r}\n Please fix your mistakes.", True
+        self._store(key, content, version)
+        invalidates = self._policy(key[1]).invalidates
+        if invalidates:
+            self.invalidate(invalidates)
+        return content, False
+
+    def __call__(
+        self, state: Dict[str, Any], config: RunnableConfig | None = None
+    ) -> Dict[str, List[ToolMessage]]:
+        message = state["messages"][-1]
+        tool_calls = message.tool_calls if isinstance(message, AIMessage) else []
+        conversation = self._conversation(config)
+
+        # Tools this step will invalidate must not be answered from cache.
+        for call in tool_calls:
+            invalidates = self._policy(call["name"]).invalidates
+            if invalidates:
+                self.invalidate(invalidates)
+
+        started = time.perf_counter()
+        running: Dict[CacheKey, Future] = {}
+        pending = []
+        for call in tool_calls:
+            key = (
+                conversation,
+                call["name"],
+                json.dumps(call["args"], sort_keys=True, default=str),
+            )
+            content = self._cached(key)
+            if content is not None:
+                pending.append((call, None, content))
+                continue
+            if key not in running:
+                running[key] = self._executor.submit(
+                    self._timed, self._run, key, call["args"]
+                )
+            pending.append((call, running[key], None))
+
+        messages, metrics = [], []
+        for call, future, content in pending:
+            if future is None:
+                metric = ToolCallMetric(call["name"], 0.0, cached=True)
+                status = "success"
+            else:
+                (content, error), latency = future.result()
+                metric = ToolCallMetric(call["name"], latency, False, error)
+                status = "error" if error else "success"
+            metrics.append(metric)
+            messages.append(
+                ToolMessage(
+                    content=content,
+                    name=call["name"],
+                    tool_call_id=call["id"],
+                    status=status,
+                    response_metadata={
+                        "latency_sec": metric.latency_sec,
+                        "cached": metric.cached,
+                    },
+                )
+            )
+
+        logger.info(
+            "Ran %d tool calls (%d cached) in %.2fs: %s",
+            len(metrics),
+            sum(m.cached for m in metrics),
+            time.perf_counter() - started,
+            ", ".join(
+                f"{m.name}={'cached' if m.cached else f'{m.latency_sec:.2f}s'}"
+                for m in metrics
+            ),
+        )
+        return {"messages": messages}
+
+    @staticmethod
+    def _timed(func, *args) -> Tuple[Any, float]:
+        started = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - started
@@ -0,0 +1,332 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, TypedDict
+
+import numpy as np
+from slugify import slugify
+
+logger = logging.getLogger(__name__)
+
+_VECTORS_FILE = "vectors.f32"
+_SIDECAR_FILE = "meta.json"
+_JOURNAL_FILE = "meta.log"
+
+
+class SearchHit(TypedDict):
+    chunk_id: str
+    text: str
+    metadata: Dict[str, Any]
+    score: float
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _kmeans(
+    vectors: np.ndarray, n_lists: int, iterations: int = 10, seed: int = 0
+) -> np.ndarray:
+    """Spherical k-means over unit vectors; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample = vectors
+    if len(vectors) > 256 * n_lists:
+        sample = vectors[rng.choice(len(vectors), 256 * n_lists, replace=False)]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        for i in range(n_lists):
+            members = sample[assignment == i]
+            if len(members):
+                centroids[i] = members.sum(axis=0)
+        centroids = _normalize(centroids)
+    return centroids
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index of chunk embeddings for one resource tag.
+
+    Vectors are stored as a float32 matrix in `vectors.f32` and memory-mapped
+    for search; chunk text and metadata live in the `meta.json` sidecar keyed
+    by chunk id. Adds and deletes are appended to the `meta.log` journal, so
+    a write costs its own size rather than the whole index; `compact` folds
+    the journal back into the sidecar. Replaced or deleted rows are
+    tombstoned until `compact`.
+    Indexes below `ivf_min_rows` live rows are searched by brute force; larger
+    ones are partitioned with k-means and only the `nprobe` closest lists are
+    scanned.
+    """
+
+    def __init__(
+        self, index_dir: str | Path, ivf_min_rows: int = 4096, nprobe: int = 8
+    ):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._vectors_path = self.index_dir / _VECTORS_FILE
+        self._sidecar_path = self.index_dir / _SIDECAR_FILE
+        self._journal_path = self.index_dir / _JOURNAL_FILE
+        self._generation = 0
+        self._dim: int | None = None
+        # Chunk id per matrix row, None for tombstoned rows.
+        self._rows: List[str | None] = []
+        self._chunks: Dict[str, Dict[str, Any]] = {}
+        self._matrix: np.ndarray | None = None
+        self._ivf: tuple[np.ndarray, List[np.ndarray]] | None = None
+        self._load()
+
+    def _load(self) -> None:
+        if self._sidecar_path.exists():
+            sidecar = json.loads(self._sidecar_path.read_text(encoding="utf-8"))
+            self._dim = sidecar["dim"]
+            self._rows = sidecar["rows"]
+            self._chunks = sidecar["chunks"]
+            self._generation = sidecar.get("generation", 0)
+        self._replay_journal()
+        expected = len(self._rows) * (self._dim or 0) * 4
+        actual = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        if actual > expected:
+            # An interrupted `add` appended vectors but never recorded them.
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(expected)
+        elif actual < expected:
+            raise ValueError(
+                f"Vector index {self.index_dir} is corrupt: "
+                f"expected {expected} bytes of vectors, found {actual}"
+            )
+
+    def _replay_journal(self) -> None:
+        if not self._journal_path.exists():
+            return
+        good = 0
+        with open(self._journal_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                good += len(line)
+                # Entries left over from before the last `compact` are in
+                # the sidecar already.
+                if entry["generation"] == self._generation:
+                    self._apply(entry)
+        if good < self._journal_path.stat().st_size:
+            # Drop the torn tail of an interrupted write.
+            with open(self._journal_path, "r+b") as f:
+                f.truncate(good)
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        if entry["op"] == "add":
+            self._dim = entry["dim"]
+            self._tombstone([chunk_id for chunk_id, _, _ in entry["chunks"]])
+            for chunk_id, text, metadata in entry["chunks"]:
+                self._chunks[chunk_id] = {
+                    "row": len(self._rows),
+                    "text": text,
+                    "metadata": metadata,
+                }
+                self._rows.append(chunk_id)
+        else:
+            self._tombstone(entry["ids"])
+
+    def _append_journal(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps({**entry, "generation": self._generation}) + "\n"
+        with open(self._journal_path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def _save(self) -> None:
+        """Write a full sidecar and start a new, empty journal generation."""
+        self._generation += 1
+        sidecar = {
+            "dim": self._dim,
+            "rows": self._rows,
+            "chunks": self._chunks,
+            "generation": self._generation,
+        }
+        tmp = self._sidecar_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(sidecar), encoding="utf-8")
+        os.replace(tmp, self._sidecar_path)
+        self._journal_path.unlink(missing_ok=True)
+
+    def _invalidate(self) -> None:
+        self._matrix = None
+        self._ivf = None
+
+    def _load_matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            if not self._rows:
+                self._matrix = np.empty((0, self._dim or 0), dtype=np.float32)
+            else:
+                self._matrix = np.memmap(
+                    self._vectors_path,
+                    dtype=np.float32,
+                    mode="r",
+                    shape=(len(self._rows), self._dim),
+                )
+        return self._matrix
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._chunks
+
+    def add(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]] | np.ndarray,
+        metadatas: Sequence[Dict[str, Any]],
+    ) -> None:
+        """Add chunks, replacing any already indexed under the same id."""
+        if not ids:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(ids):
+            raise ValueError("Expected one vector per chunk id")
+        with self._lock:
+            if self._dim is None:
+                self._dim = int(matrix.shape[1])
+            elif matrix.shape[1] != self._dim:
+                raise ValueError(
+                    f"Expected {self._dim}-dimensional vectors, got {matrix.shape[1]}"
+                )
+            entry = {
+                "op": "add",
+                "dim": self._dim,
+                "chunks": [
+                    [chunk_id, text, dict(metadata)]
+                    for chunk_id, text, metadata in zip(ids, texts, metadatas)
+                ],
+            }
+            with open(self._vectors_path, "ab") as f:
+                f.write(_normalize(matrix).astype(np.float32).tobytes())
+            self._append_journal(entry)
+            self._apply(entry)
+            self._invalidate()
+
+    def _tombstone(self, ids: Sequence[str]) -> int:
+        removed = 0
+        for chunk_id in ids:
+            chunk = self._chunks.pop(chunk_id, None)
+            if chunk is not None:
+                self._rows[chunk["row"]] = None
+                removed += 1
+        return removed
+
+    def delete(self, ids: Sequence[str]) -> int:
+        with self._lock:
+            ids = [chunk_id for chunk_id in ids if chunk_id in self._chunks]
+            if ids:
+                self._append_journal({"op": "delete", "ids": ids})
+                self._tombstone(ids)
+                self._invalidate()
+            return len(ids)
+
+    def delete_document(self, doc_id: str) -> int:
+        """Remove every chunk of one ingested document."""
+        with self._lock:
+            ids = [
+                chunk_id
+                for chunk_id, chunk in self._chunks.items()
+                if chunk["metadata"].get("doc_id") == doc_id
+            ]
+            return self.delete(ids)
+
+    def compact(self) -> None:
+        """Rewrite the matrix without tombstoned rows and fold in the journal."""
+        with self._lock:
+            if len(self._chunks) == len(self._rows):
+                if self._journal_path.exists():
+                    self._save()
+                return
+            live = [row for row, chunk_id in enumerate(self._rows) if chunk_id]
+            matrix = np.array(self._load_matrix()[live]) if live else None
+            self._matrix = None
+            tmp = self._vectors_path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                if matrix is not None:
+                    f.write(matrix.tobytes())
+            os.replace(tmp, self._vectors_path)
+            self._rows = [self._rows[row] for row in live]
+            for row, chunk_id in enumerate(self._rows):
+                self._chunks[chunk_id]["row"] = row  # type: ignore[index]
+            self._invalidate()
+            self._save()
+
+    def _live_rows(self) -> np.ndarray:
+        return np.array(
+            [row for row, chunk_id in enumerate(self._rows) if chunk_id], dtype=np.int64
+        )
+
+    def _candidate_rows(self, query: np.ndarray) -> np.ndarray:
+        live = self._live_rows()
+        if len(live) < self.ivf_min_rows:
+            return live
+        if self._ivf is None:
+            vectors = np.asarray(self._load_matrix()[live])
+            n_lists = max(1, int(np.sqrt(len(live))))
+            centroids = _kmeans(vectors, n_lists)
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            lists = [live[assignment == i] for i in range(n_lists)]
+            self._ivf = (centroids, lists)
+            logger.info(
+                "Built IVF partition with %d lists for %s", n_lists, self.index_dir
+            )
+        centroids, lists = self._ivf
+        nearest = np.argsort(-(centroids @ query))[: self.nprobe]
+        return np.concatenate([lists[i] for i in nearest])
+
+    def search(
+        self, query: Sequence[float] | np.ndarray, k: int = 4
+    ) -> List[SearchHit]:
+        """Return up to `k` chunks most similar to `query`, best first."""
+        with self._lock:
+            if not self._chunks:
+                return []
+            q = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+            rows = self._candidate_rows(q)
+            scores = np.asarray(self._load_matrix()[rows]) @ q
+            top = np.argsort(-scores)
+            if len(scores) > k:
+                top = np.argpartition(-scores, k)[:k]
+                top = top[np.argsort(-scores[top])]
+            hits: List[SearchHit] = []
+            for i in top:
+                chunk_id = self._rows[rows[i]]
+                chunk = self._chunks[chunk_id]  # type: ignore[index]
+                hits.append(
+                    SearchHit(
+                        chunk_id=chunk_id,  # type: ignore[typeddict-item]
+                        text=chunk["text"],
+                        metadata=chunk["metadata"],
+                        score=float(scores[i]),
+                    )
+                )
+            return hits
+
+
+class VectorIndexStore:
+    """One `VectorIndex` per resource tag under a common root directory."""
+
+    def __init__(self, root_dir: str | Path):
+        self.root_dir = Path(root_dir)
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, VectorIndex] = {}
+
+    def get(self, resource_tag: str) -> VectorIndex:
+        name = slugify(resource_tag)
+        if not name:
+            raise ValueError("Resource tag cannot be empty after sanitization.")
+        with self._lock:
+            if name not in self._indexes:
+                self._indexes[name] = VectorIndex(self.root_dir / name)
+            return self._indexes[name]
@@ -1,12 +1,18 @@
-from typing import Any, Dict
+import uuid
+from typing import Any, Dict, Iterator, List
 from clients.gpt_client import GPTClient
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import StateGraph, START
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.messages import BaseMessage, SystemMessage
-from langgraph.prebuilt import ToolNode, tools_condition
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langgraph.prebuilt import tools_condition
 from models.models import ChatState
 from tools.notion_toolset import NotionToolset
 from tools.quiz_toolset import QuizToolset
+from utils.chat_history import ChatHistoryManager
+from utils.chat_stream import ChatStreamEvent, chat_stream_events
+from utils.tool_node import CachingToolNode
 from workflows.workflow import Workflow
 from langchain_core.runnables import RunnableConfig
 
@@ -22,16 +28,30 @@ class ChatbotWorkflow(Workflow):
         prompts: Dict[str, str],
         notion_toolset: NotionToolset | None = None,
         quiz_toolset: QuizToolset | None = None,
+        max_tool_workers: int = 4,
+        summary_prompts: Dict[str, str] | None = None,
+        history_token_budget: int = 6000,
+        tool_output_tokens: int = 400,
+        checkpointer: BaseCheckpointSaver | None = None,
     ):
         self.gpt_client = gpt_client
         self.prompts = prompts
+        self.summary_prompts = summary_prompts
+        self.history_manager = ChatHistoryManager(
+            self._summarize,
+            token_budget=history_token_budget,
+            tool_output_tokens=tool_output_tokens,
+        )
         self.prompt_template = self._initialize_prompt_template()
         self.notion_toolset = notion_toolset
         self.quiz_toolset = quiz_toolset
         self.tools = self._initialize_tools()
+        self.tool_node = CachingToolNode(
+            self.tools, self._initialize_tool_policies(), max_workers=max_tool_workers
+        )
         self.llm = self._initialize_llm()
         self.graph = self._build_graph()
-        self.graph_compiled = self.graph.compile()
+        self.graph_compiled = self.graph.compile(checkpointer=checkpointer)
 
     def _initialize_prompt_template(self):
         return ChatPromptTemplate.from_messages(
@@ -46,21 +66,45 @@ class ChatbotWorkflow(Workflow):
             tools += self.quiz_toolset.as_tools()
         return tools
 
+    def _initialize_tool_policies(self):
+        policies = {}
+        if self.notion_toolset:
+            policies.update(self.notion_toolset.cache_policies())
+        if self.quiz_toolset:
+            policies.update(self.quiz_toolset.cache_policies())
+        return policies
+
     def _initialize_llm(self):
         return self.gpt_client.instance().bind_tools(self.tools)
 
     def agent_node(self, state: ChatState):
-        history = state["messages"]
         system_message = self.prompt_template.format_messages()
-        history_wo_system = [m for m in history if not isinstance(m, SystemMessage)]
-        formatted_messages = system_message + history_wo_system
+        history = self.history_manager.prepare(state["messages"])
+        formatted_messages = system_message + history
         response = self.llm.invoke(formatted_messages)
         return {"messages": [response]}
 
+    def _summarize(self, summary: str, transcript: str) -> str:
+        if not self.summary_prompts:
+            raise ValueError("Chat history is over budget but no summary prompts")
+        messages = [
+            SystemMessage(content=self.summary_prompts["system_prompt"]),
+            HumanMessage(
+                content=self.summary_prompts["human_prompt"].format(
+                    summary=summary or "(none)", transcript=transcript
+                )
+            ),
+        ]
+        # Keep the summary call out of the chat token stream.
+        response = self.gpt_client.instance().invoke(
+            messages, config={"tags": [TAG_NOSTREAM]}
+        )
+        return response.text
+
     def _build_graph(self):
         graph = StateGraph(ChatState)
         graph.add_node("agent", self.agent_node)
-        graph.add_node("tools", ToolNode(self.tools))
+        graph.add_node("tools", self.tool_node)
         graph.add_edge(START, "agent")
         graph.add_conditional_edges("agent", tools_condition)
         graph.add_edge("tools", "agent")
@@ -86,15 +130,54 @@ class ChatbotWorkflow(Workflow):
             raise ValueError("Input must contain a non-empty 'messages' list")
         return ChatState(messages=messages)
 
-    def run(self, input: Dict[str, BaseMessage]) -> Dict:
+    @staticmethod
+    def _config(thread_id: str | None) -> RunnableConfig:
+        return RunnableConfig(
+            recursion_limit=10,
+            configurable={"thread_id": thread_id or uuid.uuid4().hex},
+        )
+
+    def run(self, input: Dict[str, BaseMessage], thread_id: str | None = None) -> Dict:
         """
         Run the chatbot workflow with the provided input.
 
         Args:
-            input (Any): The input containing the conversation history.
+            input (Any): The input containing the new messages of the turn.
+            thread_id (str | None): The conversation to continue. Earlier
+                messages are loaded from the checkpointer, so only new ones
+                need to be sent. A new thread is started if omitted.
 
         Returns:
             Any: The output from the compiled graph.
         """
         state = self._coerce_input(input)
-        return self.graph_compiled.invoke(state, RunnableConfig(recursion_limit=10))
+        return self.graph_compiled.invoke(state, self._config(thread_id))
+
+    def stream(
+        self, input: Dict[str, BaseMessage], thread_id: str | None = None
+    ) -> Iterator[ChatStreamEvent]:
+        """
+        Run the chatbot workflow, yielding tokens and tool events as they happen.
+
+        Args:
+            input (Any): The input containing the new messages of the turn.
+            thread_id (str | None): The conversation to continue, as in `run`.
+
+        Yields:
+            ChatStreamEvent: Token and tool events, then a DONE event carrying
+            the final message.
+        """
+        state = self._coerce_input(input)
+        parts = self.graph_compiled.stream(
+            state,
+            self._config(thread_id),
+            stream_mode=["messages", "values"],
+        )
+        yield from chat_stream_events(parts)
+
+    def history(self, thread_id: str) -> List[BaseMessage]:
+        """Return the checkpointed messages of a conversation."""
+        if self.graph_compiled.checkpointer is None:
+            return []
+        state = self.graph_compiled.get_state(self._config(thread_id))
+        return state.values.get("messages", [])
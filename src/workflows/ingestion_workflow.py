@@ -1,29 +1,39 @@
 import uuid
 import hashlib
+import logging
+import time
 from datetime import datetime
-from typing import List, Dict, Tuple
-from langchain_openai import OpenAIEmbeddings
+from typing import Any, List, Dict, Tuple
 from langchain_core.runnables import RunnableLambda, RunnableConfig
 from langchain_core.documents import Document
 from langchain_text_splitters import (
     MarkdownHeaderTextSplitter,
     RecursiveCharacterTextSplitter,
 )
+from streamlit.proto.Common_pb2 import FileURLs
+from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
 
-# from langchain_chroma import Chroma
 from utils.constants import (
     Label,
     INGESTION_WORKFLOW_STEP_COUNT,
     ChunkConstants,
+    IngestionStage,
 )
 
 # from clients.s3_client import upload_files_to_s3
 from clients.notion_client import NotionClient
-from config.config import SETTINGS
 
 # from utils.s3_utils import slugify
-from utils.image_utils import convert_file_to_base64
+from utils.image_utils import ImagePreprocessor, convert_file_to_base64
 from utils.embedding_utils import count_tokens
+from utils.ingestion_checkpoints import (
+    IngestionCheckpoint,
+    IngestionCheckpointStore,
+    image_ref,
+    ingestion_input_hash,
+)
+from utils.job_queue import Job, JobProgress
+from utils.page_transcription import failed_pages
 from models.models import (
     InputPayload,
     B64Payload,
@@ -32,17 +42,58 @@ from models.models import (
     EmbeddingPayload,
     ChunkMetadata,
 )
+from utils.embedding_store import EmbeddingStore
+from utils.vector_index import VectorIndexStore
 from workflows.llm_markdown_workflow import LLMMarkdownWorkflow
 from workflows.workflow import Workflow
 
+logger = logging.getLogger(__name__)
+
+
+def format_ingestion_report(report: Dict[str, Any]) -> str:
+    parts = [
+        f"{report.get('images', 0)} images",
+        f"{report.get('image_payload_bytes', 0) / 1e6:.2f} MB sent",
+    ]
+    if report.get("image_preprocessing"):
+        parts.append(
+            f"{report.get('image_bytes_saved', 0) / 1e6:.2f} MB saved in "
+            f"{report.get('image_prep_sec', 0):.2f}s of preprocessing"
+        )
+    else:
+        parts.append("image preprocessing off")
+    if report.get("resumed_from"):
+        parts.append(f"resumed after {report['resumed_from'].replace('_', ' ')}")
+    if report.get("failed_pages"):
+        pages = ", ".join(str(page) for page in report["failed_pages"])
+        parts.append(f"pages {pages} not transcribed")
+    parts.append(f"markdown {report.get('markdown_sec', 0):.1f}s")
+    parts.append(f"total {report.get('total_sec', 0):.1f}s")
+    return ", ".join(parts)
+
+
+def chunk_id(notion_page_id: str, chunk_index: int) -> str:
+    """Stable id of a chunk, so indexing a page again replaces its chunks."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{notion_page_id}#{chunk_index}"))
+
 
 class IngestionWorkflow(Workflow):
 
     def __init__(
-        self, notion_client: NotionClient, llm_md_workflow: LLMMarkdownWorkflow
+        self,
+        notion_client: NotionClient,
+        llm_md_workflow: LLMMarkdownWorkflow,
+        vector_index_store: VectorIndexStore,
+        embedding_store: EmbeddingStore | None,
+        image_preprocessor: ImagePreprocessor | None = None,
+        checkpoint_store: IngestionCheckpointStore | None = None,
     ):
         self.notion_client = notion_client
         self.llm_md_workflow = llm_md_workflow
+        self.vector_index_store = vector_index_store
+        self.embedding_store = embedding_store
+        self.image_preprocessor = image_preprocessor
+        self.checkpoint_store = checkpoint_store
 
     def _update_progress_tracker(
         self, progress: int, label: str, config: RunnableConfig
@@ -52,6 +103,22 @@ class IngestionWorkflow(Workflow):
         ):
             config["configurable"]["progress_tracker"].progress(progress / INGESTION_WORKFLOW_STEP_COUNT, text=label)  # type: ignore
 
+    @staticmethod
+    def _report(config: RunnableConfig) -> Dict[str, Any]:
+        """Per-run timings and sizes, shared by the chain steps through the config."""
+        return config.get("configurable", {}).get("report", {})
+
+    @staticmethod
+    def _checkpoint(config: RunnableConfig) -> IngestionCheckpoint | None:
+        """Outputs of stages finished by an earlier attempt at the same run."""
+        return config.get("configurable", {}).get("checkpoint")
+
+    def _save_checkpoint(
+        self, checkpoint: IngestionCheckpoint | None, stage: IngestionStage
+    ) -> None:
+        if checkpoint is not None and self.checkpoint_store is not None:
+            self.checkpoint_store.save(checkpoint, stage)
+
     def _validate_inputs(
         self, input: InputPayload, config: RunnableConfig
     ) -> InputPayload:
@@ -71,12 +138,36 @@ class IngestionWorkflow(Workflow):
     def _convert_to_base64(
         self, input: InputPayload, config: RunnableConfig
     ) -> B64Payload:
+        report = self._report(config)
+        checkpoint = self._checkpoint(config)
+        if checkpoint and checkpoint.reached(IngestionStage.MARKDOWN_BUILT):
+            # The transcription is done; the images are not needed again.
+            self._update_progress_tracker(2, "reusing transcription...", config)
+            report["images"] = len(checkpoint.image_refs)
+            return B64Payload(
+                resource_tag=input.resource_tag,
+                chapter_name=input.chapter_name,
+                additional_context=input.additional_context,
+                images_b64=[],
+            )
         self._update_progress_tracker(2, "converting images to base64...", config)
-        images_b64 = [convert_file_to_base64(file) for file in input.files]
+        if self.image_preprocessor is not None:
+            # `getvalue()` hands back each upload's own bytes without a copy.
+            images = [file.getvalue() for file in input.files]
+            mimes = [(file.type or "image/jpeg").strip() for file in input.files]
+            images_b64, stats = self.image_preprocessor.to_data_urls(images, mimes)
+            report["image_prep_sec"] = stats.seconds
+            report["image_bytes_saved"] = stats.bytes_saved
+        else:
+            images_b64 = [convert_file_to_base64(file) for file in input.files]
+        report["images"] = len(images_b64)
+        report["image_payload_bytes"] = sum(len(url) for url in images_b64)
+        if checkpoint is not None:
+            checkpoint.image_refs = [image_ref(url) for url in images_b64]
+            self._save_checkpoint(checkpoint, IngestionStage.IMAGES_ENCODED)
         return B64Payload(
             resource_tag=input.resource_tag,
             chapter_name=input.chapter_name,
-            files=input.files,
             additional_context=input.additional_context,
             images_b64=images_b64,
         )
@@ -84,13 +175,27 @@ class IngestionWorkflow(Workflow):
     def _build_markdown_for_notes(
         self, input: B64Payload, config: RunnableConfig
     ) -> MarkdownPayload:
-        self._update_progress_tracker(3, "building markdown...", config)
-        llm_output = self.llm_md_workflow.run(
-            {
-                "user_instructions": input.additional_context,
-                "images_b64": input.images_b64,
-            }
-        )
+        report = self._report(config)
+        checkpoint = self._checkpoint(config)
+        if checkpoint and checkpoint.reached(IngestionStage.MARKDOWN_BUILT):
+            llm_output = checkpoint.markdown or ""
+        else:
+            self._update_progress_tracker(3, "building markdown...", config)
+            started = time.perf_counter()
+            llm_output = self.llm_md_workflow.run(
+                {
+                    "user_instructions": input.additional_context,
+                    "images_b64": input.images_b64,
+                }
+            )
+            report["markdown_sec"] = time.perf_counter() - started
+            if checkpoint is not None:
+                checkpoint.markdown = llm_output
+                self._save_checkpoint(checkpoint, IngestionStage.MARKDOWN_BUILT)
+        # Pages that failed every retry are ingested as marks, not content.
+        report["failed_pages"] = failed_pages(llm_output)
+        if report["failed_pages"]:
+            logger.warning("Pages %s were not transcribed", report["failed_pages"])
         return MarkdownPayload(
             resource_tag=input.resource_tag,
             chapter_name=input.chapter_name,
@@ -100,12 +205,28 @@ class IngestionWorkflow(Workflow):
     def _convert_markdown_to_notion_page(
         self, input: MarkdownPayload, config: RunnableConfig
     ) -> NotionPayload:
-        self._update_progress_tracker(4, "creating notion page...", config)
-        resp = self.notion_client.create_notion_page(
-            title=input.chapter_name,
-            resource_tag=input.resource_tag,
-            markdown=input.markdown,
-        )
+        checkpoint = self._checkpoint(config)
+        if checkpoint and checkpoint.reached(IngestionStage.NOTION_PAGE_WRITTEN):
+            resp = checkpoint.notion_page or {}
+        else:
+            self._update_progress_tracker(4, "creating notion page...", config)
+            checkpoint = checkpoint or IngestionCheckpoint("")
+
+            def on_batch(page: Dict, blocks_written: int) -> None:
+                checkpoint.notion_page = page
+                checkpoint.blocks_written = blocks_written
+                self._save_checkpoint(checkpoint, IngestionStage.NOTION_PAGE_STARTED)
+
+            # An interrupted page is finished rather than created again.
+            resp = self.notion_client.create_notion_page(
+                title=input.chapter_name,
+                resource_tag=input.resource_tag,
+                markdown=input.markdown,
+                page=checkpoint.notion_page,
+                blocks_written=checkpoint.blocks_written,
+                on_batch=on_batch,
+            )
+            self._save_checkpoint(checkpoint, IngestionStage.NOTION_PAGE_WRITTEN)
         return NotionPayload(
             resource_tag=input.resource_tag,
             chapter_name=input.chapter_name,
@@ -135,7 +256,7 @@ class IngestionWorkflow(Workflow):
                 chunk_count=len(text_split_chunks),
                 created_at=datetime.now().isoformat(),
                 doc_id=input.notion_resp["id"],
-                chunk_id=str(uuid.uuid4()),
+                chunk_id=chunk_id(input.notion_resp["id"], idx),
                 resource_tag=input.resource_tag,
                 chapter_name=input.chapter_name,
                 notion_page_id=input.notion_resp["id"],
@@ -156,17 +277,30 @@ class IngestionWorkflow(Workflow):
             output_chunks=output_chunks,
         )
 
-    def _embed_and_upsert_to_chroma(
-        self, input: EmbeddingPayload, config: RunnableConfig
-    ):
-        self._update_progress_tracker(7, "embed and upsert to chroma...", config)
-        embeddings = OpenAIEmbeddings(model=SETTINGS.embed_model)
-        # vector_store = Chroma(
-        #     collection_name=slugify(input.resource_tag),
-        #     embedding_function=embeddings,
-        #     persist_directory=SETTINGS.chroma_persist_dir,
-        # )
-        # vector_store.add_documents(input.output_chunks)
+    def _embed_and_upsert(self, input: EmbeddingPayload, config: RunnableConfig):
+        self._update_progress_tracker(7, "embedding and indexing chunks...", config)
+        if self.embedding_store is None:
+            logger.warning("No embedding store configured; skipping chunk indexing")
+            return
+        chunks = input.output_chunks
+        vectors, stats = self.embedding_store.embed(
+            [ch.page_content for ch in chunks],
+            [ch.metadata["content_hash"] for ch in chunks],
+        )
+        index = self.vector_index_store.get(input.resource_tag)
+        index.add(
+            ids=[ch.metadata["chunk_id"] for ch in chunks],
+            texts=[ch.page_content for ch in chunks],
+            vectors=vectors,
+            metadatas=[ch.metadata for ch in chunks],
+        )
+        logger.info(
+            "Indexed %d chunks under %s (%d total, embedding cache hit rate %.0f%%)",
+            len(chunks),
+            input.resource_tag,
+            len(index),
+            stats.hit_rate * 100,
+        )
 
     def _coerce_input(self, payload: Dict) -> Tuple[InputPayload, RunnableConfig]:
         if not isinstance(payload, dict):
@@ -188,27 +322,76 @@ class IngestionWorkflow(Workflow):
             files=files,
             additional_context=additional_context,
         )
+        report: Dict[str, Any] = {}
+        checkpoint = None
+        if self.checkpoint_store is not None:
+            input_hash = ingestion_input_hash(
+                chapter_name,
+                resource_tag,
+                additional_context,
+                [file.getvalue() for file in files],
+            )
+            checkpoint = self.checkpoint_store.claim(
+                input_hash,
+                payload.get("job_id") or "",
+                payload.get("job_is_running"),
+            )
+            if checkpoint.stage:
+                report["resumed_from"] = checkpoint.stage
+                logger.info("Resuming ingestion after stage %s", checkpoint.stage)
         runnable_config = RunnableConfig(
-            configurable={"progress_tracker": progress_tracker}
+            configurable={
+                "progress_tracker": progress_tracker,
+                "report": report,
+                "checkpoint": checkpoint,
+            }
         )
         return (input_payload, runnable_config)
 
-    def run(self, input: Dict) -> None:
+    def run(self, input: Dict) -> Dict[str, Any]:
         validate_r = RunnableLambda(self._validate_inputs)
         upload_r = RunnableLambda(self._upload_to_s3)
         convert_b64_r = RunnableLambda(self._convert_to_base64)
         build_markdown_r = RunnableLambda(self._build_markdown_for_notes)
         create_notion_page_r = RunnableLambda(self._convert_markdown_to_notion_page)
-        # split_markdown_r = RunnableLambda(self._split_markdown)
-        # embed_and_upsert_r = RunnableLambda(self._embed_and_upsert_to_chroma)
+        split_markdown_r = RunnableLambda(self._split_markdown)
+        embed_and_upsert_r = RunnableLambda(self._embed_and_upsert)
         chain = (
             validate_r
             | upload_r
             | convert_b64_r
             | build_markdown_r
             | create_notion_page_r
-            # | split_markdown_r
-            # | embed_and_upsert_r
+            | split_markdown_r
+            | embed_and_upsert_r
         )
         payload = self._coerce_input(input)
+        started = time.perf_counter()
         chain.invoke(input=payload[0], config=payload[1])
+        checkpoint = self._checkpoint(payload[1])
+        if checkpoint is not None and self.checkpoint_store is not None:
+            self.checkpoint_store.clear(checkpoint)
+        report = payload[1]["configurable"]["report"]
+        report["total_sec"] = time.perf_counter() - started
+        report["image_preprocessing"] = self.image_preprocessor is not None
+        logger.info("Ingestion report: %s", format_ingestion_report(report))
+        return report
+
+    def run_job(self, job: Job, progress: JobProgress) -> Dict[str, Any]:
+        """Run a queued ingestion job; its stages report progress to the queue."""
+        files = [
+            UploadedFile(
+                UploadedFileRec(f"{job.id}-{idx}", file.name, file.type, file.data),
+                FileURLs(),
+            )
+            for idx, file in enumerate(job.files)
+        ]
+        return self.run(
+            {
+                **job.payload,
+                "files": files,
+                "progress_tracker": progress,
+                "job_id": job.id,
+                "job_is_running": progress.queue.is_running,
+            }
+        )
@@ -0,0 +1,81 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
+from langchain_core.output_parsers import JsonOutputParser
+from clients.gpt_client import GPTClient
+from models.models import LLMAnswerEvaluationInput
+from typing import Any, Dict, List
+from utils.notes_context import select_question_context
+from utils.quiz_grading import normalize_verdict
+from workflows.workflow import Workflow
+
+logger = logging.getLogger(__name__)
+
+
+class LLMAnswerEvaluationWorkflow(Workflow):
+    """Grades one quiz answer at a time, optionally in the background."""
+
+    def __init__(
+        self,
+        gpt_client: GPTClient,
+        prompts: Dict[str, str],
+        token_budget: int = 2000,
+        max_workers: int = 4,
+    ):
+        self.gpt_client = gpt_client
+        self.prompts = prompts
+        self.token_budget = token_budget
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="answer-eval"
+        )
+
+    def _build_messages(self, input: LLMAnswerEvaluationInput) -> List[BaseMessage]:
+        notes = select_question_context(
+            input.notes_md,
+            [{"text": input.question, "refs": input.refs}],
+            self.token_budget,
+        )
+        system_message = SystemMessage(content=self.prompts["system_prompt"])
+        human_message = HumanMessage(
+            content=self.prompts["human_prompt"].format(
+                notes_md=notes.markdown, question=input.question, answer=input.answer
+            )
+        )
+        return [system_message, human_message]
+
+    def _coerce_input(self, payload: Dict[str, Any]) -> LLMAnswerEvaluationInput:
+        if not isinstance(payload, dict):
+            raise ValueError("Input must be a dict")
+        notes_md = payload.get("notes_md")
+        question = payload.get("question")
+        if not notes_md:
+            raise ValueError("notes_md is required")
+        if not question:
+            raise ValueError("question is required")
+        return LLMAnswerEvaluationInput(
+            notes_md=notes_md,
+            question=question,
+            answer=payload.get("answer") or "",
+            refs=payload.get("refs") or [],
+        )
+
+    def run(self, input: Dict[str, Any]) -> Dict[str, Any]:
+        answer_input = self._coerce_input(input)
+        prompt = ChatPromptTemplate.from_messages(self._build_messages(answer_input))
+        llm = self.gpt_client.instance()
+        parser = JsonOutputParser()
+        chain = prompt | llm | parser
+        output = chain.invoke({})
+        return {
+            "question": answer_input.question,
+            "answer": answer_input.answer,
+            "refs": answer_input.refs,
+            "verdict": normalize_verdict(output.get("verdict", "")),
+            "feedback": output.get("feedback", ""),
+            "review_area": output.get("review_area", ""),
+        }
+
+    def submit(self, input: Dict[str, Any]) -> Future:
+        """Grade an answer on the background executor."""
+        return self.executor.submit(self.run, input)
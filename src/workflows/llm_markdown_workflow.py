@@ -1,20 +1,49 @@
+import logging
+import time
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
 from clients.gpt_client import GPTClient
 from models.models import LLMChainInput
 from typing import List, Dict, Any
+from utils.constants import MarkdownOcrMode
+from utils.page_transcription import merge_page_markdown, transcribe_pages
 from workflows.workflow import Workflow
 
+logger = logging.getLogger(__name__)
+
 
 class LLMMarkdownWorkflow(Workflow):
-    def __init__(self, gpt_client: GPTClient, prompts: Dict[str, str]):
+    """
+    Transcribes note images into Markdown.
+
+    In grouped mode, chapters longer than one group are transcribed a few
+    pages per request, concurrently, and merged back into a single note.
+    Those requests make a single client retry, since a failed group is
+    retried page by page instead.
+    """
+
+    def __init__(
+        self,
+        gpt_client: GPTClient,
+        prompts: Dict[str, str],
+        ocr_mode: str = MarkdownOcrMode.SINGLE.value,
+        group_size: int = 2,
+        max_concurrency: int = 4,
+        page_attempts: int = 2,
+    ):
         self.gpt_client = gpt_client
         self.prompts = prompts
+        self.ocr_mode = ocr_mode
+        self.group_size = group_size
+        self.max_concurrency = max_concurrency
+        self.page_attempts = page_attempts
 
-    def _build_messages(self, input: LLMChainInput) -> List[BaseMessage]:
+    def _build_messages(
+        self, input: LLMChainInput, human_prompt: str | None = None
+    ) -> List[BaseMessage]:
         system_message = SystemMessage(content=self.prompts["system_prompt"])
-        human_prompt = self.prompts["human_prompt"].format(
+        human_prompt = human_prompt or self.prompts["human_prompt"].format(
             user_instructions=input.user_instructions
         )
         human_message_content: List[str | Dict] = [
@@ -38,11 +67,51 @@ class LLMMarkdownWorkflow(Workflow):
             user_instructions=users_instructions, images_b64=images_b64
         )
 
-    def run(self, input: Dict[str, Any]) -> str:
-        llm_chain_input = self._coerce_input(input)
-        prompt = ChatPromptTemplate.from_messages(self._build_messages(llm_chain_input))
-        llm = self.gpt_client.instance()
+    def _invoke(self, messages: List[BaseMessage], max_retries: int | None = None):
+        prompt = ChatPromptTemplate.from_messages(messages)
+        llm = self.gpt_client.instance(max_retries)
         parser = StrOutputParser()
         chain = prompt | llm | parser
-        output = chain.invoke({})
-        return output
+        return chain.invoke({})
+
+    def _run_grouped(self, input: LLMChainInput) -> str:
+        total_pages = len(input.images_b64)
+
+        def transcribe(images: List[str], pages: range) -> str:
+            human_prompt = self.prompts["page_group_prompt"].format(
+                first_page=pages[0] + 1,
+                last_page=pages[-1] + 1,
+                total_pages=total_pages,
+                user_instructions=input.user_instructions,
+            )
+            group_input = LLMChainInput(
+                user_instructions=input.user_instructions, images_b64=images
+            )
+            return self._invoke(
+                self._build_messages(group_input, human_prompt), max_retries=1
+            )
+
+        started = time.perf_counter()
+        parts = transcribe_pages(
+            input.images_b64,
+            transcribe,
+            group_size=self.group_size,
+            max_workers=self.max_concurrency,
+            page_attempts=self.page_attempts,
+        )
+        logger.info(
+            "Transcribed %d pages in groups of %d in %.1fs",
+            total_pages,
+            self.group_size,
+            time.perf_counter() - started,
+        )
+        return merge_page_markdown(parts)
+
+    def run(self, input: Dict[str, Any]) -> str:
+        llm_chain_input = self._coerce_input(input)
+        if (
+            self.ocr_mode == MarkdownOcrMode.GROUPED.value
+            and len(llm_chain_input.images_b64) > self.group_size
+        ):
+            return self._run_grouped(llm_chain_input)
+        return self._invoke(self._build_messages(llm_chain_input))
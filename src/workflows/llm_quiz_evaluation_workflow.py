@@ -1,22 +1,53 @@
+import logging
+import time
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
 from models.models import LLMQuizEvaluationInput
 from clients.gpt_client import GPTClient
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from utils.constants import QuizContextMode
+from utils.embedding_utils import count_tokens
+from utils.notes_context import NotesContext, PromptReport, select_question_context
 from workflows.workflow import Workflow
 
+logger = logging.getLogger(__name__)
+
 
 class LLMQuizEvaluationWorkflow(Workflow):
-    def __init__(self, gpt_client: GPTClient, prompts: Dict[str, str]):
+    def __init__(
+        self,
+        gpt_client: GPTClient,
+        prompts: Dict[str, str],
+        context_mode: str = QuizContextMode.RETRIEVAL.value,
+        token_budget: int = 6000,
+    ):
         self.gpt_client = gpt_client
         self.prompts = prompts
+        self.context_mode = context_mode
+        self.token_budget = token_budget
+
+    def _select_context(self, input: LLMQuizEvaluationInput, mode: str) -> NotesContext:
+        budget = self.token_budget
+        if mode == QuizContextMode.FULL.value:
+            budget = count_tokens(input.notes_md)
+        questions = [
+            {"text": x.get("question", ""), "refs": x.get("refs", [])}
+            for x in input.qna
+        ]
+        return select_question_context(input.notes_md, questions, budget)
 
-    def _build_messages(self, input: LLMQuizEvaluationInput) -> List[BaseMessage]:
+    def _build_messages(
+        self, input: LLMQuizEvaluationInput, notes: NotesContext
+    ) -> List[BaseMessage]:
+        qna = [
+            {"question": x.get("question", ""), "answer": x.get("answer", "")}
+            for x in input.qna
+        ]
         system_message = SystemMessage(content=self.prompts["system_prompt"])
         human_message = HumanMessage(
             content=self.prompts["human_prompt"].format(
-                notes_md=input.notes_md, qna=input.qna, notion_url=input.notion_url
+                notes_md=notes.markdown, qna=qna, notion_url=input.notion_url
             )
         )
         return [system_message, human_message]
@@ -33,13 +64,35 @@ class LLMQuizEvaluationWorkflow(Workflow):
             raise ValueError("qna is required")
         if not notion_url:
             raise ValueError("notion_url is required")
-        return LLMQuizEvaluationInput(notes_md=notes_md, qna=qna, notion_url=notion_url)
+        return LLMQuizEvaluationInput(
+            notes_md=notes_md,
+            qna=qna,
+            notion_url=notion_url,
+            context_mode=payload.get("context_mode"),
+        )
 
-    def run(self, input: Dict) -> str:
+    def run_with_report(self, input: Dict) -> Tuple[str, PromptReport]:
         evaluationInput = self._coerce_input(input)
-        prompt = ChatPromptTemplate.from_messages(self._build_messages(evaluationInput))
+        mode = evaluationInput.context_mode or self.context_mode
+        notes = self._select_context(evaluationInput, mode)
+        messages = self._build_messages(evaluationInput, notes)
+        # Messages are pre-formatted, so the prompt has no template variables.
+        prompt = ChatPromptTemplate.from_messages(messages)
         llm = self.gpt_client.instance()
         parser = StrOutputParser()
         chain = prompt | llm | parser
-        output = chain.invoke(input)
+        started = time.monotonic()
+        output = chain.invoke({})
+        report = PromptReport(
+            mode=mode,
+            notes_tokens=notes.tokens,
+            full_notes_tokens=notes.full_tokens,
+            prompt_tokens=sum(count_tokens(str(m.content)) for m in messages),
+            latency_sec=time.monotonic() - started,
+        )
+        logger.info("Quiz evaluation prompt: %s", report.log_line())
+        return output, report
+
+    def run(self, input: Dict) -> str:
+        output, _ = self.run_with_report(input)
         return output
@@ -1,22 +1,45 @@
+import logging
+import time
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
 from langchain_core.output_parsers import JsonOutputParser
 from clients.gpt_client import GPTClient
 from models.models import LLMQuizGenerationInput
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from utils.constants import QuizContextMode
+from utils.embedding_utils import count_tokens
+from utils.notes_context import NotesContext, PromptReport, select_overview_context
 from workflows.workflow import Workflow
 
+logger = logging.getLogger(__name__)
+
 
 class LLMQuizGenerationWorkflow(Workflow):
-    def __init__(self, gpt_client: GPTClient, prompts: Dict[str, str]):
+    def __init__(
+        self,
+        gpt_client: GPTClient,
+        prompts: Dict[str, str],
+        context_mode: str = QuizContextMode.RETRIEVAL.value,
+        token_budget: int = 6000,
+    ):
         self.gpt_client = gpt_client
         self.prompts = prompts
+        self.context_mode = context_mode
+        self.token_budget = token_budget
+
+    def _select_context(self, input: LLMQuizGenerationInput, mode: str) -> NotesContext:
+        budget = self.token_budget
+        if mode == QuizContextMode.FULL.value:
+            budget = count_tokens(input.notes_md)
+        return select_overview_context(input.notes_md, budget)
 
-    def _build_messages(self, input: LLMQuizGenerationInput) -> List[BaseMessage]:
+    def _build_messages(
+        self, input: LLMQuizGenerationInput, notes: NotesContext
+    ) -> List[BaseMessage]:
         system_message = SystemMessage(content=self.prompts["system_prompt"])
         human_message = HumanMessage(
             content=self.prompts["human_prompt"].format(
-                notes_md=input.notes_md, n_questions=input.n_questions
+                notes_md=notes.markdown, n_questions=input.n_questions
             )
         )
         return [system_message, human_message]
@@ -30,15 +53,35 @@ class LLMQuizGenerationWorkflow(Workflow):
             raise ValueError("notes_md is required")
         if not n_questions:
             raise ValueError("n_questions is required")
-        return LLMQuizGenerationInput(notes_md=notes_md, n_questions=n_questions)
+        return LLMQuizGenerationInput(
+            notes_md=notes_md,
+            n_questions=n_questions,
+            context_mode=payload.get("context_mode"),
+        )
 
-    def run(self, input: Dict[str, Any]) -> Dict[str, Any]:
+    def run_with_report(
+        self, input: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], PromptReport]:
         quiz_generation_input = self._coerce_input(input)
-        prompt = ChatPromptTemplate.from_messages(
-            self._build_messages(quiz_generation_input)
-        )
+        mode = quiz_generation_input.context_mode or self.context_mode
+        notes = self._select_context(quiz_generation_input, mode)
+        messages = self._build_messages(quiz_generation_input, notes)
+        prompt = ChatPromptTemplate.from_messages(messages)
         llm = self.gpt_client.instance()
         parser = JsonOutputParser()
         chain = prompt | llm | parser
-        output = chain.invoke(input)
+        started = time.monotonic()
+        output = chain.invoke({})
+        report = PromptReport(
+            mode=mode,
+            notes_tokens=notes.tokens,
+            full_notes_tokens=notes.full_tokens,
+            prompt_tokens=sum(count_tokens(str(m.content)) for m in messages),
+            latency_sec=time.monotonic() - started,
+        )
+        logger.info("Quiz generation prompt: %s", report.log_line())
+        return output, report
+
+    def run(self, input: Dict[str, Any]) -> Dict[str, Any]:
+        output, _ = self.run_with_report(input)
         return output
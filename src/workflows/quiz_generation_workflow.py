@@ -1,10 +1,14 @@
+import logging
 from typing import Any, Dict
 from langgraph.graph import StateGraph, START, END
 from models.models import QuizState
 from workflows.workflow import Workflow
 from clients.notion_client import NotionClient
+from utils.question_bank import QuestionBank, hash_notes
 from workflows.llm_quiz_generation_workflow import LLMQuizGenerationWorkflow
 
+logger = logging.getLogger(__name__)
+
 
 class QuizGenerationWorkflow(Workflow):
 
@@ -12,9 +16,13 @@ class QuizGenerationWorkflow(Workflow):
         self,
         notion_client: NotionClient,
         llm_quiz_generation_workflow: LLMQuizGenerationWorkflow,
+        question_bank: QuestionBank | None = None,
+        bank_factor: int = 2,
     ) -> None:
         self.notion_client = notion_client
         self.llm_quiz_generation_workflow = llm_quiz_generation_workflow
+        self.question_bank = question_bank
+        self.bank_factor = bank_factor
         self.n_questions = 10
         self.graph = self._build_graph()
 
@@ -44,10 +52,31 @@ class QuizGenerationWorkflow(Workflow):
         return {"notes_md": notes_md}
 
     def _generate_quiz_from_notes(self, state: QuizState) -> Dict[str, Any]:
-        llm_out = self.llm_quiz_generation_workflow.run(
-            {"notes_md": state.notes_md, "n_questions": state.n_questions}
-        )
-        return {"questions": llm_out["questions"]}
+        if self.question_bank is None:
+            llm_out = self.llm_quiz_generation_workflow.run(
+                {"notes_md": state.notes_md, "n_questions": state.n_questions}
+            )
+            return {"questions": llm_out["questions"]}
+
+        # The LLM is only asked for more questions once the bank for these
+        # exact notes holds fewer than `bank_factor` quizzes' worth.
+        notes_hash = hash_notes(state.notes_md)
+        banked = self.question_bank.count(notes_hash)
+        target = state.n_questions * max(1, self.bank_factor)
+        if banked < target:
+            llm_out = self.llm_quiz_generation_workflow.run(
+                {
+                    "notes_md": state.notes_md,
+                    "n_questions": max(state.n_questions, target - banked),
+                }
+            )
+            added = self.question_bank.add(notes_hash, llm_out["questions"])
+            logger.info("Added %d questions to a bank of %d", added, banked)
+        return {"questions": self.question_bank.sample(notes_hash, state.n_questions)}
 
     def run(self, input: Dict[str, Any]) -> Dict[str, Any]:
         return self.graph.invoke(input=self._coerce_state(input))
+
+    def run_for_note(self, note: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate a quiz for a due note as projected by `project_note`."""
+        return self.run({"notion_page_id": note["page_id"], "notion_url": note["url"]})
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pytest
+import tiktoken
+
+# Tests import application modules from `src/` and shared fixtures from `tests/`.
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "tests")]
+
+from utils import embedding_utils  # noqa: E402
+
+
+class CountingEncoding(tiktoken.Encoding):
+    """Byte-level encoding that needs no downloaded ranks."""
+
+    def __init__(self):
+        super().__init__(
+            name="bytes",
+            pat_str=r"\S+|\s+",
+            mergeable_ranks={bytes([i]): i for i in range(256)},
+            special_tokens={"<|endoftext|>": 256},
+        )
+        self.encoded = 0
+
+    def encode(self, text, **kwargs):
+        self.encoded += 1
+        return super().encode(text, **kwargs)
+
+
+@pytest.fixture
+def encoding(monkeypatch):
+    """Count tokens offline: tiktoken otherwise downloads its ranks."""
+    enc = CountingEncoding()
+    monkeypatch.setattr(tiktoken, "get_encoding", lambda name: enc)
+    embedding_utils.get_encoder.cache_clear()
+    embedding_utils._counts.clear()
+    yield enc
+    embedding_utils.get_encoder.cache_clear()
+    embedding_utils._counts.clear()
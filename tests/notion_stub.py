@@ -0,0 +1,61 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "notion_blocks_test_markdown.json"
+
+
+def load_fixture(path: Path = FIXTURE_PATH) -> Dict[str, Any]:
+    """Recorded block tree: `{"page_id": ..., "children": {block_id: [...]}}`."""
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+@contextmanager
+def serve_block_children(
+    fixture: Dict[str, Any], latency_sec: float, page_size: int
+) -> Iterator[str]:
+    """
+    Serve `GET /v1/blocks/<id>/children` from a recorded fixture on localhost.
+
+    Every response sleeps `latency_sec` to stand in for a Notion round-trip
+    and holds at most `page_size` children, so callers must follow cursors.
+    Yields the base URL to pass to `notion_client.Client(base_url=...)`.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = url.path.strip("/").split("/")  # v1/blocks/<id>/children
+            children = fixture["children"].get(parts[2], [])
+            query = parse_qs(url.query)
+            start = int(query.get("start_cursor", ["0"])[0])
+            end = start + page_size
+            body = {
+                "object": "list",
+                "results": children[start:end],
+                "has_more": end < len(children),
+                "next_cursor": str(end) if end < len(children) else None,
+            }
+            time.sleep(latency_sec)
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,65 @@
+from test_data import TEST_MARKDOWN
+from utils.block_cache import CachedMarkdownConverter
+from utils.disk_cache import DiskCache
+from utils.markdown_blocks import MarkdownBlockConverter
+from utils.notion_utils import split_top_level_sections
+
+
+class CountingConverter(MarkdownBlockConverter):
+    def __init__(self):
+        self.calls = []
+
+    def run(self, markdown):
+        self.calls.append(markdown)
+        return super().run(markdown)
+
+
+def test_split_top_level_sections_round_trips():
+    sections = split_top_level_sections(TEST_MARKDOWN)
+    assert [s.strip().splitlines()[0] for s in sections] == [
+        "## Summary",
+        "## Cues & Key Terms",
+        "## Notes",
+    ]
+    assert "\n".join(sections) == TEST_MARKDOWN
+
+
+def test_split_ignores_headers_in_code_fences():
+    md = "## Summary\n```\n## Notes\n```\n## Notes\nbody"
+    assert split_top_level_sections(md) == [
+        "## Summary\n```\n## Notes\n```",
+        "## Notes\nbody",
+    ]
+
+
+def test_cache_hits_survive_restart(tmp_path):
+    cache = DiskCache(tmp_path)
+    assert cache.get("k") is None
+    cache.put("k", [{"type": "divider"}])
+    assert DiskCache(tmp_path).get("k") == [{"type": "divider"}]
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=60)
+    cache.put("a", [{"x": "a" * 10}])
+    cache.put("b", [{"x": "b" * 10}])
+    cache.get("a")
+    cache.put("c", [{"x": "c" * 10}])
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_only_changed_sections_are_converted(tmp_path):
+    converter = CountingConverter()
+    cached = CachedMarkdownConverter(converter, DiskCache(tmp_path))
+    expected = cached.run(TEST_MARKDOWN)
+    assert len(converter.calls) == 3
+    assert cached.run(TEST_MARKDOWN) == expected
+    assert len(converter.calls) == 3
+
+    edited = TEST_MARKDOWN.replace("## Notes", "## Notes\n\n- new bullet")
+    cached.run(edited)
+    assert len(converter.calls) == 4
+    assert "new bullet" in converter.calls[-1]
@@ -0,0 +1,56 @@
+from typing import Annotated, List, TypedDict
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.graph import START, StateGraph, add_messages
+
+from utils.chat_checkpointer import SqliteCheckpointSaver
+
+
+class State(TypedDict):
+    messages: Annotated[List[BaseMessage], add_messages]
+
+
+def _echo(state: State):
+    return {"messages": [AIMessage(f"echo {len(state['messages'])}")]}
+
+
+def _graph(saver):
+    graph = StateGraph(State)
+    graph.add_node("echo", _echo)
+    graph.add_edge(START, "echo")
+    return graph.compile(checkpointer=saver)
+
+
+def _thread(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_threads_accumulate_messages_and_survive_restarts(tmp_path):
+    path = tmp_path / "chat.sqlite3"
+    graph = _graph(SqliteCheckpointSaver(path))
+    graph.invoke({"messages": [HumanMessage("hi")]}, _thread("a"))
+    graph.invoke({"messages": [HumanMessage("again")]}, _thread("a"))
+    graph.invoke({"messages": [HumanMessage("other")]}, _thread("b"))
+
+    resumed = _graph(SqliteCheckpointSaver(path))
+    messages = resumed.get_state(_thread("a")).values["messages"]
+    assert [m.content for m in messages] == ["hi", "echo 1", "again", "echo 3"]
+    assert len(resumed.get_state(_thread("b")).values["messages"]) == 2
+
+
+def test_old_checkpoints_are_pruned_and_threads_can_be_deleted(tmp_path):
+    saver = SqliteCheckpointSaver(
+        tmp_path / "chat.sqlite3", max_checkpoints_per_thread=3
+    )
+    graph = _graph(saver)
+    for i in range(5):
+        graph.invoke({"messages": [HumanMessage(str(i))]}, _thread("a"))
+
+    history = list(saver.list(_thread("a")))
+    assert len(history) == 3
+    assert history[0].config == graph.get_state(_thread("a")).config
+    assert len(list(saver.list(_thread("a"), limit=1))) == 1
+    assert len(graph.get_state(_thread("a")).values["messages"]) == 10
+
+    saver.delete_thread("a")
+    assert saver.get_tuple(_thread("a")) is None
@@ -0,0 +1,97 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from utils.chat_history import (
+    SUMMARY_PREFIX,
+    ChatHistoryManager,
+    message_tokens,
+    messages_tokens,
+)
+
+
+@pytest.fixture(autouse=True)
+def _offline_encoding(encoding):
+    return encoding
+
+
+class _Summarizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, summary, transcript):
+        self.calls.append((summary, transcript))
+        return f"summary#{len(self.calls)}"
+
+
+def _turn(i, tool_output=""):
+    messages = [HumanMessage(f"question {i} " + "x" * 40)]
+    if tool_output:
+        messages += [
+            AIMessage("", tool_calls=[{"name": "lookup", "args": {}, "id": f"c{i}"}]),
+            ToolMessage(tool_output, name="lookup", tool_call_id=f"c{i}"),
+        ]
+    messages.append(AIMessage(f"answer {i} " + "y" * 40))
+    return messages
+
+
+def test_short_history_is_sent_unchanged_without_system_messages():
+    summarize = _Summarizer()
+    manager = ChatHistoryManager(summarize, token_budget=10_000)
+    history = [SystemMessage("old"), *_turn(1)]
+    assert manager.prepare(history) == history[1:]
+    assert summarize.calls == []
+
+
+def test_old_tool_outputs_are_elided_but_current_turn_is_kept():
+    manager = ChatHistoryManager(
+        _Summarizer(), token_budget=10_000, tool_output_tokens=10
+    )
+    history = _turn(1, tool_output="z" * 500) + _turn(2, tool_output="w" * 500)
+    prepared = manager.prepare(history)
+    assert prepared[2].content.startswith("z" * 10)
+    assert "490 more tokens elided" in prepared[2].content
+    assert prepared[6].content == "w" * 500
+    assert history[2].content == "z" * 500
+
+
+def test_old_turns_fold_into_an_incrementally_updated_summary():
+    summarize = _Summarizer()
+    manager = ChatHistoryManager(summarize, token_budget=800)
+    history, sizes = [], []
+    for i in range(30):
+        history += _turn(i)
+        prepared = manager.prepare(history)
+        sizes.append(sum(message_tokens(m) for m in prepared))
+
+    assert max(sizes) <= 800
+    # Folding leaves headroom, so the summary is not recomputed every turn,
+    # and each fold only summarizes the turns folded since the last one.
+    assert 1 < len(summarize.calls) <= 10
+    assert summarize.calls[0][0] == ""
+    assert [c[0] for c in summarize.calls[1:]] == [
+        f"summary#{n}" for n in range(1, len(summarize.calls))
+    ]
+    transcripts = "\n".join(c[1] for c in summarize.calls)
+    for i in range(20):
+        assert transcripts.count(f"question {i} ") == 1
+
+    assert isinstance(prepared[0], SystemMessage)
+    assert prepared[0].content == SUMMARY_PREFIX + f"summary#{len(summarize.calls)}"
+    assert isinstance(prepared[1], HumanMessage)
+
+
+def test_cached_summary_is_reused_for_the_same_history():
+    summarize = _Summarizer()
+    manager = ChatHistoryManager(summarize, token_budget=300)
+    history = [m for i in range(10) for m in _turn(i, tool_output="z" * 50)]
+    first = manager.prepare(history)
+    assert manager.prepare(history) == first
+    assert len(summarize.calls) == 1
+    # Tool calls are never separated from their results.
+    assert isinstance(first[1], HumanMessage)
+
+
+def test_batched_token_counts_match_per_message_counts():
+    messages = _turn(0, tool_output="result") + _turn(1)
+    assert messages_tokens(messages) == [message_tokens(m) for m in messages]
+    assert messages_tokens([]) == []
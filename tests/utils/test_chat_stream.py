@@ -0,0 +1,90 @@
+import itertools
+
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+
+from utils.chat_stream import chat_stream_events
+from utils.constants import ChatStreamEventType
+
+
+def _clock():
+    ticks = itertools.count()
+    return lambda: float(next(ticks))
+
+
+def _messages(message, node="agent"):
+    return ("messages", (message, {"langgraph_node": node}))
+
+
+def test_streamed_tokens_and_tool_calls_become_events():
+    final = AIMessage(content="It is 42.", id="run-2")
+    parts = [
+        ("values", {"messages": [HumanMessage("hi")]}),
+        _messages(
+            AIMessageChunk(
+                content="",
+                id="run-1",
+                tool_call_chunks=[
+                    {"name": "lookup", "args": "", "id": "c1", "index": 0}
+                ],
+            )
+        ),
+        _messages(
+            AIMessageChunk(
+                content="",
+                id="run-1",
+                tool_call_chunks=[
+                    {"name": None, "args": '{"q": 1}', "id": None, "index": 0}
+                ],
+            )
+        ),
+        _messages(
+            ToolMessage(
+                content="found",
+                name="lookup",
+                tool_call_id="c1",
+                response_metadata={"latency_sec": 0.5, "cached": False},
+            ),
+            "tools",
+        ),
+        _messages(AIMessageChunk(content="It is", id="run-2")),
+        _messages(AIMessageChunk(content=" 42.", id="run-2")),
+        ("values", {"messages": [HumanMessage("hi"), final]}),
+    ]
+
+    events = list(chat_stream_events(parts, clock=_clock()))
+
+    assert [e.type for e in events] == [
+        ChatStreamEventType.TOOL_START,
+        ChatStreamEventType.TOOL_END,
+        ChatStreamEventType.TOKEN,
+        ChatStreamEventType.TOKEN,
+        ChatStreamEventType.DONE,
+    ]
+    assert events[0].tool_name == events[1].tool_name == "lookup"
+    assert "".join(e.text for e in events[2:4]) == "It is 42."
+    done = events[-1]
+    assert done.message is final
+    assert done.first_token_sec == 1.0
+    assert done.total_sec == 2.0
+    assert events[1].latency_sec == done.tool_sec == 0.5
+
+
+def test_messages_returned_whole_are_reported_once():
+    message = AIMessage(
+        content="Checking",
+        id="run-1",
+        tool_calls=[{"name": "lookup", "args": {}, "id": "c1"}],
+    )
+    parts = [
+        _messages(AIMessageChunk(content="Checking", id="run-1")),
+        _messages(message),
+        _messages(AIMessage(content="Done.", id="run-2")),
+        ("values", {"messages": [message]}),
+    ]
+
+    events = list(chat_stream_events(parts))
+
+    tokens = [e.text for e in events if e.type == ChatStreamEventType.TOKEN]
+    assert tokens == ["Checking", "Done."]
+    starts = [e for e in events if e.type == ChatStreamEventType.TOOL_START]
+    assert [e.tool_call_id for e in starts] == ["c1"]
@@ -0,0 +1,70 @@
+import threading
+
+import numpy as np
+
+from utils.embedding_store import EmbeddingStore, HashEmbedder
+
+
+class RecordingEmbedder(HashEmbedder):
+    def __init__(self):
+        super().__init__(dim=32)
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+        return super().embed_documents(texts)
+
+
+def _store(embedder, path=":memory:", **kwargs):
+    return EmbeddingStore(embedder, model=embedder.model, cache_path=path, **kwargs)
+
+
+def test_hash_embedder_is_deterministic_and_normalised():
+    a, b = HashEmbedder().embed_documents(["binary search tree", "binary search tree"])
+    assert a == b
+    assert np.isclose(np.linalg.norm(a), 1.0)
+
+
+def test_only_new_or_changed_chunks_are_embedded(tmp_path):
+    embedder = RecordingEmbedder()
+    path = tmp_path / "embeddings.sqlite3"
+    texts = ["heaps", "tries", "graphs"]
+    vectors, stats = _store(embedder, path).embed(texts, ["h1", "h2", "h3"])
+    assert vectors.shape == (3, 32) and stats.misses == 3
+
+    # A fresh store over the same file sees the cached vectors.
+    edited, stats = _store(embedder, path).embed(
+        ["heaps", "tries v2", "graphs"], ["h1", "h2b", "h3"]
+    )
+    assert (stats.hits, stats.misses) == (2, 1)
+    assert embedder.batches[-1] == ["tries v2"]
+    assert np.array_equal(edited[0], vectors[0])
+    assert round(stats.hit_rate, 2) == 0.67
+
+
+def test_duplicate_chunks_are_embedded_once():
+    embedder = RecordingEmbedder()
+    vectors, stats = _store(embedder).embed(["same", "same"], ["h", "h"])
+    assert embedder.batches == [["same"]]
+    assert np.array_equal(vectors[0], vectors[1])
+
+
+def test_requests_are_batched():
+    embedder = RecordingEmbedder()
+    texts = [f"chunk {i}" for i in range(10)]
+    _, stats = _store(embedder, max_batch_size=4, max_concurrency=2).embed(
+        texts, [f"h{i}" for i in range(10)]
+    )
+    assert stats.batches == 3
+    assert sorted(len(batch) for batch in embedder.batches) == [2, 4, 4]
+
+
+def test_cache_is_keyed_by_model():
+    path = ":memory:"
+    store = _store(RecordingEmbedder(), path)
+    store.embed(["x"], ["h"])
+    store.model = "other-model"
+    _, stats = store.embed(["x"], ["h"])
+    assert stats.misses == 1
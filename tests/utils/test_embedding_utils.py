@@ -0,0 +1,18 @@
+from utils.embedding_utils import count_tokens, count_tokens_many, get_encoder
+
+
+def test_encoder_is_created_once(encoding):
+    assert get_encoder("cl100k_base") is get_encoder("cl100k_base")
+
+
+def test_count_tokens_caches_repeated_texts(encoding):
+    assert count_tokens("abc") == 3
+    assert count_tokens("abc") == 3
+    assert encoding.encoded == 1
+
+
+def test_count_tokens_many_matches_single_counts(encoding):
+    texts = ["hello world", "a", "hello world", "<|endoftext|>"]
+    assert count_tokens_many(texts) == [count_tokens(t) for t in texts]
+    # Duplicates are encoded once and later single counts hit the cache.
+    assert encoding.encoded == 3
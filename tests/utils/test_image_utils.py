@@ -0,0 +1,109 @@
+import base64
+import io
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from utils import image_utils
+from utils.image_utils import ImagePreprocessor, preprocess_image
+
+
+def _photo(width=4032, height=3024, orientation=None):
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    image = Image.fromarray(pixels, "RGB")
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=95, exif=exif)
+    return out.getvalue()
+
+
+def _open(data):
+    return Image.open(io.BytesIO(data))
+
+
+def test_photos_are_oriented_downscaled_and_grayscaled():
+    # Orientation 6: stored landscape, displayed rotated to portrait.
+    data, mime = preprocess_image(_photo(orientation=6))
+    image = _open(data)
+    assert mime == "image/jpeg"
+    assert image.size == (768, 1024)
+    assert image.mode == "L"
+    assert len(data) < len(_photo(orientation=6)) / 4
+
+
+def test_color_is_kept_when_requested():
+    data, _ = preprocess_image(_photo(1600, 1200), grayscale=False)
+    image = _open(data)
+    assert image.mode == "RGB"
+    assert image.size == (1024, 768)
+
+
+def test_small_images_are_sent_unchanged_when_reencoding_does_not_help():
+    out = io.BytesIO()
+    Image.new("L", (64, 64), 255).save(out, format="PNG", optimize=True)
+    data, mime = preprocess_image(out.getvalue())
+    assert data == out.getvalue()
+    assert mime == "image/png"
+
+
+def test_undecodable_uploads_are_sent_as_they_are():
+    heic = b"\x00\x00\x00\x18ftypheic" + b"\x00" * 64
+    assert preprocess_image(heic, mime="image/heic") == (heic, "image/heic")
+    truncated = _photo(1600, 1200)[:2000]
+    assert preprocess_image(truncated) == (truncated, "image/jpeg")
+
+    preprocessor = ImagePreprocessor(max_workers=1)
+    try:
+        urls, _ = preprocessor.to_data_urls(
+            [_photo(1600, 1200), heic], ["image/jpeg", "image/heic"]
+        )
+    finally:
+        preprocessor.close()
+    assert urls[1] == "data:image/heic;base64," + base64.b64encode(heic).decode()
+
+
+def test_preprocessor_builds_data_urls_on_a_process_pool():
+    # One worker keeps at most two images in flight, so results are
+    # collected while later images are still being submitted.
+    images = [_photo(1600, 1200), _photo(1200, 1600), _photo(1600, 1200)]
+    preprocessor = ImagePreprocessor(max_workers=1)
+    try:
+        urls, stats = preprocessor.to_data_urls(images)
+    finally:
+        preprocessor.close()
+
+    assert len(urls) == stats.images == 3
+    assert all(url.startswith("data:image/jpeg;base64,") for url in urls)
+    sizes = [_open(base64.b64decode(url.split(",", 1)[1])).size for url in urls]
+    assert sizes == [(1024, 768), (768, 1024), (1024, 768)]
+    assert stats.original_bytes == sum(len(data) for data in images)
+    assert 0 < stats.prepared_bytes < stats.original_bytes
+    assert stats.bytes_saved == stats.original_bytes - stats.prepared_bytes
+
+
+def test_concurrent_ingestions_share_one_process_pool(monkeypatch):
+    created = []
+
+    class SlowPool:
+        def __init__(self, max_workers):
+            time.sleep(0.05)
+            created.append(self)
+
+    monkeypatch.setattr(image_utils, "ProcessPoolExecutor", SlowPool)
+    preprocessor = ImagePreprocessor()
+    pools = []
+    threads = [
+        threading.Thread(target=lambda: pools.append(preprocessor._executor()))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert all(pool is created[0] for pool in pools)
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from utils.constants import IngestionStage
+from utils.ingestion_checkpoints import (
+    IngestionCheckpointStore,
+    image_ref,
+    ingestion_input_hash,
+)
+
+
+def test_input_hash_covers_text_fields_and_image_bytes():
+    base = ingestion_input_hash("Graphs", "dsa", None, [b"a", b"b"])
+    assert base == ingestion_input_hash("Graphs", "dsa", "", [b"a", b"b"])
+    assert base != ingestion_input_hash("Graphs", "dsa", None, [b"b", b"a"])
+    assert base != ingestion_input_hash("Graphs", "dsa", "x", [b"a", b"b"])
+    assert base != ingestion_input_hash("Graph", "sdsa", None, [b"a", b"b"])
+
+
+def test_checkpoints_persist_stage_outputs_until_cleared(tmp_path):
+    path = tmp_path / "checkpoints.sqlite3"
+    store = IngestionCheckpointStore(path)
+    checkpoint = store.claim("hash", "job-1")
+    assert checkpoint.stage == "" and checkpoint.notion_page is None
+
+    checkpoint.image_refs = [image_ref("data:image/jpeg;base64,AAAA")]
+    store.save(checkpoint, IngestionStage.IMAGES_ENCODED)
+    checkpoint.markdown = "## Summary\nGraphs."
+    store.save(checkpoint, IngestionStage.MARKDOWN_BUILT)
+    checkpoint.notion_page = {"id": "page-1", "url": "u/page-1"}
+    checkpoint.blocks_written = 200
+    store.save(checkpoint, IngestionStage.NOTION_PAGE_STARTED)
+
+    # The same notes uploaded again as a new job resume the failed run.
+    resumed = IngestionCheckpointStore(path).claim("hash", "job-2")
+    assert resumed.job_id == "job-2"
+    assert (resumed.markdown, resumed.notion_page, resumed.blocks_written) == (
+        checkpoint.markdown,
+        checkpoint.notion_page,
+        200,
+    )
+    assert resumed.reached(IngestionStage.MARKDOWN_BUILT)
+    assert not resumed.reached(IngestionStage.NOTION_PAGE_WRITTEN)
+    assert store.load("other-hash", "job-1").stage == ""
+
+    store.clear(resumed)
+    assert not store.load("hash").reached(IngestionStage.IMAGES_ENCODED)
+
+
+def test_a_running_owner_keeps_its_checkpoint(tmp_path):
+    store = IngestionCheckpointStore(tmp_path / "checkpoints.sqlite3")
+    running = {"job-1"}
+    checkpoint = store.claim("hash", "job-1", running.__contains__)
+    checkpoint.markdown = "## Summary"
+    store.save(checkpoint, IngestionStage.MARKDOWN_BUILT)
+
+    with pytest.raises(RuntimeError, match="job-1"):
+        store.claim("hash", "job-2", running.__contains__)
+
+    # Once the owner stops, the next run takes over and the old one's saves
+    # and clear no longer touch the checkpoint.
+    running.clear()
+    resumed = store.claim("hash", "job-2", running.__contains__)
+    assert resumed.markdown == "## Summary"
+    store.save(checkpoint, IngestionStage.NOTION_PAGE_STARTED)
+    store.clear(checkpoint)
+    assert store.load("hash").stage == IngestionStage.MARKDOWN_BUILT.value
+
+
+def test_simultaneous_claims_of_one_input_admit_one_run(tmp_path):
+    path = tmp_path / "checkpoints.sqlite3"
+    stores = [IngestionCheckpointStore(path) for _ in range(8)]
+    start = threading.Barrier(len(stores))
+    claimed, refused = [], []
+
+    def claim(i):
+        start.wait()
+        try:
+            claimed.append(stores[i].claim("hash", f"job-{i}", lambda _: True))
+        except RuntimeError:
+            refused.append(i)
+
+    threads = [threading.Thread(target=claim, args=(i,)) for i in range(len(stores))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(claimed) == 1 and len(refused) == len(stores) - 1
@@ -0,0 +1,114 @@
+import threading
+import time
+
+from utils.constants import JobStatus
+from utils.job_queue import JobFile, JobQueue, JobWorkerPool
+
+
+def _queue(tmp_path):
+    return JobQueue(tmp_path / "jobs.sqlite3")
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_jobs_are_claimed_once_in_order_with_their_files(tmp_path):
+    queue = _queue(tmp_path)
+    first = queue.enqueue("ingestion", {"n": 1}, [JobFile("a.jpg", "image/jpeg", b"a")])
+    second = queue.enqueue("ingestion", {"n": 2})
+
+    job = queue.claim("ingestion", "w1")
+    assert job.id == first
+    assert job.payload == {"n": 1}
+    assert job.files == [JobFile("a.jpg", "image/jpeg", b"a")]
+    assert job.status == JobStatus.RUNNING.value and job.attempts == 1
+    assert queue.claim("ingestion", "w2").id == second
+    assert queue.claim("ingestion", "w3") is None
+    assert queue.claim("other", "w3") is None
+
+
+def test_progress_and_results_are_persisted(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    queue = JobQueue(path)
+    job_id = queue.enqueue("ingestion", {}, [JobFile("a.jpg", "image/jpeg", b"a")])
+    queue.claim("ingestion", "w1")
+    queue.update_progress(job_id, 0.5, "building markdown...")
+
+    # A second connection, as from another process, sees the same state.
+    job = JobQueue(path).get(job_id)
+    assert (job.progress, job.stage) == (0.5, "building markdown...")
+
+    queue.complete(job_id, {"images": 1})
+    job = queue.get(job_id)
+    assert job.finished and job.result == {"images": 1}
+    assert job.status == JobStatus.SUCCEEDED.value
+    (files,) = queue._conn.execute("SELECT COUNT(*) FROM job_files").fetchone()
+    assert files == 0
+
+
+def test_only_claimed_jobs_with_a_fresh_heartbeat_are_running(tmp_path):
+    queue = _queue(tmp_path)
+    job_id = queue.enqueue("ingestion", {})
+    assert not queue.is_running(job_id)
+    queue.claim("ingestion", "w1")
+    assert queue.is_running(job_id)
+    assert not queue.is_running(job_id, stale_after_sec=0)
+    queue.complete(job_id, None)
+    assert not queue.is_running(job_id)
+
+
+def test_failed_jobs_can_be_retried_with_their_files(tmp_path):
+    queue = _queue(tmp_path)
+    job_id = queue.enqueue("ingestion", {}, [JobFile("a.jpg", "image/jpeg", b"a")])
+    queue.claim("ingestion", "w1")
+    queue.fail(job_id, "boom")
+    assert queue.get(job_id).error == "boom"
+
+    assert queue.retry(job_id)
+    assert not queue.retry(job_id)
+    job = queue.claim("ingestion", "w2")
+    assert job.id == job_id and job.files[0].data == b"a"
+
+
+def test_abandoned_jobs_are_reclaimed_until_attempts_run_out(tmp_path):
+    queue = _queue(tmp_path)
+    job_id = queue.enqueue("ingestion", {})
+    queue.claim("ingestion", "w1")
+    assert queue.claim("ingestion", "w2", stale_after_sec=60) is None
+
+    job = queue.claim("ingestion", "w2", stale_after_sec=-1, max_attempts=2)
+    assert job.id == job_id and job.attempts == 2
+    assert queue.claim("ingestion", "w3", stale_after_sec=-1, max_attempts=2) is None
+    job = queue.get(job_id)
+    assert job.status == JobStatus.FAILED.value
+    assert "stopped responding" in job.error
+
+
+def test_pool_runs_jobs_concurrently_and_records_outcomes(tmp_path):
+    queue = _queue(tmp_path)
+    both_running = threading.Barrier(2, timeout=5)
+
+    def handler(job, progress):
+        progress.progress(0.5, "working...")
+        both_running.wait()
+        if job.payload["fail"]:
+            raise ValueError("bad notes")
+        return {"done": job.payload["n"]}
+
+    ok = queue.enqueue("ingestion", {"n": 1, "fail": False})
+    bad = queue.enqueue("ingestion", {"n": 2, "fail": True})
+    pool = JobWorkerPool(queue, "ingestion", handler, workers=2, poll_sec=0.01)
+    pool.start()
+    try:
+        _wait_for(lambda: queue.get(ok).finished and queue.get(bad).finished)
+    finally:
+        pool.stop(timeout=5)
+
+    assert queue.get(ok).result == {"done": 1}
+    assert queue.get(bad).status == JobStatus.FAILED.value
+    assert queue.get(bad).error == "bad notes"
+    assert pool.running() == []
@@ -0,0 +1,140 @@
+import json
+import shutil
+import pytest
+from pathlib import Path
+
+from test_data import TEST_MARKDOWN, TEST_MARKDOWN_NOTES
+from utils.markdown_blocks import markdown_to_blocks, parse_inline
+from utils.notion_utils import flatten_nested_lists
+
+
+def _outline(blocks):
+    """Reduce blocks to (type, plain text, children) so backends can be diffed."""
+    outline = []
+    for block in blocks:
+        payload = block[block["type"]]
+        text = "".join(rt["text"]["content"] for rt in payload.get("rich_text", []))
+        if block["type"] == "table":
+            children = [
+                tuple(
+                    "".join(rt["text"]["content"] for rt in cell)
+                    for cell in row["table_row"]["cells"]
+                )
+                for row in payload["children"]
+            ]
+        else:
+            children = _outline(payload.get("children", []))
+        outline.append((block["type"], text.strip(), children))
+    return outline
+
+
+# Snapshot of markdown_to_blocks' outline for TEST_MARKDOWN. It guards
+# against regressions only; parity with Martian is checked live below.
+SNAPSHOT_OUTLINE = json.loads(
+    (
+        Path(__file__).parents[1]
+        / "fixtures"
+        / "markdown_blocks_outline_test_markdown.json"
+    ).read_text(encoding="utf-8")
+)
+
+
+def _as_json(outline):
+    return json.loads(json.dumps(outline))
+
+
+def _martian_available():
+    root = Path(__file__).resolve().parents[2]
+    return (
+        bool(shutil.which("node"))
+        and (root / "node_modules" / "@tryfabric" / "martian").exists()
+    )
+
+
+def test_parse_inline_annotations():
+    runs = parse_inline("a **b *c*** `x` ~~s~~ [l](https://example.com)")
+    flat = [
+        (
+            r["text"]["content"],
+            {k for k, v in r["annotations"].items() if v is True},
+            (r["text"].get("link") or {}).get("url"),
+        )
+        for r in runs
+    ]
+    assert flat == [
+        ("a ", set(), None),
+        ("b ", {"bold"}, None),
+        ("c", {"bold", "italic"}, None),
+        (" ", set(), None),
+        ("x", {"code"}, None),
+        (" ", set(), None),
+        ("s", {"strikethrough"}, None),
+        (" ", set(), None),
+        ("l", set(), "https://example.com"),
+    ]
+
+
+def test_parse_inline_underscore_identifiers_stay_plain():
+    runs = parse_inline("user_id and _emphasis_")
+    assert [r["text"]["content"] for r in runs] == ["user_id and ", "emphasis"]
+    assert runs[1]["annotations"]["italic"]
+
+
+def test_parse_inline_splits_long_text():
+    runs = parse_inline("x" * 4500)
+    assert [len(r["text"]["content"]) for r in runs] == [2000, 2000, 500]
+
+
+def test_headings_lists_and_nesting():
+    md = "# Title\n## Section\n#### Deep\n- a\n  - b\n    - c\n1. one\n- [x] done"
+    assert _outline(markdown_to_blocks(md)) == [
+        ("heading_1", "Title", []),
+        ("heading_2", "Section", []),
+        ("heading_3", "Deep", []),
+        (
+            "bulleted_list_item",
+            "a",
+            [("bulleted_list_item", "b", [("bulleted_list_item", "c", [])])],
+        ),
+        ("numbered_list_item", "one", []),
+        ("to_do", "done", []),
+    ]
+
+
+def test_code_quote_table_and_divider():
+    md = (
+        "```py\nprint('hi')\n```\n\n"
+        "> quoted *text*\n\n"
+        "---\n\n"
+        "| A | B |\n|---|:-:|\n| 1 | `2` |\n"
+    )
+    blocks = markdown_to_blocks(md)
+    assert [b["type"] for b in blocks] == ["code", "quote", "divider", "table"]
+    assert blocks[0]["code"]["language"] == "python"
+    assert blocks[0]["code"]["rich_text"][0]["text"]["content"] == "print('hi')"
+    assert blocks[3]["table"]["table_width"] == 2
+    assert _outline(blocks)[3][2] == [("A", "B"), ("1", "2")]
+
+
+def test_code_block_nested_under_list_item():
+    md = "- Summary\n\n    ```mermaid\n    flowchart LR\n    A --> B\n    ```\n"
+    (item,) = markdown_to_blocks(md)
+    (code,) = item["bulleted_list_item"]["children"]
+    assert code["code"]["language"] == "mermaid"
+    assert code["code"]["rich_text"][0]["text"]["content"] == "flowchart LR\nA --> B"
+
+
+def test_outline_matches_snapshot():
+    blocks = markdown_to_blocks(flatten_nested_lists(TEST_MARKDOWN))
+    assert _as_json(_outline(blocks)) == SNAPSHOT_OUTLINE
+
+
+@pytest.mark.skipif(not _martian_available(), reason="Martian is not installed")
+@pytest.mark.parametrize("markdown", [TEST_MARKDOWN, TEST_MARKDOWN_NOTES])
+def test_parity_with_martian(markdown):
+    from utils.martian import MartianRunner
+
+    flattened = flatten_nested_lists(markdown)
+    assert _outline(markdown_to_blocks(flattened)) == _outline(
+        MartianRunner().run(flattened)
+    )
@@ -0,0 +1,165 @@
+import gc
+import shutil
+import sys
+import textwrap
+import weakref
+from pathlib import Path
+
+import pytest
+
+from utils.martian import MartianWorker, MartianWorkerPool
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Speaks the `martian_cli.mjs --worker` protocol without Node: each convert
+# request becomes one paragraph block per line, and "hang" never answers.
+FAKE_WORKER = textwrap.dedent("""
+    import json, sys, time
+
+    assert sys.argv[1:] == ["--worker"]
+    for line in sys.stdin:
+        req = json.loads(line)
+        if req["op"] == "ping":
+            resp = {"id": req["id"], "ok": True}
+        elif req["markdown"] == "hang":
+            time.sleep(60)
+            continue
+        elif req["markdown"] == "fail":
+            resp = {"id": req["id"], "error": "cannot convert"}
+        else:
+            blocks = [
+                {"type": "paragraph", "paragraph": {"text": text}}
+                for text in req["markdown"].splitlines()
+            ]
+            resp = {"id": req["id"], "blocks": blocks}
+        print(json.dumps(resp), flush=True)
+    """)
+
+
+@pytest.fixture
+def fake_cli(tmp_path):
+    path = tmp_path / "fake_martian.py"
+    path.write_text(FAKE_WORKER, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def pool(fake_cli):
+    pool = MartianWorkerPool(
+        size=2, timeout_sec=5, node_path=sys.executable, cli_path=fake_cli
+    )
+    yield pool
+    pool.close()
+
+
+def test_worker_round_trip(fake_cli):
+    worker = MartianWorker(sys.executable, fake_cli, timeout_sec=5)
+    try:
+        assert worker.ping()
+        assert worker.run("a\nb") == [
+            {"type": "paragraph", "paragraph": {"text": "a"}},
+            {"type": "paragraph", "paragraph": {"text": "b"}},
+        ]
+        with pytest.raises(RuntimeError, match="cannot convert"):
+            worker.run("fail")
+        assert worker.is_alive()
+    finally:
+        worker.close()
+
+
+def test_checked_in_workers_are_reused(pool):
+    assert len(pool.run("a")) == 1
+    assert len(pool.run("b")) == 1
+    (worker,) = pool._workers
+
+    first = pool._checkout()
+    second = pool._checkout()
+    assert first is worker and second is not worker
+    pool._checkin(first)
+    pool._checkin(second)
+    assert len(pool._workers) == 2
+
+
+def test_crashed_worker_is_replaced_on_checkout(pool):
+    pool.run("a")
+    (crashed,) = pool._workers
+    crashed.proc.kill()
+    crashed.proc.wait()
+
+    assert pool.run("b") == [{"type": "paragraph", "paragraph": {"text": "b"}}]
+    assert crashed not in pool._workers
+    assert len(pool._workers) == 1
+
+
+def test_unresponsive_idle_worker_is_replaced_on_checkout(pool, monkeypatch):
+    pool.idle_ping_sec = 0
+    pool.run("a")
+    (stuck,) = pool._workers
+    monkeypatch.setattr(stuck, "ping", lambda timeout_sec=5: False)
+
+    pool.run("b")
+    assert stuck not in pool._workers
+    assert stuck.proc.wait(timeout=5) is not None
+
+
+def test_recently_used_worker_is_not_pinged(pool, monkeypatch):
+    pool.run("a")
+    (worker,) = pool._workers
+    pings = []
+    monkeypatch.setattr(worker, "ping", lambda timeout_sec=5: pings.append(1))
+
+    pool.run("b")
+    assert pings == []
+    assert pool._workers == [worker]
+
+
+def test_closed_pools_are_not_kept_alive(fake_cli):
+    pool = MartianWorkerPool(size=1, node_path=sys.executable, cli_path=fake_cli)
+    ref = weakref.ref(pool)
+    del pool
+    gc.collect()
+    assert ref() is None
+
+
+def test_hung_worker_is_discarded(fake_cli):
+    pool = MartianWorkerPool(
+        size=1, timeout_sec=0.5, node_path=sys.executable, cli_path=fake_cli
+    )
+    try:
+        with pytest.raises(TimeoutError):
+            pool.run("hang")
+        assert pool._workers == []
+        assert pool.run("a") == [{"type": "paragraph", "paragraph": {"text": "a"}}]
+    finally:
+        pool.close()
+
+
+def test_health_check_respawns_up_to_size(pool):
+    assert pool.health_check() == 2
+    dead = pool._workers[0]
+    dead.proc.kill()
+    dead.proc.wait()
+
+    assert pool.health_check() == 2
+    assert dead not in pool._workers
+    assert len(pool._workers) == 2
+
+    busy = pool._checkout()
+    assert pool.health_check() == 1
+    pool._checkin(busy)
+
+
+@pytest.mark.skipif(
+    not shutil.which("node")
+    or not (ROOT / "node_modules" / "@tryfabric" / "martian").exists(),
+    reason="Martian is not installed",
+)
+def test_martian_cli_worker_round_trip():
+    pool = MartianWorkerPool(size=1, timeout_sec=30)
+    try:
+        assert pool.health_check() == 1
+        (block,) = pool.run("## Summary")
+        assert block["type"] == "heading_2"
+        assert pool.run("- a\n- b")[1]["type"] == "bulleted_list_item"
+    finally:
+        pool.close()
@@ -0,0 +1,86 @@
+import pytest
+
+from utils.notes_context import (
+    match_refs,
+    rank_sections,
+    select_overview_context,
+    select_question_context,
+    split_header_sections,
+)
+
+NOTES = """# Caching
+
+## Eviction
+LRU eviction drops the least recently used entry first.
+
+### Write-back
+Dirty entries are flushed when evicted.
+
+```python
+# not a header
+```
+
+## Consistency
+Cache invalidation keeps readers consistent with the database.
+
+# Sharding
+
+## Consistent Hashing
+Keys map onto a ring so adding a node moves few keys.
+"""
+
+
+@pytest.fixture(autouse=True)
+def offline_tokens(encoding):
+    return encoding
+
+
+def test_sections_carry_full_header_paths():
+    sections = split_header_sections(NOTES)
+    assert [s.path for s in sections] == [
+        ["H1: Caching"],
+        ["H1: Caching", "H2: Eviction"],
+        ["H1: Caching", "H2: Eviction", "H3: Write-back"],
+        ["H1: Caching", "H2: Consistency"],
+        ["H1: Sharding"],
+        ["H1: Sharding", "H2: Consistent Hashing"],
+    ]
+    assert "# not a header" in sections[2].text
+
+
+def test_refs_select_section_and_subsections():
+    sections = split_header_sections(NOTES)
+    assert match_refs(sections, ["H1: Caching", "H2: Eviction"]) == [1, 2]
+    assert match_refs(sections, ["H1: Sharding", "H2: Missing"]) == [4, 5]
+    assert match_refs(sections, ["H9: nowhere"]) == []
+
+
+def test_rank_sections_prefers_matching_text():
+    sections = split_header_sections(NOTES)
+    assert rank_sections(sections, "How does consistent hashing use a ring?")[0] == 5
+
+
+def test_notes_within_budget_are_sent_whole():
+    context = select_question_context(NOTES, [{"text": "eviction"}], 10_000)
+    assert context.markdown == NOTES and context.is_full
+
+
+def test_question_context_keeps_relevant_sections_within_budget():
+    questions = [
+        {"text": "What does LRU drop?", "refs": ["H1: Caching", "H2: Eviction"]},
+        {"text": "How are keys placed on the ring?", "refs": []},
+    ]
+    context = select_question_context(NOTES, questions, budget_tokens=220)
+    assert context.tokens <= 220 < context.full_tokens
+    assert "least recently used" in context.markdown
+    assert "ring" in context.markdown
+    assert "invalidation" not in context.markdown
+    # Subsections keep their ancestor headers for context.
+    assert context.markdown.index("# Sharding") < context.markdown.index("ring")
+
+
+def test_overview_context_prefers_breadth():
+    context = select_overview_context(NOTES, budget_tokens=120)
+    assert context.tokens <= 120
+    assert "# Caching" in context.markdown and "# Sharding" in context.markdown
+    assert "Dirty entries" not in context.markdown
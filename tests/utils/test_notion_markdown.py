@@ -0,0 +1,74 @@
+import asyncio
+from functools import partial
+
+import pytest
+from notion_client import AsyncClient, Client
+
+from notion_stub import load_fixture, serve_block_children
+from utils.notion_markdown import (
+    fetch_block_tree,
+    fetch_block_tree_async,
+    list_children,
+    list_children_async,
+    render_markdown,
+)
+
+FIXTURE = load_fixture()
+PAGE_ID = FIXTURE["page_id"]
+# Simulated Notion round-trip and page size, small enough to force cursors.
+LATENCY_SEC = 0.02
+STUB_PAGE_SIZE = 10
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    with serve_block_children(FIXTURE, LATENCY_SEC, STUB_PAGE_SIZE) as url:
+        yield url
+
+
+def _notion2md_export(stub_url, monkeypatch):
+    from notion2md.exporter.block import StringExporter
+    from notion2md.notion_api import NotionClient as Notion2mdClient
+
+    # notion2md keeps a process-wide client; point it at the stub server.
+    monkeypatch.setattr(
+        Notion2mdClient("token"), "_client", Client(auth="token", base_url=stub_url)
+    )
+    return StringExporter(block_id=PAGE_ID, token="token").export()
+
+
+def test_parallel_export_matches_notion2md(stub_url, monkeypatch):
+    expected = _notion2md_export(stub_url, monkeypatch)
+
+    client = Client(auth="token", base_url=stub_url)
+    tree = fetch_block_tree(
+        partial(list_children, client.blocks.children.list), PAGE_ID, max_workers=8
+    )
+    assert render_markdown(PAGE_ID, tree) == expected
+    assert set(tree) == set(FIXTURE["children"])
+
+
+def test_children_are_listed_across_cursors(stub_url):
+    client = Client(auth="token", base_url=stub_url)
+    parent, children = max(FIXTURE["children"].items(), key=lambda kv: len(kv[1]))
+    assert len(children) > STUB_PAGE_SIZE
+    assert list_children(client.blocks.children.list, parent) == children
+
+
+def test_async_export_matches_sync(stub_url):
+    client = Client(auth="token", base_url=stub_url)
+    sync_tree = fetch_block_tree(
+        partial(list_children, client.blocks.children.list), PAGE_ID
+    )
+
+    async def export():
+        client = AsyncClient(auth="token", base_url=stub_url)
+        try:
+            return await fetch_block_tree_async(
+                partial(list_children_async, client.blocks.children.list), PAGE_ID
+            )
+        finally:
+            await client.aclose()
+
+    async_tree = asyncio.run(export())
+    assert render_markdown(PAGE_ID, async_tree) == render_markdown(PAGE_ID, sync_tree)
@@ -0,0 +1,104 @@
+from utils.notion_mirror import NotionMirror
+
+
+def _page(page_id, edited, next_review, effort="Medium", title="Note"):
+    return {
+        "id": page_id,
+        "url": f"https://notion.so/{page_id}",
+        "last_edited_time": edited,
+        "properties": {
+            "Name": {"type": "title", "title": [{"plain_text": title}]},
+            "Effort": {"type": "select", "select": {"name": effort}},
+            "Revisions": {"type": "number", "number": 1},
+            "Next Review": {
+                "type": "formula",
+                "formula": {"type": "date", "date": {"start": next_review}},
+            },
+        },
+    }
+
+
+class FakeDatabase:
+    def __init__(self, pages):
+        self.pages = {page["id"]: page for page in pages}
+        self.filters = []
+
+    def query(self, filter):
+        self.filters.append(filter)
+        since = filter["last_edited_time"]["on_or_after"] if filter else ""
+        return [p for p in self.pages.values() if p["last_edited_time"] >= since]
+
+
+def _mirror(**kwargs):
+    return NotionMirror(":memory:", min_sync_interval_sec=0, **kwargs)
+
+
+def test_due_notes_are_answered_locally():
+    db = FakeDatabase(
+        [
+            _page("a", "2025-01-01T10:00:00.000Z", "2025-01-02"),
+            _page("b", "2025-01-01T10:00:00.000Z", "2025-01-05T09:00:00.000Z"),
+        ]
+    )
+    mirror = _mirror()
+    assert mirror.sync("db", db.query) == 2
+    due = mirror.due_notes("db", "2025-01-03")
+    assert [note["page_id"] for note in due] == ["a"]
+    assert due[0]["title"] == "Note" and due[0]["effort"] == "Medium"
+    assert [n["page_id"] for n in mirror.due_notes("db", "2025-01-05")] == ["a", "b"]
+
+
+def test_incremental_sync_reads_only_recent_edits():
+    db = FakeDatabase([_page("a", "2025-01-01T10:00:00.000Z", "2025-01-02")])
+    mirror = _mirror()
+    mirror.sync("db", db.query)
+    db.pages["b"] = _page("b", "2025-01-03T10:00:00.000Z", "2025-01-02")
+    # The newest already-mirrored edit is re-read along with the new page.
+    assert mirror.sync("db", db.query) == 2
+    assert db.filters[-1]["last_edited_time"] == {
+        "on_or_after": "2025-01-01T10:00:00.000Z"
+    }
+    assert len(mirror.due_notes("db", "2025-01-02")) == 2
+
+
+def test_full_sync_drops_pages_removed_from_notion():
+    db = FakeDatabase(
+        [
+            _page("a", "2025-01-01T10:00:00.000Z", "2025-01-02"),
+            _page("b", "2025-01-01T10:00:00.000Z", "2025-01-02"),
+        ]
+    )
+    mirror = _mirror(full_sync_interval_sec=0)
+    mirror.sync("db", db.query)
+    del db.pages["b"]
+    mirror.sync("db", db.query)
+    assert db.filters[-1] is None
+    assert [n["page_id"] for n in mirror.due_notes("db", "2025-01-02")] == ["a"]
+
+
+def test_sync_is_skipped_within_min_interval():
+    db = FakeDatabase([_page("a", "2025-01-01T10:00:00.000Z", "2025-01-02")])
+    mirror = NotionMirror(":memory:", min_sync_interval_sec=60)
+    mirror.sync("db", db.query)
+    assert mirror.sync("db", db.query) == 0
+    assert len(db.filters) == 1
+
+
+def test_refresh_page_writes_through_mirrored_pages_only():
+    db = FakeDatabase([_page("a", "2025-01-01T10:00:00.000Z", "2025-01-02")])
+    mirror = _mirror()
+    mirror.sync("db", db.query)
+    assert mirror.refresh_page(_page("a", "2025-01-02T10:00:00.000Z", "2025-01-09"))
+    assert mirror.due_notes("db", "2025-01-08") == []
+    assert not mirror.refresh_page(_page("z", "2025-01-02T10:00:00.000Z", "2025-01-01"))
+
+
+def test_last_edited_time_follows_synced_edits():
+    db = FakeDatabase([_page("a", "2025-01-01T10:00:00.000Z", "2025-01-02")])
+    mirror = _mirror()
+    mirror.sync("db", db.query)
+    assert mirror.last_edited_time("a") == "2025-01-01T10:00:00.000Z"
+    db.pages["a"] = _page("a", "2025-01-02T10:00:00.000Z", "2025-01-02")
+    mirror.sync("db", db.query)
+    assert mirror.last_edited_time("a") == "2025-01-02T10:00:00.000Z"
+    assert mirror.last_edited_time("z") is None
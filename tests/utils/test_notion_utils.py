@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from utils.notion_utils import project_note, write_page_blocks, write_page_blocks_async
+
+
+def _page(title_prop="Name", title="Graphs", effort="Medium"):
+    return {
+        "id": "page-1",
+        "url": "https://notion.so/page-1",
+        "last_edited_time": "2025-01-01T10:00:00.000Z",
+        "properties": {
+            title_prop: {
+                "type": "title",
+                "title": [{"plain_text": title[:3]}, {"plain_text": title[3:]}],
+            },
+            "Effort": {"type": "select", "select": {"name": effort}},
+            "Next Review": {
+                "type": "formula",
+                "formula": {"type": "date", "date": {"start": "2025-01-02"}},
+            },
+            "Notes": {"type": "rich_text", "rich_text": [{"plain_text": "x" * 500}]},
+        },
+    }
+
+
+def test_project_note_keeps_only_needed_fields():
+    assert project_note(_page()) == {
+        "page_id": "page-1",
+        "title": "Graphs",
+        "url": "https://notion.so/page-1",
+        "effort": "Medium",
+        "next_review": "2025-01-02",
+        "last_edited_time": "2025-01-01T10:00:00.000Z",
+    }
+
+
+def test_project_note_finds_title_by_type():
+    assert project_note(_page(title_prop="Problem"))["title"] == "Graphs"
+
+
+def test_project_note_tolerates_missing_properties():
+    note = project_note({"id": "p", "url": "u", "properties": {}})
+    assert note["title"] == ""
+    assert note["effort"] is None and note["next_review"] is None
+
+
+class FakePages:
+    def __init__(self, fail_on_append=None):
+        self.pages = {}
+        self.fail_on_append = fail_on_append
+        self.appends = 0
+
+    def create(self, children):
+        page = {"id": f"page-{len(self.pages) + 1}"}
+        self.pages[page["id"]] = list(children)
+        return page
+
+    def append(self, page_id, children):
+        self.appends += 1
+        if self.appends == self.fail_on_append:
+            raise TimeoutError("append failed")
+        self.pages[page_id].extend(children)
+
+
+def test_write_page_blocks_resumes_an_interrupted_page():
+    blocks = [{"n": i} for i in range(250)]
+    notion = FakePages(fail_on_append=2)
+    progress = []
+
+    def on_batch(page, written):
+        progress.append((page["id"], written))
+
+    with pytest.raises(TimeoutError):
+        write_page_blocks(blocks, notion.create, notion.append, on_batch=on_batch)
+    assert progress == [("page-1", 100), ("page-1", 200)]
+
+    page, written = {"id": progress[-1][0]}, progress[-1][1]
+    result = write_page_blocks(
+        blocks, notion.create, notion.append, page, written, on_batch
+    )
+    assert result == {"id": "page-1"}
+    assert list(notion.pages) == ["page-1"]
+    assert notion.pages["page-1"] == blocks
+    assert progress[-1] == ("page-1", 250)
+
+
+def test_write_page_blocks_async_resumes_an_interrupted_page():
+    blocks = [{"n": i} for i in range(250)]
+    notion = FakePages(fail_on_append=1)
+    progress = []
+
+    async def create(children):
+        return notion.create(children)
+
+    async def append(page_id, children):
+        notion.append(page_id, children)
+
+    def write(page=None, written=0):
+        return asyncio.run(
+            write_page_blocks_async(
+                blocks, create, append, page, written, lambda *p: progress.append(p)
+            )
+        )
+
+    with pytest.raises(TimeoutError):
+        write()
+    page, written = progress[-1]
+    assert write(page, written) == {"id": "page-1"}
+    assert notion.pages["page-1"] == blocks
@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+
+from utils.disk_cache import DiskCache
+from utils.page_cache import PageMarkdownCache, is_settled
+
+EDITED = "2025-01-01T10:00:00.000Z"
+
+
+def test_is_settled_waits_out_minute_resolution():
+    now = datetime(2025, 1, 1, 10, 0, 30, tzinfo=timezone.utc)
+    assert not is_settled(EDITED, now=now)
+    assert is_settled(EDITED, now=now.replace(minute=2))
+
+
+def test_entries_are_served_only_for_matching_edit_time():
+    cache = PageMarkdownCache()
+    cache.put("page", EDITED, "# Notes")
+    assert cache.get("page", EDITED) == "# Notes"
+    assert cache.get("page", "2025-01-02T10:00:00.000Z") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_memory_tier_is_size_bounded():
+    cache = PageMarkdownCache(max_bytes=10)
+    cache.put("a", EDITED, "aaaaaa")
+    cache.put("b", EDITED, "bbbbbb")
+    assert cache.get("a", EDITED) is None
+    assert cache.get("b", EDITED) == "bbbbbb"
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    PageMarkdownCache(disk=DiskCache(tmp_path)).put("page", EDITED, "# Notes")
+    restarted = PageMarkdownCache(disk=DiskCache(tmp_path))
+    assert restarted.get("page", EDITED) == "# Notes"
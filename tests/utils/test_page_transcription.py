@@ -0,0 +1,78 @@
+import threading
+import time
+
+from utils.page_transcription import (
+    failed_pages,
+    merge_page_markdown,
+    page_groups,
+    transcribe_pages,
+)
+
+
+def test_pages_are_grouped_in_order():
+    assert page_groups(5, 2) == [range(0, 2), range(2, 4), range(4, 5)]
+    assert page_groups(2, 0) == [range(0, 1), range(1, 2)]
+
+
+def test_groups_are_transcribed_concurrently_and_returned_in_page_order():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def transcribe(images, pages):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05 * (3 - pages[0] // 2))
+        with lock:
+            active -= 1
+        return "+".join(images)
+
+    images = [f"img{i}" for i in range(6)]
+    parts = transcribe_pages(images, transcribe, group_size=2, max_workers=2)
+    assert parts == ["img0+img1", "img2+img3", "img4+img5"]
+    assert peak == 2
+
+
+def test_a_failed_group_is_retried_page_by_page():
+    calls = []
+    attempts = {}
+
+    def transcribe(images, pages):
+        calls.append(list(pages))
+        if len(pages) > 1 and 3 in pages:
+            raise TimeoutError("group too slow")
+        if list(pages) == [3]:
+            attempts[3] = attempts.get(3, 0) + 1
+            if attempts[3] < 2:
+                raise TimeoutError("flaky page")
+        if list(pages) == [2]:
+            raise ValueError("unreadable")
+        return f"p{pages[0]}-{pages[-1]}"
+
+    parts = transcribe_pages(
+        [f"img{i}" for i in range(4)], transcribe, group_size=2, page_attempts=2
+    )
+    assert parts == ["p0-1", "?? Page 3 could not be transcribed.", "p3-3"]
+    assert sorted(calls) == [[0, 1], [2], [2], [2, 3], [3], [3]]
+    # The mark survives merging, so the failure can be reported.
+    assert failed_pages(merge_page_markdown(parts)) == [3]
+    assert failed_pages("## Notes\n- Page 3 was fine") == []
+
+
+def test_merge_restores_the_three_sections_in_page_order():
+    parts = [
+        "# Caching\n\n## Summary\n- caches cut latency\n\n## Notes\n- LRU evicts\n",
+        "# Caching\n\n## Cues and key terms\n- TTL\n\n## Notes\n- write-through\n"
+        "\n## Eviction policies\n- LFU\n",
+        "- loose text\n```python\n# not a title\n## not a section\n```\n"
+        "## Summary\n- invalidate on write\n",
+    ]
+    merged = merge_page_markdown(parts)
+    assert merged == (
+        "# Caching\n\n"
+        "## Summary\n\n- caches cut latency\n\n- invalidate on write\n\n"
+        "## Cues & Key Terms\n\n- TTL\n\n"
+        "## Notes\n\n- LRU evicts\n\n- write-through\n\n### Eviction policies\n- LFU"
+        "\n\n- loose text\n```python\n# not a title\n## not a section\n```\n"
+    )
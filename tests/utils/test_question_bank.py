@@ -0,0 +1,48 @@
+import random
+
+from utils.question_bank import QuestionBank, hash_notes
+
+
+def _questions(n, sections=5):
+    return [
+        {"id": f"q{i:02d}", "text": f"Question {i}?", "refs": [f"H2: S{i % sections}"]}
+        for i in range(n)
+    ]
+
+
+def test_add_skips_questions_already_banked():
+    bank = QuestionBank(":memory:")
+    key = hash_notes("# Notes")
+    assert bank.add(key, _questions(4)) == 4
+    assert bank.add(key, [{"text": "question 1", "refs": []}]) == 0
+    assert bank.count(key) == 4
+    assert bank.count(hash_notes("# Other notes")) == 0
+
+
+def test_sample_spreads_across_sections_and_renumbers():
+    bank = QuestionBank(":memory:")
+    bank.add("h", _questions(20))
+    sample = bank.sample("h", 5, rng=random.Random(1))
+    assert [q["id"] for q in sample] == ["q01", "q02", "q03", "q04", "q05"]
+    assert len({tuple(q["refs"]) for q in sample}) == 5
+    assert len(bank.sample("h", 50)) == 20
+
+
+def test_poorly_answered_questions_come_back_more_often():
+    bank = QuestionBank(":memory:")
+    bank.add("h", _questions(10, sections=1))
+    graded = [
+        {"question": f"Question {i}?", "verdict": "Incorrect" if i < 2 else "Correct"}
+        for i in range(10)
+    ]
+    for _ in range(3):
+        bank.record_results("h", graded)
+    rng = random.Random(7)
+    picks = [q["text"] for _ in range(300) for q in bank.sample("h", 2, rng=rng)]
+    assert picks.count("Question 0?") > 1.5 * picks.count("Question 5?")
+
+
+def test_bank_persists_across_instances(tmp_path):
+    path = tmp_path / "bank.sqlite3"
+    QuestionBank(path).add("h", _questions(3))
+    assert QuestionBank(path).count("h") == 3
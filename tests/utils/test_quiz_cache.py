@@ -0,0 +1,68 @@
+import threading
+
+from utils.quiz_cache import QuizCache
+
+
+def _note(page_id, edited="2025-01-01T10:00:00.000Z"):
+    return {"page_id": page_id, "url": f"u/{page_id}", "last_edited_time": edited}
+
+
+class Generator:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, note):
+        self.release.wait(5)
+        self.calls.append(note["page_id"])
+        return {"notes_md": note["page_id"], "questions": [note["last_edited_time"]]}
+
+
+def test_prefetch_generates_only_top_n():
+    generate = Generator()
+    cache = QuizCache(generate, max_workers=2)
+    notes = [_note("a"), _note("b"), _note("c")]
+    assert cache.prefetch(notes, top_n=2) == 2
+    assert cache.prefetch(notes, top_n=2) == 0
+    assert cache.get_or_generate(notes[0])["notes_md"] == "a"
+    assert cache.get_or_generate(notes[1])["notes_md"] == "b"
+    assert sorted(generate.calls) == ["a", "b"]
+    assert cache.stats()["hits"] == 2
+    # A prefetched quiz is handed out once; the next revision gets a new one.
+    cache.get_or_generate(notes[0])
+    assert cache.stats()["misses"] == 1
+
+
+def test_selection_waits_for_quiz_in_flight():
+    generate = Generator()
+    generate.release.clear()
+    cache = QuizCache(generate)
+    cache.prefetch([_note("a")], top_n=1)
+    threading.Timer(0.05, generate.release.set).start()
+    assert cache.get_or_generate(_note("a"))["notes_md"] == "a"
+    assert generate.calls == ["a"]
+
+
+def test_edited_notes_get_a_fresh_quiz():
+    generate = Generator()
+    cache = QuizCache(generate)
+    cache.get_or_generate(_note("a"))
+    quiz = cache.get_or_generate(_note("a", edited="2025-02-01T10:00:00.000Z"))
+    assert quiz["questions"] == ["2025-02-01T10:00:00.000Z"]
+    assert generate.calls == ["a", "a"]
+
+
+def test_failed_prefetch_is_regenerated():
+    attempts = []
+
+    def flaky(note):
+        attempts.append(note["page_id"])
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return {"notes_md": "ok", "questions": []}
+
+    cache = QuizCache(flaky)
+    cache.prefetch([_note("a")], top_n=1)
+    assert cache.get_or_generate(_note("a"))["notes_md"] == "ok"
+    assert attempts == ["a", "a"]
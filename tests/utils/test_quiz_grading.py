@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.quiz_grading import (
+    GradingSession,
+    aggregate_evaluations,
+    normalize_verdict,
+)
+
+
+def _grade(question, verdict, review_area=""):
+    return {
+        "question": question,
+        "answer": "...",
+        "verdict": verdict,
+        "feedback": f"Feedback on {question}",
+        "review_area": review_area,
+    }
+
+
+def test_normalize_verdict():
+    assert normalize_verdict("correct") == "Correct"
+    assert normalize_verdict("Partially correct") == "Partially Correct"
+    assert normalize_verdict("**Incorrect**") == "Incorrect"
+    assert normalize_verdict("") == "Incorrect"
+
+
+def test_session_returns_grades_in_question_order():
+    def grade(i):
+        time.sleep(0.05 * (3 - i))
+        return i
+
+    session = GradingSession()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        for i in (2, 0, 1):
+            session.add(i, pool.submit(grade, i))
+        assert session.missing(4) == [3]
+        assert session.results() == [0, 1, 2]
+
+
+def test_aggregate_builds_report_with_summary():
+    report = aggregate_evaluations(
+        [
+            _grade("What is LRU?", "Correct"),
+            _grade("What is a ring?", "Incorrect", "Consistent hashing"),
+            _grade("Why invalidate?", "Partially Correct", "Consistent hashing"),
+        ],
+        "https://notion.so/page",
+    )
+    assert report.startswith("#### Question 1\n")
+    assert "#### Question 3" in report
+    assert "**Score:** 1/3 correct, 1 partially correct, 1 incorrect." in report
+    assert "- Question 2: What is a ring?" in report
+    assert report.count("- Consistent hashing") == 1
+    assert report.endswith("**Notion page:** https://notion.so/page")
@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+import pytest
+from notion_client import APIResponseError
+from notion_client.errors import RequestTimeoutError, UnknownHTTPResponseError
+
+from utils.rate_limiter import NotionRateLimiter, TokenBucket
+
+
+def _error(status, headers=None):
+    return APIResponseError(
+        code="rate_limited",
+        status=status,
+        message="slow down",
+        headers=httpx.Headers(headers or {}),
+        raw_body_text="",
+    )
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate_per_sec=50, capacity=2)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() > 0
+
+
+def test_retries_rate_limited_calls_and_backs_off():
+    limiter = NotionRateLimiter(rate_per_sec=100)
+    responses = [_error(429, {"Retry-After": "0"}), {"id": "page"}]
+
+    def fake_call(**kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert limiter.call(fake_call, page_id="x") == {"id": "page"}
+    stats = limiter.stats()
+    assert stats["requests"] == 2
+    assert stats["retries"] == 1
+    assert stats["current_rate"] < 100
+
+
+def test_non_retryable_errors_are_raised():
+    limiter = NotionRateLimiter(rate_per_sec=100)
+
+    def fake_call():
+        raise _error(400)
+
+    with pytest.raises(APIResponseError):
+        limiter.call(fake_call)
+    assert limiter.stats()["retries"] == 0
+
+
+def _flaky(*failures):
+    responses = [*failures, {"id": "page"}]
+
+    def fake_call(**kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return fake_call
+
+
+def test_retries_gateway_errors_without_a_json_body():
+    limiter = NotionRateLimiter(rate_per_sec=100, base_backoff_sec=0)
+    gateway = UnknownHTTPResponseError(502, raw_body_text="<html>Bad Gateway</html>")
+    assert limiter.call(_flaky(gateway), page_id="x") == {"id": "page"}
+    assert limiter.stats()["retries"] == 1
+
+    with pytest.raises(UnknownHTTPResponseError):
+        limiter.call(_flaky(UnknownHTTPResponseError(400)))
+
+
+def test_retries_timeouts_until_retries_run_out():
+    limiter = NotionRateLimiter(rate_per_sec=100, max_retries=2, base_backoff_sec=0)
+    assert limiter.call(_flaky(RequestTimeoutError())) == {"id": "page"}
+
+    async def call_async():
+        fake_call = _flaky(*[RequestTimeoutError()] * 3)
+
+        async def fake_call_async():
+            return fake_call()
+
+        return await limiter.call_async(fake_call_async)
+
+    with pytest.raises(RequestTimeoutError):
+        asyncio.run(call_async())
+    assert limiter.stats()["retries"] == 3
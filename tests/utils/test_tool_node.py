@@ -0,0 +1,173 @@
+import threading
+import time
+from typing import Annotated, List, TypedDict
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.tools import StructuredTool
+from langgraph.graph import START, StateGraph, add_messages
+
+from utils.tool_node import CachingToolNode, ToolCachePolicy
+
+
+class _Tools:
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, name):
+        with self._lock:
+            self.calls.append(name)
+
+    def fetch_due_notes(self) -> list:
+        """Due notes."""
+        self._record("fetch_due_notes")
+        return [{"page_id": "p1"}]
+
+    def fetch_page_content(self, page_id: str) -> str:
+        """Page content."""
+        self._record(f"fetch_page_content:{page_id}")
+        time.sleep(0.2)
+        return f"# {page_id}"
+
+    def log_revision(self, page_id: str) -> bool:
+        """Log a revision."""
+        self._record("log_revision")
+        return True
+
+    def broken(self) -> str:
+        """Always fails."""
+        raise RuntimeError("boom")
+
+    def as_tools(self):
+        return [
+            StructuredTool.from_function(func=f)
+            for f in (
+                self.fetch_due_notes,
+                self.fetch_page_content,
+                self.log_revision,
+                self.broken,
+            )
+        ]
+
+
+POLICIES = {
+    "fetch_due_notes": ToolCachePolicy(ttl_sec=60),
+    "fetch_page_content": ToolCachePolicy(ttl_sec=60),
+    "log_revision": ToolCachePolicy(invalidates=("fetch_due_notes",)),
+}
+
+
+def _state(*calls):
+    tool_calls = [
+        {"name": name, "args": args, "id": f"c{i}"}
+        for i, (name, args) in enumerate(calls)
+    ]
+    return {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+
+
+def test_tool_calls_in_one_step_run_concurrently():
+    tools = _Tools()
+    node = CachingToolNode(tools.as_tools(), POLICIES, max_workers=4)
+    started = time.perf_counter()
+    out = node(_state(*[("fetch_page_content", {"page_id": p}) for p in "abc"]))
+    assert time.perf_counter() - started < 0.5
+    assert [m.content for m in out["messages"]] == ["# a", "# b", "# c"]
+    assert [m.tool_call_id for m in out["messages"]] == ["c0", "c1", "c2"]
+
+
+def test_repeated_calls_are_memoized_per_conversation():
+    tools = _Tools()
+    node = CachingToolNode(tools.as_tools(), POLICIES)
+    config = {"configurable": {"thread_id": "t1"}}
+    node(_state(("fetch_page_content", {"page_id": "a"})), config)
+    out = node(
+        _state(
+            ("fetch_page_content", {"page_id": "a"}),
+            ("fetch_page_content", {"page_id": "b"}),
+            ("fetch_page_content", {"page_id": "b"}),
+        ),
+        config,
+    )
+    assert tools.calls == ["fetch_page_content:a", "fetch_page_content:b"]
+    assert [m.response_metadata["cached"] for m in out["messages"]] == [
+        True,
+        False,
+        False,
+    ]
+
+    node(
+        _state(("fetch_page_content", {"page_id": "a"})),
+        {"configurable": {"thread_id": "t2"}},
+    )
+    assert tools.calls[-1] == "fetch_page_content:a"
+
+
+def test_expired_and_invalidated_results_are_refetched():
+    tools = _Tools()
+    node = CachingToolNode(
+        tools.as_tools(), {**POLICIES, "fetch_page_content": ToolCachePolicy(0)}
+    )
+    node(_state(("fetch_page_content", {"page_id": "a"})))
+    node(_state(("fetch_page_content", {"page_id": "a"})))
+    assert tools.calls.count("fetch_page_content:a") == 2
+
+    node(_state(("fetch_due_notes", {})))
+    node(_state(("fetch_due_notes", {})))
+    node(_state(("log_revision", {"page_id": "p1"})))
+    node(_state(("fetch_due_notes", {})))
+    assert tools.calls.count("fetch_due_notes") == 2
+
+
+def test_revision_invalidates_due_notes_in_every_conversation():
+    tools = _Tools()
+    node = CachingToolNode(tools.as_tools(), POLICIES)
+    t1 = {"configurable": {"thread_id": "t1"}}
+    t2 = {"configurable": {"thread_id": "t2"}}
+    node(_state(("fetch_due_notes", {})), t1)
+    node(_state(("fetch_due_notes", {})), t2)
+    node(_state(("log_revision", {"page_id": "p1"})), t2)
+    node(_state(("fetch_due_notes", {})), t1)
+    assert tools.calls.count("fetch_due_notes") == 3
+
+
+def test_results_are_refetched_when_their_version_changes():
+    tools = _Tools()
+    generation = [0]
+    policies = {
+        **POLICIES,
+        "fetch_due_notes": ToolCachePolicy(60, version=lambda: generation[0]),
+    }
+    node = CachingToolNode(tools.as_tools(), policies)
+    node(_state(("fetch_due_notes", {})))
+    node(_state(("fetch_due_notes", {})))
+    generation[0] += 1
+    out = node(_state(("fetch_due_notes", {})))
+    assert tools.calls.count("fetch_due_notes") == 2
+    assert out["messages"][0].response_metadata["cached"] is False
+
+
+def test_errors_are_reported_and_not_cached():
+    tools = _Tools()
+    node = CachingToolNode(tools.as_tools(), {"broken": ToolCachePolicy(60)})
+    out = node(_state(("broken", {}), ("missing", {})))
+    assert [m.status for m in out["messages"]] == ["error", "error"]
+    assert "boom" in out["messages"][0].content
+    assert "not a valid tool" in out["messages"][1].content
+    assert node._cache == {}
+
+
+def test_node_receives_thread_id_inside_a_graph():
+    class State(TypedDict):
+        messages: Annotated[List[BaseMessage], add_messages]
+
+    tools = _Tools()
+    node = CachingToolNode(tools.as_tools(), POLICIES)
+    graph = StateGraph(State)
+    graph.add_node("tools", node)
+    graph.add_edge(START, "tools")
+    compiled = graph.compile()
+
+    state = _state(("fetch_due_notes", {}))
+    state["messages"].insert(0, HumanMessage("hi"))
+    compiled.invoke(state, {"configurable": {"thread_id": "t1"}})
+    assert [key[0] for key in node._cache] == ["t1"]
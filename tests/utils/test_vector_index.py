@@ -0,0 +1,104 @@
+import numpy as np
+
+from utils.vector_index import VectorIndex, VectorIndexStore
+
+
+def _chunks(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(n)]
+    metadatas = [{"chunk_id": i, "doc_id": f"doc-{int(i[6:]) % 2}"} for i in ids]
+    return ids, [f"text {i}" for i in ids], vectors, metadatas
+
+
+def test_search_returns_nearest_chunks_first(tmp_path):
+    ids, texts, vectors, metadatas = _chunks(50)
+    index = VectorIndex(tmp_path)
+    index.add(ids, texts, vectors, metadatas)
+    hits = index.search(vectors[7], k=3)
+    assert hits[0]["chunk_id"] == "chunk-7"
+    assert hits[0]["text"] == "text chunk-7"
+    assert hits[0]["score"] >= hits[1]["score"] >= hits[2]["score"]
+
+
+def test_index_survives_reopen(tmp_path):
+    ids, texts, vectors, metadatas = _chunks(10)
+    VectorIndex(tmp_path).add(ids, texts, vectors, metadatas)
+    reopened = VectorIndex(tmp_path)
+    assert len(reopened) == 10
+    assert reopened.search(vectors[3], k=1)[0]["metadata"]["doc_id"] == "doc-1"
+
+
+def test_readding_a_chunk_replaces_it(tmp_path):
+    ids, texts, vectors, metadatas = _chunks(4)
+    index = VectorIndex(tmp_path)
+    index.add(ids, texts, vectors, metadatas)
+    index.add(["chunk-0"], ["new"], vectors[1:2], [{"doc_id": "doc-0"}])
+    assert len(index) == 4
+    assert index.search(vectors[1], k=2)[1]["text"] in {"new", "text chunk-1"}
+
+
+def test_delete_document_and_compact(tmp_path):
+    ids, texts, vectors, metadatas = _chunks(10)
+    index = VectorIndex(tmp_path)
+    index.add(ids, texts, vectors, metadatas)
+    assert index.delete_document("doc-0") == 5
+    index.compact()
+    assert (tmp_path / "vectors.f32").stat().st_size == 5 * 16 * 4
+    hits = VectorIndex(tmp_path).search(vectors[3], k=10)
+    assert [hit["chunk_id"] for hit in hits][0] == "chunk-3"
+    assert all(hit["metadata"]["doc_id"] == "doc-1" for hit in hits)
+
+
+def test_ivf_search_finds_exact_matches(tmp_path):
+    ids, texts, vectors, metadatas = _chunks(600, dim=32)
+    index = VectorIndex(tmp_path, ivf_min_rows=100, nprobe=4)
+    index.add(ids, texts, vectors, metadatas)
+    for i in (0, 123, 599):
+        assert index.search(vectors[i], k=1)[0]["chunk_id"] == f"chunk-{i}"
+
+
+def test_interrupted_add_is_truncated_on_open(tmp_path):
+    ids, texts, vectors, metadatas = _chunks(3)
+    VectorIndex(tmp_path).add(ids, texts, vectors, metadatas)
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(b"\0" * 64)
+    assert len(VectorIndex(tmp_path).search(vectors[0], k=5)) == 3
+
+
+def test_store_keeps_one_index_per_resource_tag(tmp_path):
+    store = VectorIndexStore(tmp_path)
+    assert store.get("System Design") is store.get("system-design")
+    assert store.get("System Design") is not store.get("Algorithms")
+
+
+def test_adds_append_to_the_journal_until_compact(tmp_path):
+    ids, texts, vectors, metadatas = _chunks(6)
+    index = VectorIndex(tmp_path)
+    index.add(ids[:3], texts[:3], vectors[:3], metadatas[:3])
+    journal = (tmp_path / "meta.log").stat().st_size
+    index.add(ids[3:], texts[3:], vectors[3:], metadatas[3:])
+    index.delete(["chunk-1"])
+    assert not (tmp_path / "meta.json").exists()
+    assert (tmp_path / "meta.log").stat().st_size > journal
+
+    reopened = VectorIndex(tmp_path)
+    assert len(reopened) == 5 and "chunk-1" not in reopened
+    reopened.compact()
+    assert not (tmp_path / "meta.log").exists()
+    reopened.add(["chunk-9"], ["nine"], vectors[:1], [{}])
+    assert len(VectorIndex(tmp_path)) == 6
+
+
+def test_torn_journal_entry_is_dropped_on_open(tmp_path):
+    ids, texts, vectors, metadatas = _chunks(3)
+    VectorIndex(tmp_path).add(ids[:2], texts[:2], vectors[:2], metadatas[:2])
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(vectors[2].tobytes())
+    with open(tmp_path / "meta.log", "a", encoding="utf-8") as f:
+        f.write('{"op": "add", "dim": 16, "chunks": [["chunk-2"')
+
+    index = VectorIndex(tmp_path)
+    assert len(index) == 2
+    index.add(ids[2:], texts[2:], vectors[2:], metadatas[2:])
+    assert len(VectorIndex(tmp_path)) == 3
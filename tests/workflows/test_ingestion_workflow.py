@@ -0,0 +1,220 @@
+import threading
+
+import pytest
+from streamlit.proto.Common_pb2 import FileURLs
+from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
+
+try:
+    from workflows.ingestion_workflow import IngestionWorkflow, chunk_id
+except Exception as e:  # Needs Python 3.13 models and the app's secrets.
+    pytest.skip(f"ingestion workflow unavailable: {e}", allow_module_level=True)
+
+from models.models import NotionPayload
+from utils.constants import JobKind
+from utils.ingestion_checkpoints import IngestionCheckpointStore
+from utils.job_queue import JobFile, JobProgress, JobQueue
+from utils.page_transcription import FAILED_PAGE_MARKER
+from utils.notion_utils import write_page_blocks
+from utils.vector_index import VectorIndexStore
+
+
+class FakeMarkdownWorkflow:
+    def __init__(self, markdown):
+        self.markdown = markdown
+        self.calls = 0
+
+    def run(self, input):
+        self.calls += 1
+        self.images_b64 = input["images_b64"]
+        return self.markdown
+
+
+class FakeNotionClient:
+    """Turns each markdown line into a block and writes them in batches."""
+
+    def __init__(self, fail_on_append=None):
+        self.pages = {}
+        self.fail_on_append = fail_on_append
+        self.appends = 0
+
+    def create_notion_page(
+        self, title, markdown, resource_tag, page=None, blocks_written=0, on_batch=None
+    ):
+        def create_page(children):
+            page_id = f"page-{len(self.pages) + 1}"
+            self.pages[page_id] = list(children)
+            return {"id": page_id, "url": f"https://notion.so/{page_id}"}
+
+        def append_blocks(page_id, children):
+            self.appends += 1
+            if self.appends == self.fail_on_append:
+                raise TimeoutError("Notion timed out")
+            self.pages[page_id].extend(children)
+
+        blocks = [{"line": line} for line in markdown.splitlines()]
+        return write_page_blocks(
+            blocks, create_page, append_blocks, page, blocks_written, on_batch
+        )
+
+
+class Tracker:
+    def __init__(self):
+        self.labels = []
+
+    def progress(self, value, text=""):
+        self.labels.append(text)
+
+
+def _upload(name="p1.jpg", data=b"jpeg-bytes"):
+    return UploadedFile(UploadedFileRec(name, name, "image/jpeg", data), FileURLs())
+
+
+def _input(**overrides):
+    return {
+        "chapter_name": "Graphs",
+        "resource_tag": "dsa",
+        "additional_context": "",
+        "files": [_upload()],
+        "progress_tracker": Tracker(),
+        **overrides,
+    }
+
+
+def _workflow(markdown, notion=None, **kwargs):
+    return IngestionWorkflow(
+        notion_client=notion or FakeNotionClient(),
+        llm_md_workflow=FakeMarkdownWorkflow(markdown),
+        vector_index_store=None,
+        embedding_store=None,
+        **kwargs,
+    )
+
+
+def test_pages_that_were_not_transcribed_are_reported(encoding):
+    markdown = "## Notes\n- BFS\n\n" + FAILED_PAGE_MARKER.format(page=2) + "\n"
+    report = _workflow(markdown).run(_input())
+    assert report["failed_pages"] == [2]
+    assert report["images"] == 1
+
+
+def test_a_failed_run_resumes_from_its_last_completed_stage(encoding):
+    markdown = "## Notes\n" + "\n".join(f"- fact {i}" for i in range(349))
+    notion = FakeNotionClient(fail_on_append=2)
+    workflow = _workflow(
+        markdown, notion, checkpoint_store=IngestionCheckpointStore(":memory:")
+    )
+
+    with pytest.raises(TimeoutError):
+        workflow.run(_input(job_id="job-1"))
+    assert [len(blocks) for blocks in notion.pages.values()] == [200]
+
+    # The same notes uploaded again as a new job pick up where it stopped.
+    report = workflow.run(_input(job_id="job-2"))
+    assert workflow.llm_md_workflow.calls == 1
+    assert list(notion.pages) == ["page-1"]
+    assert [b["line"] for b in notion.pages["page-1"]] == markdown.splitlines()
+    assert report["resumed_from"] == "notion_page_started"
+
+    # A finished run leaves no checkpoint, so the next upload starts over.
+    workflow.run(_input(job_id="job-3"))
+    assert workflow.llm_md_workflow.calls == 2
+    assert list(notion.pages) == ["page-1", "page-2"]
+
+
+def test_a_second_upload_waits_for_the_run_in_progress(encoding):
+    class BlockingMarkdownWorkflow(FakeMarkdownWorkflow):
+        def __init__(self, markdown):
+            super().__init__(markdown)
+            self.started = threading.Event()
+            self.release = threading.Event()
+
+        def run(self, input):
+            self.started.set()
+            self.release.wait(5)
+            return super().run(input)
+
+    notion = FakeNotionClient()
+    workflow = _workflow(
+        "## Notes\n- BFS", notion, checkpoint_store=IngestionCheckpointStore(":memory:")
+    )
+    workflow.llm_md_workflow = BlockingMarkdownWorkflow("## Notes\n- BFS")
+    running = {"job-1"}
+    first = threading.Thread(
+        target=workflow.run,
+        args=(_input(job_id="job-1", job_is_running=running.__contains__),),
+    )
+    first.start()
+    assert workflow.llm_md_workflow.started.wait(5)
+
+    with pytest.raises(RuntimeError, match="already being ingested by job job-1"):
+        workflow.run(_input(job_id="job-2", job_is_running=running.__contains__))
+    workflow.llm_md_workflow.release.set()
+    first.join(5)
+    running.clear()
+    assert list(notion.pages) == ["page-1"]
+
+
+def test_queued_jobs_run_with_their_uploads_and_report_progress(encoding, tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    job_id = queue.enqueue(
+        JobKind.INGESTION.value,
+        {"chapter_name": "Graphs", "resource_tag": "dsa", "additional_context": "x"},
+        [
+            JobFile("p1.jpg", "image/jpeg", b"one"),
+            JobFile("p2.png", "image/png", b"two"),
+        ],
+    )
+    job = queue.claim(JobKind.INGESTION.value, "worker")
+    workflow = _workflow("## Notes\n- BFS")
+    runs = []
+    run = workflow.run
+    workflow.run = lambda input: runs.append(input) or run(input)
+
+    report = workflow.run_job(job, JobProgress(queue, job.id))
+
+    (input,) = runs
+    assert input["job_id"] == job_id
+    assert (input["chapter_name"], input["additional_context"]) == ("Graphs", "x")
+    assert [(f.name, f.type, f.getvalue()) for f in input["files"]] == [
+        ("p1.jpg", "image/jpeg", b"one"),
+        ("p2.png", "image/png", b"two"),
+    ]
+    assert workflow.llm_md_workflow.images_b64 == [
+        "data:image/jpeg;base64,b25l",
+        "data:image/png;base64,dHdv",
+    ]
+    assert report["images"] == 2
+    assert queue.get(job_id).stage == "embedding and indexing chunks..."
+
+
+class FakeEmbeddingStore:
+    class Stats:
+        hit_rate = 0.0
+
+    def embed(self, texts, hashes):
+        return [[1.0, float(i)] for i in range(len(texts))], self.Stats()
+
+
+def test_indexing_a_page_again_replaces_its_chunks(encoding, tmp_path):
+    markdown = "## Notes\n" + "\n\n".join(f"- fact {i} " * 40 for i in range(8))
+    workflow = _workflow(markdown)
+    workflow.embedding_store = FakeEmbeddingStore()
+    workflow.vector_index_store = VectorIndexStore(tmp_path)
+    payload = NotionPayload(
+        resource_tag="dsa",
+        chapter_name="Graphs",
+        markdown=markdown,
+        notion_resp={"id": "page-1", "url": "https://notion.so/page-1"},
+    )
+    config = {"configurable": {"progress_tracker": Tracker()}}
+
+    # A retry after the embed stage splits and indexes the same page again.
+    runs = []
+    for _ in range(2):
+        split = workflow._split_markdown(payload, config)
+        workflow._embed_and_upsert(split, config)
+        runs.append([chunk.metadata["chunk_id"] for chunk in split.output_chunks])
+
+    assert runs[0] == runs[1]
+    assert runs[0][0] == chunk_id("page-1", 0)
+    assert len(workflow.vector_index_store.get("dsa")) == len(runs[0]) > 1